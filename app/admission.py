@@ -0,0 +1,270 @@
+"""
+アドミッション制御（過負荷時の負荷制限）
+
+このモジュールは、同時に処理するリクエスト数を制限し、超過したリクエストを
+上限付きの待ち行列で待たせ、待ち行列があふれた場合や待ち時間が上限を超えた場合は
+503（Retry-After ヘッダ付き）で即座に拒否する機能を提供します。
+
+- 全体の同時処理数の上限に加えて、ルートごとに同時処理数の上限を設定できます
+  （既定では全件取得・全文検索などの重いルートを制限します）。
+- 待ち行列ではルートの優先度の高い順に処理を開始します。待ち行列が満杯のときに
+  より優先度の高いリクエストが到着した場合は、最も優先度の低い待機中のリクエストを拒否して入れ替えます。
+  既定では軽い書き込み（完了化・削除・作成）を優先し、全件取得を後回しにします。
+
+記録・判定はASGIミドルウェアからイベントループ上でのみ行われるため、ロックは使用しません。
+"""
+
+import asyncio
+import itertools
+from collections.abc import Awaitable, Callable, Iterable, MutableMapping
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+from app.metrics import Metrics, metrics
+from app.utils.route_utils import iter_api_routes, route_name
+
+
+# 制限の対象外とするルート（ヘルスチェック・メトリクス・デバッグ用、接続を保持し続けるSSE）
+EXEMPT_ROUTES = frozenset({
+    "GET /",
+    "GET /metrics",
+    "GET /todos/events",
+    "GET /debug/profiles",
+    "GET /debug/profiles/{id}",
+})
+
+# ルートの優先度（値が小さいほど優先、未指定のルートは DEFAULT_PRIORITY）
+ROUTE_PRIORITIES = {
+    "PATCH /todos/{id}/complete": 0,
+    "DELETE /todos/{id}": 0,
+    "POST /todos": 0,
+    "GET /todos": 2,
+    "GET /todos/search": 2,
+}
+DEFAULT_PRIORITY = 1
+
+# 拒否の理由
+SHED_QUEUE_FULL = "queue_full"
+SHED_TIMEOUT = "timeout"
+SHED_EVICTED = "evicted"
+
+
+class _Waiter:
+    """待ち行列で待機中のリクエスト"""
+
+    __slots__ = ("priority", "order", "route", "future")
+
+    def __init__(self, priority: int, order: int, route: str, future: asyncio.Future):
+        self.priority = priority
+        self.order = order
+        self.route = route
+        self.future = future
+
+
+class AdmissionController:
+    """
+    同時処理数の制限と優先度付きの待ち行列
+
+    Args:
+        recorder (Metrics): 拒否件数の記録先（省略時はグローバルの metrics）
+    """
+
+    def __init__(self, recorder: Metrics = metrics):
+        self.recorder = recorder
+        self.configure(0, 0, 0.0, {})
+
+    def configure(
+        self,
+        max_concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+        route_limits: dict[str, int],
+        retry_after: int = 1,
+        routes: Iterable = (),
+    ) -> None:
+        """
+        制限の設定を変更
+
+        Args:
+            max_concurrency (int): 全体の同時処理数の上限（0 の場合は制限しない）
+            queue_size (int): 待ち行列の最大長
+            queue_timeout (float): 待ち行列での最大待ち時間（秒）
+            route_limits (dict[str, int]): ルート名（例: GET /todos） → 同時処理数の上限
+            retry_after (int): 拒否時に Retry-After ヘッダで返す秒数
+            routes (Iterable): 制限の対象を判定するアプリケーションのルート（app.routes）
+        """
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.route_limits = route_limits
+        self.retry_after = retry_after
+        self.enabled = max_concurrency > 0
+
+        # 制限の対象とするルートと、そのルート名
+        self.routes = [
+            (route, name) for route in iter_api_routes(routes)
+            if (name := route_name(route)) not in EXEMPT_ROUTES
+        ]
+        # 処理中のリクエスト数（全体・ルートごと）
+        self.active = 0
+        self.route_active: dict[str, int] = {}
+        # 待機中のリクエスト
+        self.waiters: list[_Waiter] = []
+        self._order = itertools.count()
+
+    def match(self, scope: MutableMapping[str, Any]) -> Optional[tuple[APIRoute, str]]:
+        """
+        リクエストに一致する制限対象のルートを取得
+
+        Args:
+            scope (MutableMapping[str, Any]): ASGIスコープ
+
+        Returns:
+            Optional[tuple[APIRoute, str]]: (ルート, ルート名)、または None（対象外のルート・一致するルートがない場合）
+        """
+        for route, name in self.routes:
+            matched, _ = route.matches(scope)
+            if matched is Match.FULL:
+                return route, name
+        return None
+
+    def _has_capacity(self, route: str) -> bool:
+        limit = self.route_limits.get(route)
+        return self.active < self.max_concurrency and (limit is None or self.route_active.get(route, 0) < limit)
+
+    def _admit(self, route: str) -> None:
+        self.active += 1
+        self.route_active[route] = self.route_active.get(route, 0) + 1
+
+    async def acquire(self, route: str) -> Optional[str]:
+        """
+        処理の開始を許可されるまで待機
+
+        Args:
+            route (str): ルート名
+
+        Returns:
+            Optional[str]: 許可された場合は None、拒否された場合はその理由
+        """
+        priority = ROUTE_PRIORITIES.get(route, DEFAULT_PRIORITY)
+
+        # 空きがあれば開始（枠が空くたびに開始できる待機中のリクエストはすべて開始済みのため、
+        # 待機中のリクエストはいずれも全体またはルートの上限に達しており、追い越しにはならない）
+        if self._has_capacity(route):
+            self._admit(route)
+            # インメモリストレージのハンドラは await で中断せずに完了するため、ここで一度制御を返し、
+            # 既に到着している他のリクエストを先に制限の判定（待ち行列）に並ばせる
+            # （そうしないと到着済みのリクエストは判定前にイベントループで待たされ、超過分を拒否できない）
+            try:
+                await asyncio.sleep(0)
+            except asyncio.CancelledError:
+                self.release(route)
+                raise
+            return None
+
+        if len(self.waiters) >= self.queue_size:
+            # 待ち行列が満杯の場合は、より優先度の低い待機中のリクエストのうち最も新しいものと入れ替える
+            victim = max(self.waiters, key=lambda waiter: (waiter.priority, waiter.order), default=None)
+            if victim is None or victim.priority <= priority:
+                return SHED_QUEUE_FULL
+            self.waiters.remove(victim)
+            victim.future.set_result(SHED_EVICTED)
+
+        waiter = _Waiter(priority, next(self._order), route, asyncio.get_running_loop().create_future())
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter.future,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # 許可と同時にクライアントが切断された場合は枠を返す
+            if waiter.future.done() and waiter.future.result() is None:
+                self.release(route)
+            elif waiter in self.waiters:
+                self.waiters.remove(waiter)
+            raise
+
+        if waiter.future.done():
+            return waiter.future.result()
+        self.waiters.remove(waiter)
+        return SHED_TIMEOUT
+
+    def release(self, route: str) -> None:
+        """
+        処理の終了を記録し、空いた枠で待機中のリクエストを優先度順に開始
+
+        Args:
+            route (str): ルート名
+        """
+        self.active -= 1
+        self.route_active[route] -= 1
+        if not self.waiters:
+            return
+        for waiter in sorted(self.waiters, key=lambda waiter: (waiter.priority, waiter.order)):
+            if self.active >= self.max_concurrency:
+                break
+            if self._has_capacity(waiter.route):
+                self.waiters.remove(waiter)
+                self._admit(waiter.route)
+                waiter.future.set_result(None)
+
+    @property
+    def queue_depth(self) -> int:
+        """待ち行列で待機中のリクエスト数"""
+        return len(self.waiters)
+
+
+# グローバル変数：プロセス全体のアドミッション制御
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """
+    アドミッション制御を行うASGIミドルウェア
+
+    制限の対象のルートへのリクエストは、処理の開始を許可されるまで待機し、
+    拒否された場合は 503（Retry-After ヘッダ付き）を返します。無効な場合は有効フラグの確認のみを行います。
+
+    Args:
+        app: ラップするASGIアプリケーション
+        controller (AdmissionController): 制御に使用するアドミッション制御（省略時はグローバルの admission）
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[[], Awaitable[MutableMapping[str, Any]]],
+        send: Callable[[MutableMapping[str, Any]], Awaitable[None]],
+    ) -> None:
+        controller = self.controller
+        if not controller.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        matched = controller.match(scope)
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+        # 拒否したリクエストもメトリクスでルートごとに集計されるよう、ルーティング結果を先に設定する
+        scope["route"], route = matched
+
+        reason = await controller.acquire(route)
+        if reason is not None:
+            controller.recorder.record_shed(route, reason)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded; retry later", "error_code": "OVERLOADED"},
+                headers={"Retry-After": str(controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(route)
@@ -0,0 +1,192 @@
+"""
+アプリケーション設定
+
+このモジュールは、環境変数から読み込むアプリケーション設定を提供します。
+すべての設定は省略可能で、未設定の場合は従来どおりのインメモリ動作になります。
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from app.utils.json_utils import JSON_ENCODERS
+
+
+# WALのfsyncポリシー
+# always:   レコードごとにfsync（グループコミットなし）
+# group:    書き込みバッチごとに1回fsync（グループコミット）
+# interval: 一定間隔でfsync（応答はfsyncを待たない）
+# off:      fsyncしない（OSのページキャッシュに任せる）
+WAL_FSYNC_POLICIES = ("always", "group", "interval", "off")
+
+# ストレージバックエンド
+# memory: インメモリ（既定、WAL・スナップショットによる永続化に対応）
+# sqlite: SQLiteファイル（WALモード、複数ワーカーで共有可能）
+STORAGE_BACKENDS = ("memory", "sqlite")
+
+
+def parse_route_limits(value: str) -> tuple[tuple[str, int], ...]:
+    """
+    ルートごとの上限の設定値を解析
+
+    Args:
+        value (str): 「メソッド パス=上限」のカンマ区切り（例: "GET /todos=4,GET /todos/search=4"）
+
+    Returns:
+        tuple[tuple[str, int], ...]: (ルート名, 上限) のタプル
+
+    Raises:
+        ValueError: 形式が不正な場合
+
+    Examples:
+        >>> parse_route_limits("GET /todos=4, POST /todos/batch=2")
+        (('GET /todos', 4), ('POST /todos/batch', 2))
+    """
+    limits = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        route, separator, limit = item.rpartition("=")
+        if not separator or len(route.split()) != 2 or not limit.strip().isdigit():
+            raise ValueError(f"Route limit must be 'METHOD /path=N', got {item.strip()!r}")
+        limits.append((" ".join(route.split()), int(limit)))
+    return tuple(limits)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """アプリケーション設定"""
+
+    # ストレージバックエンド（STORAGE_BACKENDS のいずれか）
+    storage: str = "memory"
+
+    # SQLiteデータベースファイルのパス（storage が sqlite の場合のみ使用）
+    sqlite_path: str = "todos.db"
+
+    # SQLiteの読み込み用コネクションプールの接続数
+    sqlite_pool_size: int = 4
+
+    # SQLiteストレージで1回のリースで確保するIDの件数（複数ワーカー間のID採番用）
+    sqlite_id_block_size: int = 1000
+
+    # WAL（追記型ログ）ファイルのパス（None の場合は永続化しない）
+    wal_path: Optional[str] = None
+
+    # WALのfsyncポリシー（WAL_FSYNC_POLICIES のいずれか）
+    wal_fsync: str = "group"
+
+    # グループコミットで後続の書き込みを待ち合わせる時間（秒）
+    # 0 の場合は待ち合わせず、fsync中に到着した書き込みだけを次のバッチにまとめる
+    wal_group_commit_window: float = 0.001
+
+    # fsyncポリシーが interval の場合のfsync間隔（秒）
+    wal_fsync_interval: float = 1.0
+
+    # スナップショットファイルのパス（WAL有効時のみ使用、None の場合は "<wal_path>.snapshot"）
+    snapshot_path: Optional[str] = None
+
+    # スナップショットを取得するか確認する間隔（秒）
+    snapshot_interval: float = 300.0
+
+    # 前回のスナップショット以降にこの件数以上のログが追記されていればスナップショットを取得
+    snapshot_min_entries: int = 10_000
+
+    # 論理削除済みのToDoを保持する期間（秒、None の場合は物理削除しない）
+    tombstone_retention: Optional[float] = None
+
+    # 論理削除済みのToDoの物理削除（コンパクション）を実行する間隔（秒）
+    compaction_interval: float = 60.0
+
+    # コンパクションで1回に走査するIDの範囲（この範囲ごとにイベントループへ制御を返す）
+    compaction_slice_size: int = 1000
+
+    # レスポンスのJSONエンコーダ（JSON_ENCODERS のいずれか）
+    json_encoder: str = "auto"
+
+    # X-Profile ヘッダ付きのリクエストをプロファイリングするか
+    profiling: bool = False
+
+    # N 件に1件のリクエストをプロファイリングする（0 の場合はサンプリングしない）
+    profile_sample_every: int = 0
+
+    # 保持するプロファイリング結果の最大件数
+    profile_buffer_size: int = 100
+
+    # イベントループの停止とみなす遅延（秒、0 の場合は停止検出を行わない）
+    stall_threshold: float = 0.1
+
+    # イベントループの遅延を計測するハートビートの間隔（秒）
+    stall_interval: float = 0.02
+
+    # 全体の同時処理数の上限（0 の場合はアドミッション制御を行わない）
+    admission_max_concurrency: int = 0
+
+    # 同時処理数の上限を超えたリクエストの待ち行列の最大長
+    admission_queue_size: int = 100
+
+    # 待ち行列での最大待ち時間（秒、超えた場合は 503）
+    admission_queue_timeout: float = 1.0
+
+    # ルートごとの同時処理数の上限（ルート名, 上限）
+    admission_route_limits: tuple[tuple[str, int], ...] = (("GET /todos", 4), ("GET /todos/search", 4))
+
+    # 拒否時に Retry-After ヘッダで返す秒数
+    admission_retry_after: int = 1
+
+
+def load_settings() -> Settings:
+    """
+    環境変数から設定を読み込む
+
+    Returns:
+        Settings: アプリケーション設定
+
+    Raises:
+        ValueError: 設定値が不正な場合
+    """
+    wal_fsync = os.environ.get("TODO_WAL_FSYNC", "group")
+    if wal_fsync not in WAL_FSYNC_POLICIES:
+        raise ValueError(f"TODO_WAL_FSYNC must be one of {WAL_FSYNC_POLICIES}, got {wal_fsync!r}")
+
+    storage = os.environ.get("TODO_STORAGE", "memory")
+    if storage not in STORAGE_BACKENDS:
+        raise ValueError(f"TODO_STORAGE must be one of {STORAGE_BACKENDS}, got {storage!r}")
+
+    wal_path = os.environ.get("TODO_WAL_PATH") or None
+    snapshot_path = os.environ.get("TODO_SNAPSHOT_PATH") or (f"{wal_path}.snapshot" if wal_path else None)
+
+    retention = os.environ.get("TODO_TOMBSTONE_RETENTION_S")
+
+    json_encoder = os.environ.get("TODO_JSON_ENCODER", "auto")
+    if json_encoder not in JSON_ENCODERS:
+        raise ValueError(f"TODO_JSON_ENCODER must be one of {JSON_ENCODERS}, got {json_encoder!r}")
+
+    return Settings(
+        storage=storage,
+        sqlite_path=os.environ.get("TODO_SQLITE_PATH", "todos.db"),
+        sqlite_pool_size=int(os.environ.get("TODO_SQLITE_POOL_SIZE", "4")),
+        sqlite_id_block_size=int(os.environ.get("TODO_SQLITE_ID_BLOCK_SIZE", "1000")),
+        wal_path=wal_path,
+        wal_fsync=wal_fsync,
+        wal_group_commit_window=float(os.environ.get("TODO_WAL_GROUP_COMMIT_MS", "1")) / 1000,
+        wal_fsync_interval=float(os.environ.get("TODO_WAL_FSYNC_INTERVAL_MS", "1000")) / 1000,
+        snapshot_path=snapshot_path,
+        snapshot_interval=float(os.environ.get("TODO_SNAPSHOT_INTERVAL_S", "300")),
+        snapshot_min_entries=int(os.environ.get("TODO_SNAPSHOT_MIN_ENTRIES", "10000")),
+        tombstone_retention=float(retention) if retention else None,
+        compaction_interval=float(os.environ.get("TODO_COMPACTION_INTERVAL_S", "60")),
+        compaction_slice_size=int(os.environ.get("TODO_COMPACTION_SLICE_SIZE", "1000")),
+        json_encoder=json_encoder,
+        profiling=os.environ.get("TODO_PROFILING", "").lower() in ("1", "true", "yes"),
+        profile_sample_every=int(os.environ.get("TODO_PROFILE_SAMPLE_N", "0")),
+        profile_buffer_size=int(os.environ.get("TODO_PROFILE_BUFFER_SIZE", "100")),
+        stall_threshold=float(os.environ.get("TODO_STALL_THRESHOLD_MS", "100")) / 1000,
+        stall_interval=float(os.environ.get("TODO_STALL_INTERVAL_MS", "20")) / 1000,
+        admission_max_concurrency=int(os.environ.get("TODO_ADMISSION_MAX_CONCURRENCY", "0")),
+        admission_queue_size=int(os.environ.get("TODO_ADMISSION_QUEUE_SIZE", "100")),
+        admission_queue_timeout=float(os.environ.get("TODO_ADMISSION_QUEUE_TIMEOUT_MS", "1000")) / 1000,
+        admission_route_limits=parse_route_limits(
+            os.environ.get("TODO_ADMISSION_ROUTE_LIMITS", "GET /todos=4,GET /todos/search=4")
+        ),
+        admission_retry_after=int(os.environ.get("TODO_ADMISSION_RETRY_AFTER_S", "1")),
+    )
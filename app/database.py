@@ -5,30 +5,694 @@
 グローバル変数と操作関数を提供します。
 """
 
+import asyncio
+import gc
+import secrets
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterator
+from datetime import datetime
+from heapq import merge
 from typing import Optional
 
+from app.utils.datetime_utils import format_epoch_seconds, from_epoch_seconds, to_epoch_seconds
+from app.utils.json_utils import dumps
+from app.utils.search_utils import normalize_text, parse_query, tokenize
+from app.snapshot import read_snapshot, write_snapshot
+from app.wal import WriteAheadLog, read_wal
+
+
+class ToDoRecord:
+    """ToDoの内部表現（省メモリレコード）
+
+    __slots__ によりインスタンスごとの属性辞書を持たず、
+    タイムスタンプはUNIXエポック秒（int）で保持します。
+    APIレスポンスへの変換は to_json を介してルーター側で行います。
+    change_seq は最後に作成・更新された時点の変更シーケンス番号で、データストアが付与します
+    （APIレスポンスやログのレコードには含めません）。
+    """
+
+    __slots__ = ("id", "title", "description", "completed", "is_active", "created_at", "updated_at", "change_seq")
+
+    # datetime とエポック秒を相互変換するフィールド
+    TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: str | None,
+        completed: bool,
+        is_active: bool,
+        created_at: int,
+        updated_at: int,
+        change_seq: int = 0,
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.completed = completed
+        self.is_active = is_active
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.change_seq = change_seq
+
+    @classmethod
+    def normalize_updates(cls, updates: dict) -> dict:
+        """
+        更新内容のタイムスタンプ（datetime）をエポック秒に変換
+
+        Args:
+            updates (dict): 更新するフィールドと値
+
+        Returns:
+            dict: タイムスタンプをエポック秒に変換した更新内容
+        """
+        return {
+            field: to_epoch_seconds(value) if field in cls.TIMESTAMP_FIELDS and not isinstance(value, int) else value
+            for field, value in updates.items()
+        }
+
+    @classmethod
+    def from_row(cls, row: list) -> "ToDoRecord":
+        """
+        to_row で変換した値の並びからレコードを復元
+
+        Args:
+            row (list): __slots__ の順に並んだフィールド値（change_seq は省略可）
+
+        Returns:
+            ToDoRecord: 復元したレコード
+        """
+        return cls(*row)
+
+    def to_row(self) -> list:
+        """
+        フィールド値を __slots__ の順に並べたリストに変換（ログ・スナップショット用）
+
+        Returns:
+            list: change_seq を除くフィールド値のリスト（タイムスタンプはエポック秒）
+        """
+        return [self.id, self.title, self.description, self.completed, self.is_active, self.created_at, self.updated_at]
+
+    def _apply_normalized(self, updates: dict) -> None:
+        """
+        normalize_updates で変換済みの更新内容をそのまま適用（一括更新で変換を繰り返さないため）
+
+        Args:
+            updates (dict): normalize_updates で変換済みの更新内容
+        """
+        for field, value in updates.items():
+            setattr(self, field, value)
+
+    def search_text(self) -> str:
+        """
+        全文検索の対象となるテキストを取得
+
+        Returns:
+            str: タイトルと説明（説明がある場合）を改行で連結したテキスト
+        """
+        return f"{self.title}\n{self.description}" if self.description else self.title
+
+    def to_dict(self) -> dict:
+        """
+        ToDoレスポンスモデルに渡せる辞書に変換
+
+        Returns:
+            dict: フィールド名と値の辞書（タイムスタンプはJSTの datetime）
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "completed": self.completed,
+            "is_active": self.is_active,
+            "created_at": from_epoch_seconds(self.created_at),
+            "updated_at": from_epoch_seconds(self.updated_at),
+        }
+
+    def to_json(self) -> bytes:
+        """
+        ToDoレスポンスモデルと同一形式のJSONバイト列に変換
+
+        レスポンスモデルを経由せずに、タイムスタンプを直接ISO 8601文字列に変換してエンコードします
+        （ToDo(**self.to_dict()).model_dump_json() と同一のバイト列になります）。
+
+        Returns:
+            bytes: ToDoレスポンスモデルのJSON表現（UTF-8）
+        """
+        return dumps({
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "completed": self.completed,
+            "is_active": self.is_active,
+            "created_at": format_epoch_seconds(self.created_at),
+            "updated_at": format_epoch_seconds(self.updated_at),
+        })
+
 
 # グローバル変数：ToDoデータベース（辞書形式）
-# キー: ToDo ID（int）、値: ToDoデータ（dict）
-todos_db: dict[int, dict] = {}
+# キー: ToDo ID（int）、値: ToDoレコード（ToDoRecord）
+todos_db: dict[int, ToDoRecord] = {}
+
+# グローバル変数：有効なToDoのIDインデックス（常にID昇順を維持）
+# create_todo / update_todo で is_active が変化したときに差分更新されます。
+active_ids: list[int] = []
+
+# グローバル変数：有効なToDoのうち完了済み / 未完了のIDインデックス（常にID昇順を維持）
+# 有効IDインデックスと同様に、completed / is_active が変化したときに差分更新されます。
+completed_ids: list[int] = []
+open_ids: list[int] = []
+
+# グローバル変数：ToDoごとのエンコード済みJSONキャッシュ
+# キー: ToDo ID（int）、値: ToDoレスポンスのJSONバイト列。update_todo で無効化されます。
+todos_json_cache: dict[int, bytes] = {}
+
+# グローバル変数：全件取得レスポンスボディのキャッシュ（世代番号, JSONバイト列）
+active_todos_body_cache: Optional[tuple[int, bytes]] = None
+
+# 一括更新でこの件数以上のインデックス変更がある場合、1件ずつではなくまとめて再構築する
+BULK_REINDEX_THRESHOLD = 32
+
+# グローバル変数：全文検索用の転置インデックス
+# キー: トークン（str）、値: そのトークンを含む有効なToDoのIDリスト（常にID昇順を維持）
+# 最初の検索時に構築を開始し、以降は作成・更新・論理削除のたびに差分更新されます。
+search_index: dict[str, list[int]] = {}
+
+# グローバル変数：転置インデックスに反映済みのIDの上限（構築中はこのID以下のToDoのみ反映済み）
+search_indexed_upto: int = 0
+
+# グローバル変数：転置インデックスの構築が完了しているかどうか
+search_index_complete: bool = False
+
+# 転置インデックスの構築で1回に使う時間の上限（秒、この時間ごとにイベントループへ制御を返す）
+SEARCH_INDEX_BUILD_BUDGET = 0.005
+
+# 転置インデックスの構築で経過時間を確認する間隔（ID数）
+SEARCH_INDEX_BUILD_CHECK_EVERY = 64
+
+# 全文検索で最初に取り出す候補IDの件数（以降は区切りごとに倍増）
+SEARCH_CHUNK_SIZE = 1024
+
+# 検索対象のフィールド（更新された場合に転置インデックスを差分更新する）
+SEARCH_FIELDS = frozenset({"title", "description", "is_active"})
+
+# グローバル変数：最後に割り当てた変更シーケンス番号
+# 作成・更新のたびに対象のレコードごとに1ずつ増やし、レコードの change_seq に記録します。
+# 初期化してもリセットせず、クライアントが保持する番号と衝突しないようにします。
+change_sequence: int = 0
+
+# グローバル変数：差分取得できる変更シーケンス番号の下限
+# 物理削除・初期化で失われた変更のうち最新の番号で、これより前の番号からは差分を返せません。
+change_floor: int = 0
+
+# グローバル変数：変更シーケンス番号のインデックス（change_seqs[i] の変更は change_ids[i] のToDo）
+# 番号の昇順に末尾へ追加します。再度変更・物理削除されたToDoの古いエントリは参照時に読み飛ばし、
+# 全体の半数を超えたら詰め直します。
+change_seqs: list[int] = []
+change_ids: list[int] = []
+
+# グローバル変数：変更シーケンス番号のインデックスのうち、読み飛ばし対象となったエントリ数
+change_stale: int = 0
 
 # グローバル変数：次に割り当てるID
 next_id: int = 1
 
+# グローバル変数：ストアの世代番号（作成・更新・初期化のたびに単調増加）
+generation: int = 0
+
+# グローバル変数：ストアのエポック（起動ごとに異なる値、番号が数え直しになるETag・差分同期トークンを区別する）
+store_epoch: int = secrets.randbits(32)
+
+# グローバル変数：変更を記録する追記型ログ（None の場合は永続化しない）
+wal: Optional[WriteAheadLog] = None
 
-def get_all_active_todos() -> list[dict]:
+# グローバル変数：最後に追記型ログへ書き込んだレコードのLSN
+last_lsn: int = 0
+
+
+def _index_add(index: list[int], todo_id: int) -> None:
+    """
+    ソート済みIDインデックスにIDを追加
+
+    IDは単調増加で割り当てられるため、通常は末尾への追加（O(1)）になります。
+
+    Args:
+        index (list[int]): ソート済みIDインデックス
+        todo_id (int): 追加するToDo ID
+    """
+    if not index or index[-1] < todo_id:
+        index.append(todo_id)
+    else:
+        position = bisect_left(index, todo_id)
+        if position == len(index) or index[position] != todo_id:
+            insort(index, todo_id)
+
+
+def _index_remove(index: list[int], todo_id: int) -> None:
+    """
+    ソート済みIDインデックスからIDを削除（存在しない場合は何もしない）
+
+    Args:
+        index (list[int]): ソート済みIDインデックス
+        todo_id (int): 削除するToDo ID
+    """
+    position = bisect_left(index, todo_id)
+    if position < len(index) and index[position] == todo_id:
+        del index[position]
+
+
+def _select_index(completed: Optional[bool]) -> list[int]:
+    """
+    完了状態の絞り込み条件に対応するIDインデックスを選択
+
+    Args:
+        completed (Optional[bool]): True: 完了済みのみ、False: 未完了のみ、None: 絞り込みなし
+
+    Returns:
+        list[int]: 対応するソート済みIDインデックス
+    """
+    if completed is None:
+        return active_ids
+    return completed_ids if completed else open_ids
+
+
+def _reindex(todo: ToDoRecord, was_active: bool, was_completed: bool) -> None:
+    """
+    ToDoの状態変化に合わせて各IDインデックスを差分更新
+
+    Args:
+        todo (ToDoRecord): 更新後のToDoレコード
+        was_active (bool): 更新前の is_active
+        was_completed (bool): 更新前の completed
+    """
+    if was_active != todo.is_active:
+        if todo.is_active:
+            _index_add(active_ids, todo.id)
+        else:
+            _index_remove(active_ids, todo.id)
+
+    previous = (completed_ids if was_completed else open_ids) if was_active else None
+    current = (completed_ids if todo.completed else open_ids) if todo.is_active else None
+    if previous is not current:
+        if previous is not None:
+            _index_remove(previous, todo.id)
+        if current is not None:
+            _index_add(current, todo.id)
+
+
+def _apply_index_changes(index: list[int], removed: set[int], added: set[int]) -> None:
+    """
+    ソート済みIDインデックスに複数件の追加・削除をまとめて反映
+
+    件数が少ない場合は1件ずつ二分探索で反映し、多い場合は1回の走査と
+    ソート済みリストのマージで再構築します（O(n + k log k)）。
+
+    Args:
+        index (list[int]): ソート済みIDインデックス
+        removed (set[int]): 削除するID
+        added (set[int]): 追加するID
+    """
+    if len(removed) + len(added) < BULK_REINDEX_THRESHOLD:
+        for todo_id in removed:
+            _index_remove(index, todo_id)
+        for todo_id in sorted(added):
+            _index_add(index, todo_id)
+        return
+
+    remaining = [todo_id for todo_id in index if todo_id not in removed] if removed else index
+    index[:] = list(merge(remaining, sorted(added))) if added else remaining
+
+
+def _stamp_changes(todos: list[ToDoRecord]) -> None:
+    """
+    ToDoに連続した新しい変更シーケンス番号を付与し、変更シーケンス番号のインデックスに追加
+
+    番号の範囲はまとめて割り当て、インデックスへの追加も1回で行います。
+
+    Args:
+        todos (list[ToDoRecord]): 作成・更新されたToDoレコード（この順に番号を付与）
+    """
+    global change_sequence
+
+    # 更新前の番号のエントリは読み飛ばし対象になる
+    stale = sum(1 for todo in todos if todo.change_seq)
+    first_seq = change_sequence + 1
+    change_sequence += len(todos)
+    for change_seq, todo in enumerate(todos, start=first_seq):
+        todo.change_seq = change_seq
+    change_seqs.extend(range(first_seq, change_sequence + 1))
+    change_ids.extend(todo.id for todo in todos)
+    if stale:
+        _discard_change_entries(stale)
+
+
+def _discard_change_entries(count: int) -> None:
+    """
+    変更シーケンス番号のインデックスに読み飛ばし対象のエントリが増えたことを記録
+
+    読み飛ばし対象が全体の半数を超えた場合は、最新のエントリのみを残して詰め直します
+    （詰め直しの費用は変更1件あたり定数時間に償却されます）。
+
+    Args:
+        count (int): 読み飛ばし対象になったエントリ数
+    """
+    global change_stale
+
+    change_stale += count
+    if change_stale * 2 <= len(change_seqs):
+        return
+
+    current = [
+        (seq, todo_id) for seq, todo_id in zip(change_seqs, change_ids)
+        if (todo := todos_db.get(todo_id)) is not None and todo.change_seq == seq
+    ]
+    change_seqs[:] = [seq for seq, _ in current]
+    change_ids[:] = [todo_id for _, todo_id in current]
+    change_stale = 0
+
+
+def _purge_records(todo_ids: list[int]) -> None:
+    """
+    ToDoをデータベースから物理削除し、失われる変更の番号まで差分取得の下限を引き上げる
+
+    Args:
+        todo_ids (list[int]): 物理削除するToDo ID（存在しないIDは無視）
+    """
+    global change_floor
+
+    purged = 0
+    for todo_id in todo_ids:
+        todo = todos_db.pop(todo_id, None)
+        if todo is None:
+            continue
+        todos_json_cache.pop(todo_id, None)
+        change_floor = max(change_floor, todo.change_seq)
+        purged += 1
+    if purged:
+        _discard_change_entries(purged)
+
+
+def get_changed_todo_ids(since: int, limit: Optional[int] = None) -> Optional[tuple[list[int], int, bool]]:
+    """
+    指定された変更シーケンス番号より後に作成・更新されたToDoのIDを変更順に取得（差分同期用）
+
+    変更シーケンス番号のインデックスを二分探索して開始位置を求めるため、
+    ストア全体の件数ではなく since 以降の変更件数に比例した時間で取得できます。
+    論理削除されたToDoも含みます（クライアントが手元の行を削除できるように）。
+
+    Args:
+        since (int): クライアントが保持する変更シーケンス番号（0の場合はすべてのToDo）
+        limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+
+    Returns:
+        Optional[tuple[list[int], int, bool]]: ToDoのIDリスト（変更順）、次回の since に指定する
+        変更シーケンス番号、後続の変更が存在するかどうか。since 以降の変更が物理削除・初期化で
+        失われている、または since が現在の変更シーケンス番号より大きい場合は None
+    """
+    if since > change_sequence or 0 < since < change_floor:
+        return None
+
+    changed = []
+    last_seq = since
+    for position in range(bisect_right(change_seqs, since), len(change_seqs)):
+        seq = change_seqs[position]
+        todo = todos_db.get(change_ids[position])
+        if todo is None or todo.change_seq != seq:
+            continue
+        if limit is not None and len(changed) == limit:
+            return changed, last_seq, True
+        changed.append(todo.id)
+        last_seq = seq
+
+    return changed, change_sequence, False
+
+
+def _search_covers(todo_id: int) -> bool:
+    """指定されたIDのToDoが転置インデックスの差分更新の対象かどうか（構築済みの範囲内か）"""
+    return search_index_complete or todo_id <= search_indexed_upto
+
+
+def _search_index_add(todo: ToDoRecord) -> None:
+    """有効なToDoのトークンを転置インデックスに追加"""
+    for token in tokenize(todo.search_text()):
+        _index_add(search_index.setdefault(token, []), todo.id)
+
+
+def _search_index_remove(todo: ToDoRecord) -> None:
+    """ToDoのトークンを転置インデックスから削除"""
+    for token in tokenize(todo.search_text()):
+        postings = search_index.get(token)
+        if postings is not None:
+            _index_remove(postings, todo.id)
+            if not postings:
+                del search_index[token]
+
+
+def build_search_index_slice(max_ids: Optional[int] = None, budget: float = SEARCH_INDEX_BUILD_BUDGET) -> bool:
+    """
+    転置インデックスの構築を1区切り分進める
+
+    構築済みの範囲の次のIDから、budget 秒（または max_ids 件）に達するまで走査し、
+    有効なToDoを転置インデックスに追加します。1回の呼び出しでイベントループを止める時間は
+    budget 程度に収まります。構築中に作成されたToDoは未走査の範囲に含まれるため、走査時に反映されます。
+    構築済みの範囲のToDoは、作成・更新・論理削除のたびに差分更新されます。
+
+    Args:
+        max_ids (Optional[int]): 1回に走査するIDの範囲の上限（None の場合は budget のみで区切る）
+        budget (float): 1回の走査に使う時間の上限（秒）
+
+    Returns:
+        bool: 構築が完了しているかどうか
+    """
+    global search_indexed_upto, search_index_complete
+
+    if search_index_complete:
+        return True
+
+    last_id = next_id - 1
+    if max_ids is not None:
+        last_id = min(last_id, search_indexed_upto + max_ids)
+    deadline = time.perf_counter() + budget
+
+    todo_id = search_indexed_upto
+    while todo_id < last_id:
+        todo_id += 1
+        todo = todos_db.get(todo_id)
+        if todo is not None and todo.is_active:
+            # 構築済みの範囲より大きいIDを昇順に追加するため、末尾への追加でID昇順が保たれる
+            for token in tokenize(todo.search_text()):
+                postings = search_index.get(token)
+                if postings is None:
+                    search_index[token] = [todo_id]
+                else:
+                    postings.append(todo_id)
+        if todo_id % SEARCH_INDEX_BUILD_CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+            break
+
+    search_indexed_upto = todo_id
+    search_index_complete = todo_id >= next_id - 1
+    return search_index_complete
+
+
+async def build_search_index() -> None:
+    """
+    転置インデックスの構築が完了するまで、区切りごとにイベントループへ制御を返しながら構築する
+
+    起動時にバックグラウンドで実行し、最初の検索リクエストが構築を待たないようにします。
+    検索リクエストと同時に実行されても、区切りは await を挟まずに完結するため安全です。
+    """
+    while not build_search_index_slice():
+        await asyncio.sleep(0)
+
+
+def _contains_phrases(text: str, phrases: list[str]) -> bool:
+    """テキストが正規化済みのフレーズをすべて含むかどうか（正規化前のテキストで見つかれば正規化を省略）"""
+    normalized = None
+    for phrase in phrases:
+        if phrase in text:
+            continue
+        if normalized is None:
+            normalized = normalize_text(text)
+        if phrase not in normalized:
+            return False
+    return True
+
+
+def search_active_todo_ids(
+    query: str,
+    after_id: int = 0,
+    limit: Optional[int] = None,
+) -> tuple[list[int], bool]:
+    """
+    タイトル・説明にクエリのすべての語を含む有効なToDoのIDを取得（全文検索）
+
+    件数が最も少ないトークンのIDリストを先頭から区切りごとに取り出し、他のトークンの
+    IDリストの同じID範囲との積集合を求めます。limit 件が揃った時点で走査を終えるため、
+    ヒット件数の多いトークン同士の組み合わせでもIDリスト全体は走査しません。
+    転置インデックスの構築が完了している必要があります（build_search_index_slice）。
+
+    Args:
+        query (str): 検索クエリ（空白区切りの語はすべて含むものを検索）
+        after_id (int): このIDより大きいToDoのみを返す（0の場合は先頭から）
+        limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+
+    Returns:
+        tuple[list[int], bool]: 該当するToDoのIDリスト（昇順）と、後続データが存在するかどうか
+    """
+    tokens, phrases = parse_query(query)
+    if not tokens:
+        return [], False
+
+    postings = sorted((search_index.get(token, []) for token in tokens), key=len)
+    shortest, others = postings[0], postings[1:]
+
+    matched = []
+    position = bisect_right(shortest, after_id)
+    chunk_size = SEARCH_CHUNK_SIZE
+    while position < len(shortest):
+        # 最も短いIDリストの一部を候補とし、他のIDリストの同じID範囲と集合演算で絞り込む
+        chunk = shortest[position:position + chunk_size]
+        position += len(chunk)
+        if others:
+            candidates = set(chunk)
+            for index in others:
+                candidates.intersection_update(index[bisect_left(index, chunk[0]):bisect_right(index, chunk[-1])])
+                if not candidates:
+                    break
+            chunk = sorted(candidates)
+
+        for todo_id in chunk:
+            if phrases and not _contains_phrases(todos_db[todo_id].search_text(), phrases):
+                continue
+            if limit is not None and len(matched) == limit:
+                return matched, True
+            matched.append(todo_id)
+
+        # ヒット率の低いクエリでは候補の区切りを広げて走査回数を抑える
+        chunk_size *= 2
+
+    return matched, False
+
+
+def get_all_active_todos() -> list[ToDoRecord]:
     """
     有効なすべてのToDoを取得（is_active=True のみ）
 
+    論理削除済みのToDoは走査せず、有効IDインデックスを順に辿ります。
+
     Returns:
-        list[dict]: 有効なToDoのリスト（ID昇順）
+        list[ToDoRecord]: 有効なToDoのリスト（ID昇順）
     """
-    active_todos = [todo for todo in todos_db.values() if todo.get("is_active", False)]
-    # ID昇順でソート
-    return sorted(active_todos, key=lambda x: x["id"])
+    return [todos_db[todo_id] for todo_id in active_ids]
 
 
-def get_todo_by_id(todo_id: int) -> Optional[dict]:
+def get_active_todo_ids_page(
+    after_id: int = 0,
+    limit: Optional[int] = None,
+    completed: Optional[bool] = None,
+) -> tuple[list[int], bool]:
+    """
+    有効なToDoのIDをキーセット方式で取得（ページング用）
+
+    対象のIDインデックスを二分探索して開始位置を求めるため、
+    ストア全体の件数に関係なく O(log n + limit) で取得できます。
+
+    Args:
+        after_id (int): このIDより大きいToDoのみを返す（0の場合は先頭から）
+        limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+        completed (Optional[bool]): 完了状態での絞り込み（None の場合は絞り込みなし）
+
+    Returns:
+        tuple[list[int], bool]: 有効なToDoのIDリスト（昇順）と、後続データが存在するかどうか
+    """
+    index = _select_index(completed)
+    start = bisect_right(index, after_id)
+    end = len(index) if limit is None else min(start + limit, len(index))
+    return index[start:end], end < len(index)
+
+
+def get_todos_json(todo_ids: list[int]) -> list[bytes]:
+    """
+    指定されたIDのToDoをエンコード済みJSONバイト列として取得
+
+    エンコード結果はIDごとにキャッシュされ、update_todo で無効化されます。
+    キャッシュ済みのToDoはバリデーション・シリアライズを再実行しません。
+
+    Args:
+        todo_ids (list[int]): 存在するToDoのIDリスト
+
+    Returns:
+        list[bytes]: 各ToDoのJSONバイト列（todo_ids と同じ順序）
+    """
+    fragments = []
+    for todo_id in todo_ids:
+        fragment = todos_json_cache.get(todo_id)
+        if fragment is None:
+            fragment = todos_db[todo_id].to_json()
+            todos_json_cache[todo_id] = fragment
+        fragments.append(fragment)
+    return fragments
+
+
+def get_generation() -> int:
+    """
+    ストアの現在の世代番号を取得
+
+    世代番号はデータが変化するたびに増加するため、
+    同じ世代番号であれば同じ内容であることが保証されます（ETag用）。
+
+    Returns:
+        int: 現在の世代番号
+    """
+    return generation
+
+
+def render_active_todos_json() -> tuple[int, bytes]:
+    """
+    有効なすべてのToDoのJSON配列ボディを取得
+
+    生成したボディは世代番号とともにキャッシュされ、
+    次にデータが変化するまでは再構築せずに再利用します。
+
+    Returns:
+        tuple[int, bytes]: ボディ生成時の世代番号と、JSON配列のバイト列（ID昇順）
+    """
+    global active_todos_body_cache
+
+    if active_todos_body_cache is not None and active_todos_body_cache[0] == generation:
+        return active_todos_body_cache
+
+    body = b"[" + b",".join(get_todos_json(active_ids)) + b"]"
+    active_todos_body_cache = (generation, body)
+    return active_todos_body_cache
+
+
+def get_stats() -> dict[str, int]:
+    """
+    ToDoの件数統計を取得
+
+    各件数は create_todo / update_todo で差分更新されるIDインデックスの長さから求めるため、
+    ストアの件数に関係なく O(1) で取得できます。更新処理は await を挟まずに
+    完結するため、並行リクエスト下でも常に整合した値になります。
+    compact_deleted で物理削除されたToDoは total / deleted に含まれません。
+
+    Returns:
+        dict[str, int]: total / active / open / completed / deleted の各件数
+    """
+    total = len(todos_db)
+    active = len(active_ids)
+    return {
+        "total": total,
+        "active": active,
+        "open": len(open_ids),
+        "completed": len(completed_ids),
+        "deleted": total - active,
+    }
+
+
+def get_todo_by_id(todo_id: int) -> Optional[ToDoRecord]:
     """
     指定されたIDのToDoを取得
 
@@ -36,60 +700,503 @@ def get_todo_by_id(todo_id: int) -> Optional[dict]:
         todo_id (int): ToDo ID
 
     Returns:
-        Optional[dict]: 指定されたIDのToDoデータ、または None（存在しない場合）
+        Optional[ToDoRecord]: 指定されたIDのToDoレコード、または None（存在しない場合）
     """
     return todos_db.get(todo_id)
 
 
-def create_todo(todo_data: dict) -> dict:
+def _insert_record(todo_id: int, todo_data: dict) -> ToDoRecord:
+    """
+    ToDoデータからレコードを構築してデータベースと各IDインデックスに登録
+
+    Args:
+        todo_id (int): 割り当て済みのToDo ID
+        todo_data (dict): ToDoデータ（created_at / updated_at は datetime）
+
+    Returns:
+        ToDoRecord: 登録されたToDoレコード
+    """
+    # 同一の datetime はエポック秒も共有する
+    created_at = to_epoch_seconds(todo_data["created_at"])
+    updated_at = (
+        created_at if todo_data["updated_at"] == todo_data["created_at"]
+        else to_epoch_seconds(todo_data["updated_at"])
+    )
+    todo = ToDoRecord(
+        id=todo_id,
+        title=todo_data["title"],
+        description=todo_data.get("description"),
+        completed=todo_data.get("completed", False),
+        is_active=todo_data.get("is_active", True),
+        created_at=created_at,
+        updated_at=updated_at,
+    )
+    _register_record(todo)
+    return todo
+
+
+def _register_record(todo: ToDoRecord) -> None:
+    """
+    構築済みのレコードをデータベースと各IDインデックスに登録
+
+    Args:
+        todo (ToDoRecord): 登録するToDoレコード
+    """
+    # データベースに保存し、変更シーケンス番号を付与
+    todos_db[todo.id] = todo
+    _stamp_changes([todo])
+
+    # 各IDインデックスを更新
+    if todo.is_active:
+        _index_add(active_ids, todo.id)
+        _index_add(completed_ids if todo.completed else open_ids, todo.id)
+        if _search_covers(todo.id):
+            _search_index_add(todo)
+
+
+def create_todo(todo_data: dict) -> ToDoRecord:
     """
     新しいToDoを作成
 
     Args:
-        todo_data (dict): ToDoデータ（id, created_at, updated_at は自動設定）
+        todo_data (dict): ToDoデータ（id は自動設定、created_at / updated_at は datetime）
 
     Returns:
-        dict: 作成されたToDoデータ
+        ToDoRecord: 作成されたToDoレコード
     """
-    global next_id
+    global next_id, generation
 
     # 新しいIDを割り当て
-    todo_data["id"] = next_id
+    todo_id = next_id
     next_id += 1
 
-    # データベースに保存
-    todos_db[todo_data["id"]] = todo_data
+    todo = _insert_record(todo_id, todo_data)
+    _log({"op": "c", "rows": [todo.to_row()]})
+
+    generation += 1
 
-    return todo_data
+    return todo
 
 
-def update_todo(todo_id: int, updates: dict) -> Optional[dict]:
+def create_todos(todos_data: list[dict]) -> list[ToDoRecord]:
+    """
+    複数のToDoを一括作成
+
+    連続したIDブロックを一度に割り当て、await を挟まずに全件を登録するため、
+    他のリクエストから途中状態が見えることはありません。
+
+    Args:
+        todos_data (list[dict]): ToDoデータのリスト（id は自動設定、created_at / updated_at は datetime）
+
+    Returns:
+        list[ToDoRecord]: 作成されたToDoレコードのリスト（todos_data と同じ順序）
+    """
+    global next_id, generation
+
+    if not todos_data:
+        return []
+
+    # 連続したIDブロックを確保
+    first_id = next_id
+    next_id += len(todos_data)
+
+    created = [
+        _insert_record(todo_id, todo_data)
+        for todo_id, todo_data in enumerate(todos_data, start=first_id)
+    ]
+    _log({"op": "c", "rows": [todo.to_row() for todo in created]})
+
+    generation += 1
+
+    return created
+
+
+def update_todo(todo_id: int, updates: dict, only_active: bool = False) -> Optional[ToDoRecord]:
     """
     指定されたIDのToDoを更新
 
     Args:
         todo_id (int): ToDo ID
-        updates (dict): 更新するフィールドと値
+        updates (dict): 更新するフィールドと値（created_at / updated_at は datetime）
+        only_active (bool): True の場合、論理削除済みのToDoは更新しない
 
     Returns:
-        Optional[dict]: 更新後のToDoデータ、または None（存在しない場合）
+        Optional[ToDoRecord]: 更新後のToDoレコード、または None（存在しない、または only_active で論理削除済みの場合）
     """
+    global generation
+
     todo = todos_db.get(todo_id)
-    if todo is None:
+    if todo is None or (only_active and not todo.is_active):
         return None
 
-    # 更新を適用
-    todo.update(updates)
+    was_active = todo.is_active
+    was_completed = todo.completed
+
+    # 検索対象のフィールドが変化する場合は、更新前のトークンを転置インデックスから削除
+    reindex_search = _search_covers(todo_id) and not SEARCH_FIELDS.isdisjoint(updates)
+    if reindex_search and was_active:
+        _search_index_remove(todo)
+
+    # 更新を適用し、エンコード済みJSONキャッシュを無効化
+    updates = ToDoRecord.normalize_updates(updates)
+    todo._apply_normalized(updates)
+    todos_json_cache.pop(todo_id, None)
+    _stamp_changes([todo])
+    _log({"op": "u", "ids": [todo_id], "set": updates})
+
+    if reindex_search and todo.is_active:
+        _search_index_add(todo)
+
+    # is_active / completed が変化した場合のみIDインデックスを更新
+    _reindex(todo, was_active, was_completed)
+
+    generation += 1
 
     return todo
 
 
+def update_todos(todo_ids: list[int], updates: dict, only_active: bool = False) -> list[ToDoRecord]:
+    """
+    複数のToDoに同じ更新を一括適用
+
+    全件に更新を適用したうえで、各IDインデックスへの変更を1回の走査で反映します。
+    await を挟まずに完結するため、他のリクエストから途中状態が見えることはありません。
+
+    Args:
+        todo_ids (list[int]): 更新対象のToDo ID（存在しないIDは無視）
+        updates (dict): 更新するフィールドと値（created_at / updated_at は datetime）
+        only_active (bool): True の場合、論理削除済みのToDoは更新しない（無視する）
+
+    Returns:
+        list[ToDoRecord]: 更新後のToDoレコードのリスト（todo_ids の順序、重複は除外）
+    """
+    global generation
+
+    # タイムスタンプは1回だけエポック秒に変換しておく
+    updates = ToDoRecord.normalize_updates(updates)
+
+    # 状態遷移（更新前の状態, 更新後の状態）ごとにIDをまとめる
+    # 状態は論理削除済みなら None、有効なら completed の値
+    transitions: dict[tuple[Optional[bool], Optional[bool]], list[int]] = {}
+
+    # 転置インデックスへの変更（トークンごとの削除・追加ID）
+    reindex_search = not SEARCH_FIELDS.isdisjoint(updates)
+    search_changes: dict[str, tuple[set[int], set[int]]] = {}
+
+    updated = []
+    seen = set()
+    for todo_id in todo_ids:
+        todo = todos_db.get(todo_id)
+        if todo is None or todo_id in seen or (only_active and not todo.is_active):
+            continue
+        seen.add(todo_id)
+
+        before = todo.completed if todo.is_active else None
+
+        search_covered = reindex_search and _search_covers(todo_id)
+        if search_covered and todo.is_active:
+            for token in tokenize(todo.search_text()):
+                search_changes.setdefault(token, (set(), set()))[0].add(todo_id)
+
+        # 変換済みの更新を適用し、エンコード済みJSONキャッシュを無効化
+        todo._apply_normalized(updates)
+        todos_json_cache.pop(todo_id, None)
+
+        if search_covered and todo.is_active:
+            for token in tokenize(todo.search_text()):
+                search_changes.setdefault(token, (set(), set()))[1].add(todo_id)
+
+        after = todo.completed if todo.is_active else None
+        if before is not after:
+            transitions.setdefault((before, after), []).append(todo_id)
+
+        updated.append(todo)
+
+    # 更新したToDoに todo_ids の順で連続した変更シーケンス番号を付与
+    _stamp_changes(updated)
+
+    # インデックスへの変更をまとめて反映
+    changes = {id(index): (index, set(), set()) for index in (active_ids, completed_ids, open_ids)}
+    for (before, after), changed_ids in transitions.items():
+        if (before is None) != (after is None):
+            _, removed, added = changes[id(active_ids)]
+            (added if before is None else removed).update(changed_ids)
+        if before is not None:
+            changes[id(_select_index(before))][1].update(changed_ids)
+        if after is not None:
+            changes[id(_select_index(after))][2].update(changed_ids)
+
+    for index, removed, added in changes.values():
+        if removed or added:
+            _apply_index_changes(index, removed, added)
+
+    for token, (removed, added) in search_changes.items():
+        # 更新前後でトークンが変わらないIDは反映不要
+        removed, added = removed - added, added - removed
+        if removed or added:
+            postings = search_index.setdefault(token, [])
+            _apply_index_changes(postings, removed, added)
+            if not postings:
+                del search_index[token]
+
+    if updated:
+        _log({"op": "u", "ids": [todo.id for todo in updated], "set": updates})
+        generation += 1
+
+    return updated
+
+
+def compact_deleted(deleted_before: datetime, after_id: int = 0, max_ids: int = 1000) -> tuple[int, Optional[int]]:
+    """
+    論理削除済みのToDo（トゥームストーン）のうち、保持期間を過ぎたものを物理削除
+
+    ID範囲 (after_id, after_id + max_ids] のみを走査するため、1回の呼び出しにかかる時間は
+    ストアの件数に関係なく一定です。戻り値のカーソルを after_id に渡して繰り返し呼び出すことで、
+    全件を少しずつ処理できます。物理削除したIDは get_todo_by_id で None となり、
+    論理削除済みのIDと同様に「存在しない」ものとして扱われます（IDは再利用されません）。
+
+    Args:
+        deleted_before (datetime): この日時より前に更新（論理削除）されたToDoを削除対象とする
+        after_id (int): このIDより大きいToDoから走査する
+        max_ids (int): 1回に走査するIDの範囲
+
+    Returns:
+        tuple[int, Optional[int]]: 物理削除した件数と、次に走査を開始するカーソル（末尾まで走査した場合は None）
+    """
+    threshold = to_epoch_seconds(deleted_before)
+    end = min(after_id + max_ids, next_id - 1)
+
+    purged = []
+    for todo_id in range(after_id + 1, end + 1):
+        todo = todos_db.get(todo_id)
+        if todo is not None and not todo.is_active and todo.updated_at < threshold:
+            purged.append(todo_id)
+
+    # 論理削除済みのToDoはIDインデックスに含まれないため、データベースとキャッシュからのみ削除する
+    _purge_records(purged)
+    if purged:
+        _log({"op": "p", "ids": purged})
+
+    return len(purged), (end if end < next_id - 1 else None)
+
+
 def clear_database() -> None:
     """
     データベースを初期化（テスト用）
 
     すべてのToDoデータを削除し、next_idを1にリセットします。
+    世代番号は初期化前のETagと衝突しないよう、リセットせずに増加させます。
+    変更シーケンス番号もリセットせずに1つ進め、初期化前の番号からの差分取得はできなくなります。
     """
-    global next_id
+    global next_id, generation, active_todos_body_cache, search_indexed_upto, search_index_complete
+    global change_sequence, change_floor, change_stale
     todos_db.clear()
-    next_id = 1
\ No newline at end of file
+    active_ids.clear()
+    completed_ids.clear()
+    open_ids.clear()
+    todos_json_cache.clear()
+    active_todos_body_cache = None
+    search_index.clear()
+    search_indexed_upto = 0
+    search_index_complete = False
+    change_seqs.clear()
+    change_ids.clear()
+    change_stale = 0
+    change_sequence += 1
+    change_floor = change_sequence
+    next_id = 1
+    generation += 1
+    _log({"op": "x"})
+
+
+def _log(entry: dict) -> None:
+    """
+    変更内容を追記型ログに書き込む（ログ未設定の場合は何もしない）
+
+    Args:
+        entry (dict): ログレコード（op: c=作成, u=更新, p=物理削除, x=初期化）
+    """
+    global last_lsn
+    if wal is not None:
+        last_lsn = wal.append(entry)
+
+
+def attach_wal(log: Optional[WriteAheadLog]) -> None:
+    """
+    以降の変更を記録する追記型ログを設定
+
+    Args:
+        log (Optional[WriteAheadLog]): 追記型ログ（None の場合は永続化を無効化）
+    """
+    global wal, last_lsn
+    wal = log
+    last_lsn = log.appended_lsn if log is not None else 0
+
+
+async def wait_for_durability() -> None:
+    """
+    これまでの変更が追記型ログに永続化されるまで待機
+
+    グループコミットにより、並行するリクエストの変更は1回のfsyncでまとめて永続化されます。
+    追記型ログが未設定の場合は即座に戻ります。
+    """
+    if wal is not None:
+        await wal.wait_durable(last_lsn)
+
+
+def apply_log_entry(entry: dict) -> None:
+    """
+    ログレコード1件をデータストアに適用（再生用、ログへの書き込みは行わない）
+
+    Args:
+        entry (dict): ログレコード
+    """
+    global next_id, generation, wal
+
+    attached, wal = wal, None
+    try:
+        if entry["op"] == "c":
+            for row in entry["rows"]:
+                todo = ToDoRecord.from_row(row)
+                _register_record(todo)
+                next_id = max(next_id, todo.id + 1)
+            generation += 1
+        elif entry["op"] == "u":
+            update_todos(entry["ids"], entry["set"])
+        elif entry["op"] == "p":
+            _purge_records(entry["ids"])
+        elif entry["op"] == "x":
+            clear_database()
+    finally:
+        wal = attached
+
+
+def replay_wal(path: str, after_lsn: int = 0) -> int:
+    """
+    追記型ログを再生してデータストアを復元
+
+    Args:
+        path (str): ログファイルのパス
+        after_lsn (int): このLSNより後のレコードのみを再生（スナップショット適用後の場合）
+
+    Returns:
+        int: 最後に適用したレコードのLSN（適用したレコードがない場合は after_lsn）
+    """
+    lsn = after_lsn
+    for entry in read_wal(path, after_lsn):
+        apply_log_entry(entry)
+        lsn = entry["n"]
+    return lsn
+
+
+def _iter_snapshot_rows(upto_id: int) -> Iterator[list]:
+    """
+    スナップショット用に upto_id 未満のレコードをID昇順に取り出す
+
+    別スレッドから呼び出されるため、辞書を直接走査せずIDの範囲で参照します。
+    走査中に変更されたレコードは、スナップショット時点以降の追記型ログの再生で補正されます。
+
+    Args:
+        upto_id (int): 走査するIDの上限（このIDは含まない）
+
+    Yields:
+        list: ToDoRecord.to_row 形式のレコードの末尾に変更シーケンス番号を加えたもの
+    """
+    for todo_id in range(1, upto_id):
+        todo = todos_db.get(todo_id)
+        if todo is not None:
+            row = todo.to_row()
+            row.append(todo.change_seq)
+            yield row
+
+
+async def save_snapshot(path: str) -> int:
+    """
+    データストアのスナップショットを保存し、反映済みの追記型ログを切り詰める
+
+    開始時点のLSNと next_id を記録したうえで、書き出しは別スレッドで行い
+    イベントループをブロックしません。書き出し中の変更はスナップショットに
+    含まれる場合も含まれない場合もありますが、記録したLSNより後のログを
+    再生することで常に正しい状態に復元されます（ファジースナップショット）。
+
+    Args:
+        path (str): スナップショットファイルのパス
+
+    Returns:
+        int: スナップショットに反映済みのLSN
+    """
+    lsn = last_lsn
+    upto_id = next_id
+    await asyncio.to_thread(
+        write_snapshot, path, _iter_snapshot_rows(upto_id), upto_id, lsn, change_sequence, change_floor,
+    )
+
+    if wal is not None:
+        wal.truncate(lsn)
+
+    return lsn
+
+
+def restore_snapshot(path: str) -> int:
+    """
+    スナップショットからデータストアを復元（ログへの書き込みは行わない）
+
+    Args:
+        path (str): スナップショットファイルのパス
+
+    Returns:
+        int: スナップショットに反映済みのLSN（この後のログを再生する）
+    """
+    global next_id, generation, wal, change_sequence, change_floor
+
+    snapshot_next_id, lsn, snapshot_change_sequence, snapshot_change_floor, rows = read_snapshot(path)
+
+    attached, wal = wal, None
+    try:
+        clear_database()
+    finally:
+        wal = attached
+
+    # 大量件数を読み込むため、インデックスは末尾に追加してから最後に1回だけ整列する。
+    # 循環参照を持たないレコードを大量に生成するので、読み込み中は循環GCを止める
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        add_active, add_completed, add_open = active_ids.append, completed_ids.append, open_ids.append
+        add_change_seq, add_change_id = change_seqs.append, change_ids.append
+        unstamped = []
+        for row in rows:
+            todo = ToDoRecord(*row)
+            todos_db[todo.id] = todo
+            if todo.is_active:
+                add_active(todo.id)
+                (add_completed if todo.completed else add_open)(todo.id)
+            if todo.change_seq:
+                add_change_seq(todo.change_seq)
+                add_change_id(todo.id)
+            else:
+                unstamped.append(todo)
+        for index in (active_ids, completed_ids, open_ids):
+            index.sort()
+
+        # 変更シーケンス番号のインデックスを番号順に並べ替える
+        by_seq = dict(zip(change_seqs, change_ids))
+        change_seqs.sort()
+        change_ids[:] = [by_seq[seq] for seq in change_seqs]
+        del by_seq
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # ファジースナップショットには記録時点より後の変更シーケンス番号を持つレコードが含まれうるため、
+    # 以降に割り当てる番号がそれらと重複しないようにする（番号が大きくなる方向のずれは差分が増えるだけで欠落しない）
+    change_sequence = max(snapshot_change_sequence, change_seqs[-1] if change_seqs else 0)
+    change_floor = snapshot_change_floor
+
+    # 旧形式のスナップショットのレコードにはID順に番号を付与する
+    _stamp_changes(unstamped)
+
+    next_id = max(next_id, snapshot_next_id)
+    generation += 1
+
+    return lsn
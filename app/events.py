@@ -0,0 +1,237 @@
+"""
+変更フィード
+
+このモジュールは、ToDoの作成・完了化・削除をServer-Sent Events（SSE）で配信するための
+変更フィードを提供します。各イベントのIDは「エポック-変更シーケンス番号」の形式です。
+エポックはプロセスの起動ごと（およびストアの初期化などで変更シーケンス番号が戻ったとき）に
+異なる値で、変更シーケンス番号はイベントに含まれる最後のToDoのストアの変更シーケンス番号
+（差分同期 GET /todos?since= と同じ番号）です。
+クライアントは Last-Event-ID を指定して切断後に続きから再開できます。
+
+配信はブロックしません。イベントは購読者ごとの上限付きキューに積まれ、
+キューが溢れた（受信が追いつかない）購読者はキューごと破棄して切断します。
+購読者がいない間はイベントを構築せず履歴にも残さないため、その間の変更は再送できません
+（再開時には reset イベントを送ります）。
+"""
+
+import asyncio
+import secrets
+from collections import deque
+from typing import Optional
+
+from app.database import ToDoRecord
+
+
+# 再開用に保持する直近のイベントの合計サイズ（バイト）
+DEFAULT_HISTORY_BYTES = 8 * 1024 * 1024
+
+# 購読者ごとのキューの上限（これを超えた購読者は切断）
+DEFAULT_QUEUE_SIZE = 1_000
+
+# 1イベントに含めるToDoの最大件数（一括操作の変更はこの件数ごとのイベントに分割する）
+DEFAULT_CHUNK_SIZE = 500
+
+# 破棄した購読者のキューに入れる終了の合図（イベントのメッセージは空にならないため区別できる）
+END_OF_STREAM = b""
+
+
+def format_event(event_id: str, event_type: str, data: bytes) -> bytes:
+    """
+    SSE形式のイベントメッセージを生成
+
+    Args:
+        event_id (str): イベントID
+        event_type (str): イベント種別
+        data (bytes): イベントデータ（1行のJSON）
+
+    Returns:
+        bytes: SSEメッセージ
+    """
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event_type.encode(), data)
+
+
+class Subscription:
+    """変更フィードの購読
+
+    backlog には購読開始時に再送するイベント、queue には以降に発生したイベントが入ります。
+    キューが溢れた場合は dropped が True になり、キューの内容は破棄されて END_OF_STREAM だけが入ります。
+    """
+
+    __slots__ = ("backlog", "queue", "dropped")
+
+    def __init__(self, backlog: list[bytes], queue_size: int):
+        self.backlog = backlog
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class ChangeFeed:
+    """ToDoの変更フィード
+
+    publish はイベントをエンコードして履歴に追加し、全購読者のキューへ put_nowait で積むだけで、
+    購読者の受信を待ちません。エンコードはイベントごとに1回で、全購読者で共有します。
+    購読者がいない場合はエンコードせずに戻ります。
+    """
+
+    def __init__(
+        self,
+        history_bytes: int = DEFAULT_HISTORY_BYTES,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            history_bytes (int): 再開用に保持する直近のイベントの合計サイズ（バイト）
+            queue_size (int): 購読者ごとのキューの上限
+            chunk_size (int): 1イベントに含めるToDoの最大件数
+        """
+        # プロセスの起動ごとのエポック（他のプロセス・再起動前に発行されたイベントIDを判別する）
+        self.epoch = secrets.token_hex(4)
+        # 最後に発行したイベント（購読者がいないため構築を省略したものを含む）の変更シーケンス番号
+        self.sequence = 0
+        self.history_bytes = history_bytes
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self._history: deque[tuple[int, bytes]] = deque()
+        self._history_size = 0
+        # この番号以前のイベントは履歴に残っていない（履歴から追い出した、または構築を省略した）
+        self._replay_floor = 0
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        """現在の購読者数"""
+        return len(self._subscribers)
+
+    def event_id(self, sequence: int) -> str:
+        """
+        変更シーケンス番号からイベントIDを生成
+
+        Args:
+            sequence (int): 変更シーケンス番号
+
+        Returns:
+            str: 「エポック-変更シーケンス番号」形式のイベントID
+        """
+        return f"{self.epoch}-{sequence}"
+
+    def publish(self, event_type: str, todos: list[ToDoRecord]) -> Optional[str]:
+        """
+        イベントを発行して全購読者に配信（ブロックしない）
+
+        chunk_size 件を超える変更は、chunk_size 件ごとのイベントに分割します。
+        各イベントのIDは、そのイベントに含まれる最後のToDoの変更シーケンス番号です。
+
+        Args:
+            event_type (str): イベント種別（created / completed / deleted）
+            todos (list[ToDoRecord]): 変更されたToDo（変更シーケンス番号の昇順）
+
+        Returns:
+            Optional[str]: 最後に発行したイベントのID（変更がない、または購読者がいない場合は None）
+        """
+        if not todos:
+            return None
+        if todos[0].change_seq <= self.sequence:
+            # 変更シーケンス番号が戻った（ストアの初期化・差し替え）場合は、以前のIDで再開させない
+            self._rotate()
+        self.sequence = todos[-1].change_seq
+
+        # 購読者がいなければイベントを構築せず、ここまでの履歴からは再送できないものとする
+        if not self._subscribers:
+            self._history.clear()
+            self._history_size = 0
+            self._replay_floor = self.sequence
+            return None
+
+        event_id = None
+        for start in range(0, len(todos), self.chunk_size):
+            chunk = todos[start:start + self.chunk_size]
+            sequence = chunk[-1].change_seq
+            event_id = self.event_id(sequence)
+            data = b'{"todos":[' + b",".join(todo.to_json() for todo in chunk) + b"]}"
+            message = format_event(event_id, event_type, data)
+            self._remember(sequence, message)
+
+            for subscription in list(self._subscribers):
+                try:
+                    subscription.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+
+        return event_id
+
+    def _rotate(self) -> None:
+        """エポックを更新して履歴を破棄する（以前に発行したイベントIDでの再開は reset になる）"""
+        self.epoch = secrets.token_hex(4)
+        self._history.clear()
+        self._history_size = 0
+        self._replay_floor = 0
+
+    def _remember(self, sequence: int, message: bytes) -> None:
+        """イベントを履歴に追加し、合計サイズが上限を超えた分を古い順に追い出す"""
+        self._history.append((sequence, message))
+        self._history_size += len(message)
+        while self._history_size > self.history_bytes:
+            evicted, evicted_message = self._history.popleft()
+            self._history_size -= len(evicted_message)
+            self._replay_floor = evicted
+
+    def _parse_event_id(self, event_id: str) -> Optional[int]:
+        """このプロセスが発行したイベントIDであれば変更シーケンス番号を返す（それ以外は None）"""
+        epoch, _, sequence = event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        変更フィードを購読
+
+        last_event_id が指定された場合は、それより後のイベントを履歴から再送します。
+        履歴に残っていない（古すぎる、購読者がいない間に発生した、他のプロセス・再起動前に発行された、
+        または不正・未来の）IDの場合は、取りこぼしがあることを示す reset イベントを送ります
+        （クライアントは一覧を取得し直す必要があります）。
+
+        Args:
+            last_event_id (Optional[str]): クライアントが最後に受信したイベントID（Last-Event-ID）
+
+        Returns:
+            Subscription: 購読
+        """
+        backlog = []
+        if last_event_id is not None:
+            after = self._parse_event_id(last_event_id)
+            if after is None or not self._replay_floor <= after <= self.sequence:
+                backlog.append(format_event(self.event_id(self.sequence), "reset", b"{}"))
+            else:
+                for sequence, message in reversed(self._history):
+                    if sequence <= after:
+                        break
+                    backlog.append(message)
+                backlog.reverse()
+
+        subscription = Subscription(backlog, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        購読を終了
+
+        Args:
+            subscription (Subscription): subscribe で取得した購読
+        """
+        self._subscribers.discard(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        """受信が追いつかない購読者のキューを破棄して購読を終了させる"""
+        self._subscribers.discard(subscription)
+        subscription.dropped = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        # キューを待機中のストリームをキープアライブの間隔を待たずに終了させる
+        subscription.queue.put_nowait(END_OF_STREAM)
+
+
+# グローバル変数：APIが使用する変更フィード
+change_feed = ChangeFeed()
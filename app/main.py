@@ -5,23 +5,203 @@ FastAPIアプリケーションのエントリーポイント
 ルーターの登録とエラーハンドラの設定を行います。
 """
 
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+
+from app.admission import AdmissionMiddleware, admission
+from app.config import load_settings
+from app import database
+from app.database import attach_wal, build_search_index, replay_wal, restore_snapshot, save_snapshot
+from app.metrics import METRICS_MEDIA_TYPE, MetricsMiddleware, metrics
+from app.models import (
+    ChangesExpiredException,
+    InvalidCursorException,
+    ProfileNotFoundException,
+    ToDoNotFoundException,
+)
+from app.profiling import profiler
+from app.routers import profiles, todos
+from app.sqlite_storage import SQLiteStorage
+from app.stall_detector import StallDetector, endpoint_names
+from app.storage import InMemoryStorage, get_storage, set_storage
+from app.utils.datetime_utils import get_current_jst_time
+from app.utils.json_utils import FastJSONResponse, set_json_encoder
+from app.wal import WriteAheadLog
+from app.worker_lock import acquire_worker_lock, release_worker_lock
+
+
+async def snapshot_periodically(path: str, interval: float, min_entries: int, snapshot_lsn: int) -> None:
+    """
+    一定間隔でログの追記件数を確認し、必要に応じてスナップショットを取得するバックグラウンドタスク
+
+    Args:
+        path (str): スナップショットファイルのパス
+        interval (float): 確認間隔（秒）
+        min_entries (int): スナップショットを取得するログ追記件数のしきい値
+        snapshot_lsn (int): 直近のスナップショットに反映済みのLSN
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if database.last_lsn - snapshot_lsn >= min_entries:
+            snapshot_lsn = await save_snapshot(path)
+
+
+async def compact_periodically(retention: float, interval: float, slice_size: int) -> None:
+    """
+    一定間隔で保持期間を過ぎた論理削除済みのToDoを物理削除するバックグラウンドタスク
+
+    ID範囲 slice_size ごとに区切って処理し、区切りごとにイベントループへ制御を返すため、
+    件数が多い場合でも他のリクエストを長時間待たせません。
+
+    Args:
+        retention (float): 論理削除済みのToDoを保持する期間（秒）
+        interval (float): 実行間隔（秒）
+        slice_size (int): 1回に走査するIDの範囲
+    """
+    while True:
+        await asyncio.sleep(interval)
+        deleted_before = get_current_jst_time() - timedelta(seconds=retention)
+        after_id = 0
+        while after_id is not None:
+            _, after_id = await get_storage().compact_deleted(deleted_before, after_id, slice_size)
+            await asyncio.sleep(0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    アプリケーションの起動・終了処理
+
+    TODO_STORAGE が sqlite の場合は、SQLiteストレージを開いてAPIのストレージを差し替えます。
+    SQLiteストレージは複数のワーカープロセスで共有できます。インメモリストレージの場合は
+    複数のワーカーで起動されていないことを確認し、2つ目以降のワーカーは起動に失敗します。
+    インメモリストレージで TODO_WAL_PATH が設定されている場合、起動時に最新のスナップショットを読み込み、
+    それ以降の追記型ログのみを再生してデータを復元します。以降の変更はログに記録し、
+    ログが一定件数たまるごとにスナップショットを取得します。
+    インメモリストレージでは、全文検索の転置インデックスをバックグラウンドで少しずつ構築します。
+    TODO_TOMBSTONE_RETENTION_S が設定されている場合、保持期間を過ぎた論理削除済みのToDoを
+    定期的に物理削除します。
+    レスポンスのJSONエンコーダは TODO_JSON_ENCODER で選択します（既定は orjson があれば orjson）。
+    TODO_PROFILING / TODO_PROFILE_SAMPLE_N が設定されている場合、ToDoエンドポイントをプロファイリングします。
+    イベントループの遅延を継続的に計測し、TODO_STALL_THRESHOLD_MS を超える停止を
+    エンドポイントごとに記録します。
+    TODO_ADMISSION_MAX_CONCURRENCY が設定されている場合、同時処理数を制限し、超過分を待ち行列で待たせます。
+    終了時には未書き込みのログを書き出して閉じます。
+
+    Args:
+        app (FastAPI): FastAPIアプリケーション
+    """
+    settings = load_settings()
+    set_json_encoder(settings.json_encoder)
+    profiler.configure(settings.profiling, settings.profile_sample_every, settings.profile_buffer_size)
+    admission.configure(
+        settings.admission_max_concurrency,
+        settings.admission_queue_size,
+        settings.admission_queue_timeout,
+        dict(settings.admission_route_limits),
+        settings.admission_retry_after,
+        app.routes,
+    )
+
+    log = None
+    snapshot_task = None
+    search_index_task = None
+    sqlite_storage = None
+    previous_storage = None
+    worker_lock = None
+    if settings.storage == "sqlite":
+        sqlite_storage = SQLiteStorage(
+            settings.sqlite_path,
+            pool_size=settings.sqlite_pool_size,
+            id_block_size=settings.sqlite_id_block_size,
+        )
+        previous_storage = set_storage(sqlite_storage)
+    else:
+        worker_lock = acquire_worker_lock()
+
+        if settings.wal_path:
+            snapshot_lsn = 0
+            if os.path.exists(settings.snapshot_path):
+                snapshot_lsn = restore_snapshot(settings.snapshot_path)
+            lsn = replay_wal(settings.wal_path, after_lsn=snapshot_lsn)
+
+            log = WriteAheadLog(
+                settings.wal_path,
+                fsync_policy=settings.wal_fsync,
+                group_commit_window=settings.wal_group_commit_window,
+                fsync_interval=settings.wal_fsync_interval,
+                start_lsn=lsn,
+            )
+            attach_wal(log)
+            snapshot_task = asyncio.create_task(snapshot_periodically(
+                settings.snapshot_path,
+                settings.snapshot_interval,
+                settings.snapshot_min_entries,
+                snapshot_lsn,
+            ))
 
-from app.models import ToDoNotFoundException
-from app.routers import todos
+        # 最初の検索リクエストが構築を待たないよう、起動時から構築を進める
+        search_index_task = asyncio.create_task(build_search_index())
+
+    compaction_task = None
+    if settings.tombstone_retention is not None:
+        compaction_task = asyncio.create_task(compact_periodically(
+            settings.tombstone_retention,
+            settings.compaction_interval,
+            settings.compaction_slice_size,
+        ))
+
+    stall_detector = None
+    if settings.stall_threshold > 0:
+        stall_detector = StallDetector(settings.stall_threshold, settings.stall_interval, endpoint_names(app.routes))
+        stall_detector.start()
+
+    try:
+        yield
+    finally:
+        if stall_detector is not None:
+            await stall_detector.stop()
+        for task in (compaction_task, snapshot_task, search_index_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        if log is not None:
+            attach_wal(None)
+            log.close()
+        if sqlite_storage is not None:
+            set_storage(previous_storage)
+            await sqlite_storage.close()
+        release_worker_lock(worker_lock)
+        profiler.configure(False, 0, settings.profile_buffer_size)
+        admission.configure(0, 0, 0.0, {})
 
 
 # FastAPIアプリケーションの作成
 app = FastAPI(
     title="ToDo API",
     version="1.0.0",
-    description="簡易ToDo管理のためのREST API（インメモリ実装）",
+    description="簡易ToDo管理のためのREST API（インメモリ・SQLiteのストレージに対応、TODO_STORAGE で選択）",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 
-# ToDoルーターの登録
+# ミドルウェアの登録（後に登録したものほど外側で実行される）
+# 拒否したリクエストもメトリクスに記録されるよう、メトリクス収集をアドミッション制御の外側に配置する
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+# ToDoルーター・プロファイリング結果ルーターの登録
 app.include_router(todos.router)
+app.include_router(profiles.router)
 
 
 # カスタム例外ハンドラ：ToDoNotFoundException（404）
@@ -37,6 +217,7 @@ async def todo_not_found_handler(request: Request, exc: ToDoNotFoundException) -
     Returns:
         JSONResponse: 404エラーレスポンス
     """
+    metrics.todo_not_found += 1
     return JSONResponse(
         status_code=404,
         content={
@@ -46,6 +227,72 @@ async def todo_not_found_handler(request: Request, exc: ToDoNotFoundException) -
     )
 
 
+# カスタム例外ハンドラ：InvalidCursorException（400）
+@app.exception_handler(InvalidCursorException)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorException) -> JSONResponse:
+    """
+    ページングカーソルが不正な場合のエラーハンドラ
+
+    Args:
+        request (Request): HTTPリクエスト
+        exc (InvalidCursorException): カスタム例外
+
+    Returns:
+        JSONResponse: 400エラーレスポンス
+    """
+    return JSONResponse(
+        status_code=400,
+        content={
+            "detail": str(exc),
+            "error_code": "INVALID_CURSOR"
+        }
+    )
+
+
+# カスタム例外ハンドラ：ChangesExpiredException（410）
+@app.exception_handler(ChangesExpiredException)
+async def changes_expired_handler(request: Request, exc: ChangesExpiredException) -> JSONResponse:
+    """
+    差分取得できない変更シーケンス番号が指定された場合のエラーハンドラ
+
+    Args:
+        request (Request): HTTPリクエスト
+        exc (ChangesExpiredException): カスタム例外
+
+    Returns:
+        JSONResponse: 410エラーレスポンス
+    """
+    return JSONResponse(
+        status_code=410,
+        content={
+            "detail": str(exc),
+            "error_code": "CHANGES_EXPIRED"
+        }
+    )
+
+
+# カスタム例外ハンドラ：ProfileNotFoundException（404）
+@app.exception_handler(ProfileNotFoundException)
+async def profile_not_found_handler(request: Request, exc: ProfileNotFoundException) -> JSONResponse:
+    """
+    プロファイリング結果が見つからない場合のエラーハンドラ
+
+    Args:
+        request (Request): HTTPリクエスト
+        exc (ProfileNotFoundException): カスタム例外
+
+    Returns:
+        JSONResponse: 404エラーレスポンス
+    """
+    return JSONResponse(
+        status_code=404,
+        content={
+            "detail": str(exc),
+            "error_code": "PROFILE_NOT_FOUND"
+        }
+    )
+
+
 # 汎用例外ハンドラ：すべての予期しない例外（500）
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -81,3 +328,34 @@ async def health_check():
         "status": "ok",
         "message": "ToDo API is running"
     }
+
+
+# メトリクスエンドポイント
+@app.get("/metrics", tags=["Health"], response_class=Response)
+async def get_metrics() -> Response:
+    """
+    メトリクスをPrometheusのテキスト形式で取得
+
+    ルートごとのリクエスト件数・レイテンシヒストグラム、処理中のリクエスト数、
+    存在しないToDoへのリクエスト件数に加えて、ストアの件数（全件・有効・論理削除済み）を出力します。
+    インメモリストレージの場合は次に割り当てるIDも出力します。
+
+    Returns:
+        Response: Prometheusテキスト形式のメトリクス
+    """
+    storage = get_storage()
+    stats = await storage.get_stats()
+    gauges = [
+        ("todo_store_rows", "ToDos in the store including tombstones.", stats["total"]),
+        ("todo_store_active_rows", "ToDos that are not deleted.", stats["active"]),
+        ("todo_store_tombstones", "Soft-deleted ToDos not yet compacted.", stats["deleted"]),
+    ]
+    if isinstance(storage, InMemoryStorage):
+        gauges.append(("todo_store_next_id", "ID assigned to the next created ToDo.", database.next_id))
+    if admission.enabled:
+        gauges += [
+            ("todo_admission_active", "Requests admitted and being processed.", admission.active),
+            ("todo_admission_queue_depth", "Requests waiting in the admission queue.", admission.queue_depth),
+        ]
+
+    return Response(content=metrics.render(gauges), media_type=METRICS_MEDIA_TYPE)
@@ -0,0 +1,264 @@
+"""
+メトリクス収集
+
+このモジュールは、リクエストの件数・レイテンシなどのメトリクスを収集し、
+Prometheusのテキスト形式（GET /metrics）で出力する機能を提供します。
+
+記録はASGIミドルウェアからイベントループ上でのみ行われるため、ロックは使用せず、
+整数の加算とリストの要素更新だけで記録します（1リクエストあたり数マイクロ秒）。
+ヒストグラムはバケットごとの件数を保持し、累積値への変換は出力時に行います。
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+
+# レイテンシヒストグラムのバケット上限（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ルーティングに一致しなかったリクエストのルートラベル（パスをそのまま使うとラベルが際限なく増えるため）
+UNMATCHED_ROUTE = "<unmatched>"
+
+# PrometheusテキストフォーマットのContent-Type
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LatencyHistogram:
+    """レイテンシヒストグラム（バケットごとの件数、合計、件数）"""
+
+    __slots__ = ("bucket_counts", "total", "count")
+
+    def __init__(self, size: int):
+        # 末尾は +Inf バケット
+        self.bucket_counts = [0] * (size + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def render(self, lines: list[str], name: str, labels: str, buckets: tuple[float, ...]) -> None:
+        """
+        ヒストグラムをPrometheusのテキスト形式で lines に追加（バケットは累積値に変換）
+
+        Args:
+            lines (list[str]): 出力先の行リスト
+            name (str): メトリクス名
+            labels (str): ラベル（例: method="GET",route="/todos"、ラベルなしの場合は空文字列）
+            buckets (tuple[float, ...]): バケット上限
+        """
+        prefix = f"{labels}," if labels else ""
+        suffix = f"{{{labels}}}" if labels else ""
+        cumulative = 0
+        for bound, count in zip(buckets, self.bucket_counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+
+
+class Metrics:
+    """
+    リクエストとストアのメトリクス
+
+    Args:
+        buckets (tuple[float, ...]): レイテンシヒストグラムのバケット上限（秒、昇順）
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.clear()
+
+    def clear(self) -> None:
+        """記録済みのメトリクスをすべて初期化する"""
+        # (メソッド, ルート) → レイテンシヒストグラム
+        self.latencies: dict[tuple[str, str], LatencyHistogram] = {}
+        # (メソッド, ルート, ステータスコード) → 件数
+        self.responses: dict[tuple[str, str, int], int] = {}
+        # 処理中のリクエスト数
+        self.in_flight = 0
+        # ToDoNotFoundException（404）の発生件数
+        self.todo_not_found = 0
+        # 実行中のボディ構築の結果を共有した一覧取得の件数
+        self.list_coalesced = 0
+        # イベントループの遅延（ハートビートの遅れ）のヒストグラム
+        self.loop_lag = LatencyHistogram(len(self.buckets))
+        # エンドポイント → (イベントループの停止回数, 停止時間の合計（秒）)
+        self.stalls: dict[str, list] = {}
+        # (ルート, 理由) → アドミッション制御で拒否したリクエスト数
+        self.shed: dict[tuple[str, str], int] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        """
+        完了したリクエストを記録
+
+        Args:
+            method (str): HTTPメソッド
+            route (str): ルートのパステンプレート（例: /todos/{id}）
+            status_code (int): レスポンスのステータスコード
+            seconds (float): リクエストの処理時間（秒）
+        """
+        key = (method, route)
+        histogram = self.latencies.get(key)
+        if histogram is None:
+            histogram = self.latencies[key] = LatencyHistogram(len(self.buckets))
+        histogram.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        histogram.total += seconds
+        histogram.count += 1
+
+        response_key = (method, route, status_code)
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        """
+        イベントループの遅延を記録
+
+        Args:
+            seconds (float): ハートビートが予定より遅れた時間（秒）
+        """
+        lag = self.loop_lag
+        lag.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        lag.total += seconds
+        lag.count += 1
+
+    def record_stall(self, endpoint: str, seconds: float) -> None:
+        """
+        しきい値を超えたイベントループの停止を記録
+
+        Args:
+            endpoint (str): 停止中に実行されていたエンドポイント（例: GET /todos）
+            seconds (float): 停止時間（秒）
+        """
+        stall = self.stalls.get(endpoint)
+        if stall is None:
+            stall = self.stalls[endpoint] = [0, 0.0]
+        stall[0] += 1
+        stall[1] += seconds
+
+    def record_shed(self, route: str, reason: str) -> None:
+        """
+        アドミッション制御で拒否したリクエストを記録
+
+        Args:
+            route (str): ルート名（例: GET /todos）
+            reason (str): 拒否の理由（queue_full / timeout / evicted）
+        """
+        key = (route, reason)
+        self.shed[key] = self.shed.get(key, 0) + 1
+
+    def render(self, gauges: list[tuple[str, str, float]]) -> str:
+        """
+        メトリクスをPrometheusのテキスト形式で出力
+
+        Args:
+            gauges (list[tuple[str, str, float]]): 追加で出力するゲージの (名前, 説明, 値)
+
+        Returns:
+            str: Prometheusテキスト形式のメトリクス
+        """
+        lines = [
+            "# HELP todo_http_requests_total Total HTTP requests by method, route and status code.",
+            "# TYPE todo_http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.responses.items()):
+            lines.append(f'todo_http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+
+        lines += [
+            "# HELP todo_http_request_duration_seconds HTTP request latency by method and route.",
+            "# TYPE todo_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latencies.items()):
+            histogram.render(lines, "todo_http_request_duration_seconds", f'method="{method}",route="{route}"', self.buckets)
+
+        lines += [
+            "# HELP todo_http_requests_in_flight HTTP requests currently being processed.",
+            "# TYPE todo_http_requests_in_flight gauge",
+            f"todo_http_requests_in_flight {self.in_flight}",
+            "# HELP todo_not_found_total Requests for ToDos that do not exist.",
+            "# TYPE todo_not_found_total counter",
+            f"todo_not_found_total {self.todo_not_found}",
+            "# HELP todo_list_coalesced_total List requests that shared an in-flight response build.",
+            "# TYPE todo_list_coalesced_total counter",
+            f"todo_list_coalesced_total {self.list_coalesced}",
+        ]
+
+        if self.loop_lag.count:
+            lines += [
+                "# HELP todo_event_loop_lag_seconds Delay of the event loop heartbeat beyond its schedule.",
+                "# TYPE todo_event_loop_lag_seconds histogram",
+            ]
+            self.loop_lag.render(lines, "todo_event_loop_lag_seconds", "", self.buckets)
+        lines += [
+            "# HELP todo_event_loop_stalls_total Event loop stalls beyond the threshold by endpoint.",
+            "# TYPE todo_event_loop_stalls_total counter",
+        ]
+        for endpoint, (count, _) in sorted(self.stalls.items()):
+            lines.append(f'todo_event_loop_stalls_total{{endpoint="{endpoint}"}} {count}')
+        lines += [
+            "# HELP todo_event_loop_stall_seconds_total Time the event loop was stalled by endpoint.",
+            "# TYPE todo_event_loop_stall_seconds_total counter",
+        ]
+        for endpoint, (_, seconds) in sorted(self.stalls.items()):
+            lines.append(f'todo_event_loop_stall_seconds_total{{endpoint="{endpoint}"}} {seconds}')
+        lines += [
+            "# HELP todo_admission_shed_total Requests rejected by admission control by route and reason.",
+            "# TYPE todo_admission_shed_total counter",
+        ]
+        for (route, reason), count in sorted(self.shed.items()):
+            lines.append(f'todo_admission_shed_total{{route="{route}",reason="{reason}"}} {count}')
+
+        for name, help_text, value in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+
+# グローバル変数：プロセス全体のメトリクス
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """
+    リクエストごとのメトリクスを記録するASGIミドルウェア
+
+    ルートはマッチしたパステンプレート（/todos/{id} など）で集計します。
+    処理時間はレスポンスの送信完了まで（ストリーミングレスポンスでは接続の終了まで）を計測し、
+    例外が送出された場合は 500 として記録します。
+
+    Args:
+        app: ラップするASGIアプリケーション
+        metrics (Metrics): 記録先（省略時はグローバルの metrics）
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], metrics: Metrics = metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[[], Awaitable[MutableMapping[str, Any]]],
+        send: Callable[[MutableMapping[str, Any]], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+
+        async def send_with_status(message: MutableMapping[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status_code, elapsed)
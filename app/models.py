@@ -6,6 +6,8 @@ Pydanticモデルとカスタム例外の定義
 """
 
 from datetime import datetime
+from typing import Annotated, Any
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -44,6 +46,45 @@ class ToDo(BaseModel):
     updated_at: datetime = Field(..., description="更新日時（ISO 8601形式、秒単位精度、JST）")
 
 
+class ToDoStats(BaseModel):
+    """ToDo件数統計レスポンスモデル"""
+
+    total: int = Field(..., description="論理削除済みを含む全ToDo件数", ge=0)
+    active: int = Field(..., description="有効なToDo件数（open + completed）", ge=0)
+    open: int = Field(..., description="有効かつ未完了のToDo件数", ge=0)
+    completed: int = Field(..., description="有効かつ完了済みのToDo件数", ge=0)
+    deleted: int = Field(..., description="論理削除済みのToDo件数", ge=0)
+
+
+class ToDoBatchError(BaseModel):
+    """一括作成で失敗した項目のエラー情報"""
+
+    index: int = Field(..., description="リクエスト配列内の位置（0から開始）", ge=0)
+    detail: list[dict[str, Any]] = Field(..., description="バリデーションエラーの詳細")
+
+
+class ToDoBatchCreateResponse(BaseModel):
+    """ToDo一括作成レスポンスモデル"""
+
+    created: list[ToDo] = Field(..., description="作成されたToDoのリスト（ID昇順）")
+    errors: list[ToDoBatchError] = Field(default_factory=list, description="作成できなかった項目のエラー")
+
+
+class ToDoBatchIdsRequest(BaseModel):
+    """ToDo一括完了化・一括削除リクエストモデル"""
+
+    ids: list[Annotated[int, Field(ge=1)]] = Field(
+        ..., max_length=100_000, description="対象となるToDoのIDリスト（最大100,000件）"
+    )
+
+
+class ToDoBatchUpdateResponse(BaseModel):
+    """ToDo一括完了化・一括削除レスポンスモデル"""
+
+    succeeded: list[int] = Field(..., description="処理に成功したToDoのID（リクエスト順）")
+    not_found: list[int] = Field(..., description="存在しない、または論理削除済みだったToDoのID（リクエスト順）")
+
+
 class ErrorResponse(BaseModel):
     """エラーレスポンスモデル（404/500エラー用）"""
 
@@ -51,6 +92,17 @@ class ErrorResponse(BaseModel):
     error_code: str | None = Field(None, description="エラーコード（オプション）")
 
 
+class ProfileSummary(BaseModel):
+    """リクエストの計測結果の概要レスポンスモデル"""
+
+    id: int = Field(..., description="計測結果のID（レスポンスの X-Profile-Id ヘッダの値）", ge=1)
+    method: str = Field(..., description="HTTPメソッド")
+    path: str = Field(..., description="ルートのパステンプレート")
+    sampled: bool = Field(..., description="サンプリングによる計測か（False: X-Profile ヘッダによる計測）")
+    duration_ms: float = Field(..., description="ハンドラの処理時間（ミリ秒、計測のオーバーヘッドを含む）", ge=0)
+    created_at: datetime = Field(..., description="計測日時（ISO 8601形式、秒単位精度、JST）")
+
+
 class ToDoNotFoundException(Exception):
     """ToDo未発見カスタム例外
 
@@ -59,4 +111,39 @@ class ToDoNotFoundException(Exception):
 
     def __init__(self, todo_id: int):
         self.todo_id = todo_id
-        super().__init__(f"ToDo with id {todo_id} not found")
\ No newline at end of file
+        super().__init__(f"ToDo with id {todo_id} not found")
+
+
+class InvalidCursorException(Exception):
+    """不正なページングカーソルのカスタム例外
+
+    GET /todos に渡されたカーソル文字列を復元できない場合に送出されます。
+    """
+
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"Invalid cursor: {cursor}")
+
+
+class ChangesExpiredException(Exception):
+    """差分取得できない変更シーケンス番号のカスタム例外
+
+    GET /todos?since= に渡された番号以降の変更の一部が物理削除・初期化により失われている、
+    番号がストアの現在の変更シーケンス番号より大きい、または別のストア（再起動前・作り直す前など）で
+    発行されたトークンの場合に送出されます。
+    """
+
+    def __init__(self, since: str):
+        self.since = since
+        super().__init__(f"Changes since {since} are no longer available; resync with since=0")
+
+
+class ProfileNotFoundException(Exception):
+    """計測結果未発見のカスタム例外
+
+    指定されたIDの計測結果が存在しない（リングバッファから破棄済み、またはプロファイリングが無効）場合に送出されます。
+    """
+
+    def __init__(self, profile_id: int):
+        self.profile_id = profile_id
+        super().__init__(f"Profile with id {profile_id} not found")
@@ -0,0 +1,217 @@
+"""
+リクエストのプロファイリング
+
+このモジュールは、ToDoエンドポイントのハンドラを cProfile で計測する機能を提供します。
+
+- オンデマンド: TODO_PROFILING が有効な場合、X-Profile ヘッダ付きのリクエストを計測
+- サンプリング: TODO_PROFILE_SAMPLE_N が 1 以上の場合、N 件に1件のリクエストを計測
+
+計測結果は直近の一定件数をリングバッファに保持し、レスポンスの X-Profile-Id ヘッダで返すIDで
+GET /debug/profiles/{id} から取得できます（pstats のテキストまたはバイナリ）。
+無効な場合、ハンドラの呼び出しに加わるのは有効フラグの確認1回のみです。
+
+cProfile は同時に1つしか有効にできないため、計測中に到着した別のリクエストは計測しません。
+また、計測中のリクエストが await している間に実行された他のリクエストの処理も結果に含まれます。
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import deque
+from collections.abc import Callable, Coroutine
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.utils.datetime_utils import get_current_jst_time
+
+
+# 計測を要求するリクエストヘッダ名
+PROFILE_HEADER = "X-Profile"
+
+# 計測結果のIDを返すレスポンスヘッダ名
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class RequestProfile:
+    """1リクエストの計測結果"""
+
+    __slots__ = ("id", "method", "path", "sampled", "created_at", "duration", "profile")
+
+    def __init__(self, profile_id: int, method: str, path: str, sampled: bool, profile: cProfile.Profile):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.sampled = sampled
+        self.created_at: datetime = get_current_jst_time()
+        self.duration = 0.0
+        self.profile = profile
+
+    def to_dict(self) -> dict:
+        """
+        計測結果の概要を辞書形式に変換
+
+        Returns:
+            dict: id / method / path / sampled / duration_ms / created_at
+        """
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "sampled": self.sampled,
+            "duration_ms": self.duration * 1000,
+            "created_at": self.created_at,
+        }
+
+    def render_text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        """
+        pstats のテキスト形式で出力
+
+        Args:
+            sort (str): 並び順（pstats のソートキー）
+            limit (int): 出力する関数の最大数
+
+        Returns:
+            str: pstats.Stats.print_stats の出力
+        """
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """
+        pstats のバイナリ形式（pstats.Stats.dump_stats と同一）で出力
+
+        `python -m pstats <file>` や snakeviz などのツールで読み込めます。
+
+        Returns:
+            bytes: marshal でシリアライズした統計情報
+        """
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+
+class Profiler:
+    """リクエストの計測の要否判定と、計測結果のリングバッファ"""
+
+    def __init__(self):
+        self.configure(False, 0, 100)
+
+    def configure(self, on_demand: bool, sample_every: int, buffer_size: int) -> None:
+        """
+        計測の設定を変更し、保持している計測結果を破棄
+
+        Args:
+            on_demand (bool): X-Profile ヘッダ付きのリクエストを計測するか
+            sample_every (int): N 件に1件のリクエストを計測する（0 の場合はサンプリングしない）
+            buffer_size (int): 保持する計測結果の最大件数
+        """
+        self.on_demand = on_demand
+        self.sample_every = sample_every
+        self.enabled = on_demand or sample_every > 0
+        self.profiles: deque[RequestProfile] = deque(maxlen=buffer_size)
+        self._request_count = 0
+        self._next_id = 1
+        self._active = False
+
+    def start(self, method: str, path: str, requested: bool) -> Optional[RequestProfile]:
+        """
+        リクエストを計測する場合は計測を開始
+
+        Args:
+            method (str): HTTPメソッド
+            path (str): ルートのパステンプレート
+            requested (bool): リクエストに X-Profile ヘッダが付いているか
+
+        Returns:
+            Optional[RequestProfile]: 計測を開始した場合はその計測結果、計測しない場合は None
+        """
+        sampled = not (requested and self.on_demand)
+        if sampled:
+            if not self.sample_every:
+                return None
+            self._request_count += 1
+            if self._request_count % self.sample_every:
+                return None
+
+        # cProfile は同時に1つしか有効にできない（他のプロファイラが有効な場合も計測しない）
+        if self._active:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        self._active = True
+
+        record = RequestProfile(self._next_id, method, path, sampled, profile)
+        self._next_id += 1
+        return record
+
+    def finish(self, record: RequestProfile, duration: float) -> None:
+        """
+        計測を終了してリングバッファに追加
+
+        Args:
+            record (RequestProfile): start で開始した計測結果
+            duration (float): ハンドラの処理時間（秒）
+        """
+        record.profile.disable()
+        self._active = False
+        record.duration = duration
+        self.profiles.append(record)
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        """
+        保持している計測結果をIDで取得
+
+        Args:
+            profile_id (int): 計測結果のID
+
+        Returns:
+            Optional[RequestProfile]: 計測結果、または None（存在しない・破棄済みの場合）
+        """
+        for record in self.profiles:
+            if record.id == profile_id:
+                return record
+        return None
+
+
+# グローバル変数：プロセス全体のプロファイラ
+profiler = Profiler()
+
+
+class ProfilingRoute(APIRoute):
+    """
+    ハンドラを Profiler による計測でラップするルート
+
+    APIRouter の route_class に指定すると、そのルーターのすべてのエンドポイントが対象になります。
+    計測範囲はリクエストの検証からレスポンスオブジェクトの生成までで、
+    ストリーミングレスポンスのボディ送信は含みません。
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def profiled_handler(request: Request) -> Response:
+            if not profiler.enabled:
+                return await handler(request)
+
+            record = profiler.start(request.method, path, PROFILE_HEADER.lower() in request.headers)
+            if record is None:
+                return await handler(request)
+
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+            finally:
+                profiler.finish(record, time.perf_counter() - start)
+            response.headers[PROFILE_ID_HEADER] = str(record.id)
+            return response
+
+        return profiled_handler
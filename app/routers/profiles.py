@@ -0,0 +1,71 @@
+"""
+プロファイリング結果のエンドポイントの実装
+
+このモジュールは、ToDoエンドポイントのプロファイリング結果（app.profiling）を取得するエンドポイントを提供します。
+"""
+
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Path, Query, Response
+
+from app.models import ProfileNotFoundException, ProfileSummary
+from app.profiling import profiler
+
+
+# pstats バイナリ形式のメディアタイプ
+PSTATS_MEDIA_TYPE = "application/octet-stream"
+
+
+# APIRouterの作成
+router = APIRouter(
+    prefix="/debug/profiles",
+    tags=["Debug"],
+)
+
+
+@router.get("", response_model=list[ProfileSummary])
+async def list_profiles() -> list[ProfileSummary]:
+    """
+    保持しているプロファイリング結果の一覧を取得
+
+    Returns:
+        list[ProfileSummary]: 計測結果の概要のリスト（新しい順）
+    """
+    return [ProfileSummary(**record.to_dict()) for record in reversed(profiler.profiles)]
+
+
+@router.get("/{id}", response_class=Response, responses={200: {"content": {"text/plain": {}, PSTATS_MEDIA_TYPE: {}}}})
+async def get_profile(
+    id: Annotated[int, Path(ge=1, description="計測結果のID")],
+    format: Annotated[Literal["text", "pstats"], Query(description="text: pstats のテキスト / pstats: バイナリ")] = "text",
+    sort: Annotated[Literal["cumulative", "tottime", "calls"], Query(description="text 形式の並び順")] = "cumulative",
+    limit: Annotated[int, Query(ge=1, le=1000, description="text 形式で出力する関数の最大数")] = 50,
+) -> Response:
+    """
+    プロファイリング結果を取得
+
+    pstats 形式はファイルに保存すると `python -m pstats` や snakeviz などのツールで読み込めます。
+
+    Args:
+        id (int): 計測結果のID（レスポンスの X-Profile-Id ヘッダの値）
+        format (str): 出力形式
+        sort (str): text 形式の並び順
+        limit (int): text 形式で出力する関数の最大数
+
+    Returns:
+        Response: 計測結果
+
+    Raises:
+        ProfileNotFoundException: 指定されたIDの計測結果が存在しない場合
+    """
+    record = profiler.get(id)
+    if record is None:
+        raise ProfileNotFoundException(id)
+
+    if format == "pstats":
+        return Response(
+            content=record.dump(),
+            media_type=PSTATS_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="profile-{id}.pstats"'},
+        )
+    return Response(content=record.render_text(sort, limit), media_type="text/plain; charset=utf-8")
@@ -4,24 +4,75 @@ ToDoエンドポイントの実装
 このモジュールは、ToDoに関するすべてのCRUD操作のエンドポイントを提供します。
 """
 
-from typing import Annotated
-
-from fastapi import APIRouter, Path, status
-
-from app.models import ToDoCreate, ToDo, ToDoNotFoundException
-from app.database import (
-    get_all_active_todos,
-    get_todo_by_id,
-    create_todo,
-    update_todo,
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Body, Header, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.events import END_OF_STREAM, change_feed
+from app.metrics import metrics
+from app.models import (
+    ChangesExpiredException,
+    ToDoCreate,
+    ToDo,
+    ToDoBatchCreateResponse,
+    ToDoBatchError,
+    ToDoBatchIdsRequest,
+    ToDoBatchUpdateResponse,
+    ToDoNotFoundException,
+    ToDoStats,
 )
+from app.profiling import ProfilingRoute
+from app.storage import get_storage
+from app.utils.cursor_utils import decode_cursor, encode_cursor
 from app.utils.datetime_utils import get_current_jst_time
+from app.utils.etag_utils import etag_matches, make_etag
+from app.utils.json_utils import dumps
+from app.utils.singleflight import SingleFlight
+from app.utils.sync_utils import CHANGE_TOKEN_PATTERN, decode_change_token, encode_change_token
+
+
+# 次ページのカーソルを返すレスポンスヘッダ名
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 差分取得で次回の since に指定する差分同期トークンを返すレスポンスヘッダ名
+CHANGE_SEQUENCE_HEADER = "X-Change-Sequence"
+
+# 差分取得で limit により打ち切られた後続の変更があることを示すレスポンスヘッダ名
+MORE_CHANGES_HEADER = "X-More-Changes"
+
+# ストリーミング（NDJSON）レスポンスのメディアタイプ
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# ストリーミング時に1回で書き出す件数（チャンク間でイベントループに制御を返す）
+STREAM_CHUNK_SIZE = 500
+
+
+# 変更イベントストリーム（SSE）のメディアタイプ
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+# 変更イベントがない間にキープアライブのコメントを送る間隔（秒）
+EVENT_KEEPALIVE_INTERVAL = 15.0
+
+
+# 一括作成で受け付ける最大件数
+MAX_BATCH_SIZE = 10_000
+
+
+# グローバル変数：同時に到着した同一条件の一覧取得で共有する、実行中のボディ構築
+# （変更直後に多数のクライアントが一斉に再取得しても、構築は条件ごとに1回で済む）
+list_flights = SingleFlight()
 
 
 # APIRouterの作成
+# ハンドラはプロファイリング（TODO_PROFILING / TODO_PROFILE_SAMPLE_N）の計測対象
 router = APIRouter(
     prefix="/todos",
     tags=["ToDos"],
+    route_class=ProfilingRoute,
 )
 
 
@@ -55,29 +106,462 @@ async def create_new_todo(todo_create: ToDoCreate) -> ToDo:
         "updated_at": now,
     }
 
-    # データベースに保存（IDは自動割り当て）
-    created_todo = create_todo(todo_data)
+    # データベースに保存（IDは自動割り当て）し、永続化を待つ
+    storage = get_storage()
+    created_todo = await storage.create_todo(todo_data)
+    await storage.wait_for_durability()
+
+    # レスポンスモデルを経由せずにエンコードする（出力は ToDo と同一）
+    body = created_todo.to_json()
+    change_feed.publish("created", [created_todo])
+
+    return Response(content=body, status_code=status.HTTP_201_CREATED, media_type="application/json")
+
+
+@router.post("/batch", response_model=ToDoBatchCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_todos_batch(
+    items: Annotated[list[Any], Body(max_length=MAX_BATCH_SIZE, description="作成するToDo（ToDoCreate形式）のリスト")],
+) -> ToDoBatchCreateResponse:
+    """
+    ToDoの一括作成
+
+    複数のToDoアイテムを1リクエストで作成します。
+    各項目を1回の走査で検証し、有効な項目には連続したIDと共通のタイムスタンプを割り当てて
+    まとめて登録します。不正な項目はバッチ全体を失敗させず、errors に位置と理由を返します。
+
+    Args:
+        items (list[Any]): 作成するToDo（ToDoCreate形式）のリスト（最大10,000件）
+
+    Returns:
+        ToDoBatchCreateResponse: 作成されたToDoのリストと、作成できなかった項目のエラー
+
+    Raises:
+        422 Unprocessable Entity: リクエストボディが配列でない、または件数超過の場合
+        500 Internal Server Error: サーバー内部エラー
+    """
+    # 現在のタイムスタンプを取得（バッチ内で共通）
+    now = get_current_jst_time()
+
+    todos_data = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            todo_create = ToDoCreate.model_validate(item)
+        except ValidationError as e:
+            errors.append(ToDoBatchError(
+                index=index,
+                detail=e.errors(include_url=False, include_context=False),
+            ))
+            continue
+
+        todos_data.append({
+            "title": todo_create.title,
+            "description": todo_create.description,
+            "completed": False,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    # データベースに一括保存（連続したIDを割り当て）し、永続化を待つ
+    storage = get_storage()
+    created_todos = await storage.create_todos(todos_data)
+    await storage.wait_for_durability()
+
+    # レスポンスモデルを経由せずにエンコードする（出力は ToDoBatchCreateResponse と同一）
+    created = [todo.to_json() for todo in created_todos]
+    change_feed.publish("created", created_todos)
+
+    body = (
+        b'{"created":[' + b",".join(created) + b'],"errors":'
+        + dumps([error.model_dump(mode="json") for error in errors]) + b"}"
+    )
+    return Response(content=body, status_code=status.HTTP_201_CREATED, media_type="application/json")
+
+
+@router.post("/batch/complete", response_model=ToDoBatchUpdateResponse)
+async def complete_todos_batch(request: ToDoBatchIdsRequest) -> ToDoBatchUpdateResponse:
+    """
+    ToDoの一括完了化
+
+    指定されたIDのToDoをまとめて「完了」状態にします。
+    各IDの扱いは PATCH /todos/{id}/complete と同じで、既に完了済みのToDoは
+    データを変更せずに成功として扱います（べき等）。
+
+    Args:
+        request (ToDoBatchIdsRequest): 対象となるToDoのIDリスト（最大100,000件）
+
+    Returns:
+        ToDoBatchUpdateResponse: 成功したIDと、存在しない・論理削除済みだったID
+
+    Raises:
+        422 Unprocessable Entity: リクエストボディが不正な場合
+        500 Internal Server Error: サーバー内部エラー
+    """
+    storage = get_storage()
+    todos = await storage.get_todos_by_ids(request.ids)
+
+    # 既に完了済みのToDoは何もしない（べき等性）、未完了のToDoのみを更新対象とする
+    completed = {todo_id for todo_id, todo in todos.items() if todo.is_active and todo.completed}
+    targets = [
+        todo_id for todo_id in request.ids
+        if todo_id in todos and todos[todo_id].is_active and todo_id not in completed
+    ]
+
+    # 完了状態に一括更新し、永続化を待つ（読み込み後に論理削除・物理削除されたToDoは更新されない）
+    updated_todos = await storage.update_todos(targets, {
+        "completed": True,
+        "updated_at": get_current_jst_time(),
+    }, only_active=True)
+    await storage.wait_for_durability()
+
+    # 更新されたToDoと完了済みだったToDoが成功、それ以外（存在しない・論理削除済み）は not_found
+    completed.update(todo.id for todo in updated_todos)
+    succeeded = []
+    not_found = []
+    for todo_id in request.ids:
+        (succeeded if todo_id in completed else not_found).append(todo_id)
+
+    change_feed.publish("completed", updated_todos)
+
+    return ToDoBatchUpdateResponse(succeeded=succeeded, not_found=not_found)
+
+
+@router.post("/batch/delete", response_model=ToDoBatchUpdateResponse)
+async def delete_todos_batch(request: ToDoBatchIdsRequest) -> ToDoBatchUpdateResponse:
+    """
+    ToDoの一括削除（論理削除）
+
+    指定されたIDのToDoをまとめて論理削除します。
+    各IDの扱いは DELETE /todos/{id} と同じで、存在しない・論理削除済みのIDは
+    not_found として返します（同一リクエスト内で重複したIDも2件目以降は not_found）。
+    DELETE メソッドでのリクエストボディは中継サーバーで破棄される場合があるため POST で受け付けます。
+
+    Args:
+        request (ToDoBatchIdsRequest): 削除対象となるToDoのIDリスト（最大100,000件）
+
+    Returns:
+        ToDoBatchUpdateResponse: 削除したIDと、存在しない・論理削除済みだったID
+
+    Raises:
+        422 Unprocessable Entity: リクエストボディが不正な場合
+        500 Internal Server Error: サーバー内部エラー
+    """
+    storage = get_storage()
+
+    # 論理削除（is_activeをFalseに一括変更）し、永続化を待つ（有効なToDoのみが更新される）
+    deleted_todos = await storage.update_todos(request.ids, {
+        "is_active": False,
+        "updated_at": get_current_jst_time(),
+    }, only_active=True)
+    await storage.wait_for_durability()
+
+    # 実際に削除されたToDoのみが成功（同一リクエスト内で重複したIDの2件目以降は not_found）
+    deleted = {todo.id for todo in deleted_todos}
+    succeeded = []
+    not_found = []
+    for todo_id in request.ids:
+        if todo_id in deleted:
+            deleted.discard(todo_id)
+            succeeded.append(todo_id)
+        else:
+            not_found.append(todo_id)
+
+    change_feed.publish("deleted", deleted_todos)
+
+    return ToDoBatchUpdateResponse(succeeded=succeeded, not_found=not_found)
+
+
+async def _stream_todos_ndjson(
+    after_id: int,
+    limit: int | None,
+    completed: bool | None,
+) -> AsyncIterator[bytes]:
+    """
+    有効なToDoを1行1件のJSON（NDJSON）として逐次生成
+
+    チャンクごとにイベントループへ制御を返し、他のリクエストを待たせないようにします。
+
+    Args:
+        after_id (int): このIDより大きいToDoのみを返す
+        limit (int | None): 最大件数（None の場合は末尾まで）
+        completed (bool | None): 完了状態での絞り込み（None の場合は絞り込みなし）
+
+    Yields:
+        bytes: NDJSON形式のチャンク
+    """
+    storage = get_storage()
+    remaining = limit
+    while remaining is None or remaining > 0:
+        # チャンクごとに続きを取得するため、走査の途中でToDoが作成・削除されても位置を見失わない
+        chunk_size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+        fragments, after_id, has_more = await storage.get_active_todos_json_page(after_id, chunk_size, completed)
+        if fragments:
+            yield b"\n".join(fragments) + b"\n"
+        if not has_more or not fragments:
+            return
+        if remaining is not None:
+            remaining -= len(fragments)
+        await asyncio.sleep(0)
+
+
+async def _render_todos_json(
+    start_after: int,
+    limit: int | None,
+    completed: bool | None,
+    full: bool,
+) -> tuple[bytes, str | None]:
+    """
+    有効なToDoのJSON配列ボディを構築
 
-    return ToDo(**created_todo)
+    Args:
+        start_after (int): このIDより大きいToDoのみを返す
+        limit (int | None): 最大件数（None の場合は末尾まで）
+        completed (bool | None): 完了状態での絞り込み（None の場合は絞り込みなし）
+        full (bool): ページング・絞り込み指定がない全件取得かどうか（世代ごとにキャッシュされた全件ボディを使用）
 
+    Returns:
+        tuple[bytes, str | None]: JSON配列のバイト列と、次ページのカーソル（後続ページがない場合は None）
+    """
+    storage = get_storage()
+    if full:
+        _, body = await storage.render_active_todos_json()
+        return body, None
+
+    fragments, last_id, has_more = await storage.get_active_todos_json_page(start_after, limit, completed)
+    return b"[" + b",".join(fragments) + b"]", encode_cursor(last_id) if has_more else None
 
-@router.get("", response_model=list[ToDo])
-async def get_all_todos() -> list[ToDo]:
+
+@router.get(
+    "",
+    response_model=list[ToDo],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def get_all_todos(
+    limit: Annotated[int | None, Query(ge=1, le=1000, description="1ページあたりの最大取得件数（省略時は全件）")] = None,
+    after_id: Annotated[str | None, Query(description="前ページのレスポンスで返されたカーソル")] = None,
+    completed: Annotated[bool | None, Query(description="完了状態での絞り込み（true: 完了済みのみ、false: 未完了のみ）")] = None,
+    stream: Annotated[bool, Query(description="NDJSON形式でストリーミングする")] = False,
+    since: Annotated[
+        str | None,
+        Query(pattern=CHANGE_TOKEN_PATTERN, description="前回の差分取得で返された X-Change-Sequence（0の場合は全件）"),
+    ] = None,
+    accept: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> list[ToDo]:
     """
     ToDoの全件取得
 
     すべての有効なToDoアイテムを取得します（論理削除されたものは除外）。
+    completed を指定すると完了状態で絞り込みます（完了状態別のインデックスを使用）。
+    limit / after_id を指定するとキーセット方式でページングし、
+    後続ページが存在する場合は X-Next-Cursor ヘッダに次のカーソルを返します。
+
+    stream=true または Accept: application/x-ndjson を指定すると、
+    全件をメモリ上に構築せず1行1件のJSON（NDJSON）で逐次返します。
+
+    since を指定すると差分同期として、その変更シーケンス番号より後に作成・完了化・削除された
+    ToDoのみを変更順に返します（論理削除済みのToDoも is_active=false で含みます。limit 以外の
+    指定は無視します）。次回の since に指定するトークン（「ストアのエポック-変更シーケンス番号」）を
+    X-Change-Sequence ヘッダに返し、limit で打ち切った場合は X-More-Changes: true を付与します。
+
+    レスポンスボディはストレージ層がエンコードしたToDoごとのJSONを連結して構築するため（インメモリ実装ではキャッシュ済み）、
+    変更のないToDoについてはバリデーション・シリアライズを再実行しません。
+
+    JSON形式のレスポンスにはストアの世代番号に基づくETagを付与し、
+    If-None-Match が一致する場合はデータに触れずに 304 を返します。
+
+    同じ世代で同時に到着した同一条件のリクエストは、実行中の1回のボディ構築の結果（同じバイト列）を共有します。
+
+    Args:
+        limit (int | None): 1ページあたりの最大取得件数（1〜1000）
+        after_id (str | None): 前ページのレスポンスで返されたカーソル
+        completed (bool | None): 完了状態での絞り込み
+        stream (bool): NDJSON形式でストリーミングするかどうか
+        since (str | None): 前回の差分取得で返された差分同期トークン
+        accept (str | None): Acceptヘッダ
+        if_none_match (str | None): If-None-Matchヘッダ
 
     Returns:
         list[ToDo]: ToDoのリスト（ID昇順）
 
     Raises:
+        304 Not Modified: If-None-Match が現在のETagと一致する場合
+        400 Bad Request: カーソルが不正な場合
+        410 Gone: since 以降の変更が物理削除・初期化により失われている、または since が
+            別のストア（再起動前・作り直す前など）で発行された場合（since=0 で取得し直す）
+        422 Unprocessable Entity: since の形式が不正な場合
         500 Internal Server Error: サーバー内部エラー
     """
-    # 有効なすべてのToDoを取得
-    active_todos = get_all_active_todos()
+    # 差分同期の場合は since 以降に変更されたToDoのみを返す
+    if since is not None:
+        storage = get_storage()
+        sequence = decode_change_token(since, storage.store_epoch)
+        changes = None if sequence is None else await storage.get_changes_json(sequence, limit)
+        if changes is None:
+            raise ChangesExpiredException(since)
+        fragments, high_water_mark, has_more = changes
+
+        response = Response(
+            content=b"[" + b",".join(fragments) + b"]",
+            media_type="application/json",
+            headers={CHANGE_SEQUENCE_HEADER: encode_change_token(storage.store_epoch, high_water_mark)},
+        )
+        if has_more:
+            response.headers[MORE_CHANGES_HEADER] = "true"
+        return response
+
+    start_after = decode_cursor(after_id) if after_id is not None else 0
+
+    # ストリーミング指定の場合はNDJSONで逐次返す
+    if stream or (accept is not None and NDJSON_MEDIA_TYPE in accept):
+        return StreamingResponse(
+            _stream_todos_ndjson(start_after, limit, completed),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    storage = get_storage()
+
+    # 前回取得時からデータが変化していなければ 304 を返す
+    etag = make_etag(storage.store_epoch, await storage.get_generation())
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # 同じ世代で同時に到着した同一条件のリクエストは、実行中の1回のボディ構築の結果を共有する
+    full = limit is None and after_id is None and completed is None
+    (body, next_cursor), shared = await list_flights.do(
+        (etag, after_id, limit, completed),
+        lambda: _render_todos_json(start_after, limit, completed, full),
+    )
+    if shared:
+        metrics.list_coalesced += 1
+
+    response = Response(content=body, media_type="application/json", headers={"ETag": etag})
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return response
+
+
+@router.get("/stats", response_model=ToDoStats)
+async def get_todo_stats() -> ToDoStats:
+    """
+    ToDoの件数統計の取得
 
-    return [ToDo(**todo) for todo in active_todos]
+    全件数・未完了件数・完了件数・論理削除件数を返します。
+    件数はデータストア側で差分管理されているため、件数に関係なく定数時間で応答します。
+
+    Returns:
+        ToDoStats: ToDoの件数統計
+
+    Raises:
+        500 Internal Server Error: サーバー内部エラー
+    """
+    return ToDoStats(**await get_storage().get_stats())
+
+
+@router.get("/search", response_model=list[ToDo])
+async def search_todos(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="検索語（空白区切りの語をすべて含むToDoを検索）")],
+    limit: Annotated[int | None, Query(ge=1, le=1000, description="1ページあたりの最大取得件数（省略時は全件）")] = None,
+    after_id: Annotated[str | None, Query(description="前ページのレスポンスで返されたカーソル")] = None,
+) -> list[ToDo]:
+    """
+    ToDoの全文検索
+
+    タイトルまたは説明に検索語をすべて含む有効なToDoを返します（論理削除されたものは除外）。
+    英数字は単語単位、日本語などは2文字以上の連続で一致を判定し、全角・半角と大文字・小文字は区別しません。
+    結果はID昇順で、limit / after_id によるページングは GET /todos と同じです。
+
+    Args:
+        q (str): 検索語（1〜200文字）
+        limit (int | None): 1ページあたりの最大取得件数（1〜1000）
+        after_id (str | None): 前ページのレスポンスで返されたカーソル
+
+    Returns:
+        list[ToDo]: 該当するToDoのリスト（ID昇順）
+
+    Raises:
+        400 Bad Request: カーソルが不正な場合
+        422 Unprocessable Entity: 検索語が空、または長すぎる場合
+        500 Internal Server Error: サーバー内部エラー
+    """
+    start_after = decode_cursor(after_id) if after_id is not None else 0
+
+    fragments, last_id, has_more = await get_storage().search_todos_json(q, start_after, limit)
+    body = b"[" + b",".join(fragments) + b"]"
+
+    response = Response(content=body, media_type="application/json")
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_id)
+
+    return response
+
+
+async def _stream_events(last_event_id: str | None) -> AsyncIterator[bytes]:
+    """
+    変更イベントをSSE形式で逐次生成
+
+    購読を開始し、再送分（backlog）を送った後、購読キューに届いたイベントを送ります。
+    一定時間イベントがない場合はキープアライブのコメントを送ります。
+    受信が追いつかずキューが破棄された場合、またはクライアントが切断した場合に終了します。
+
+    Args:
+        last_event_id (str | None): クライアントが最後に受信したイベントID
+
+    Yields:
+        bytes: SSE形式のメッセージ
+    """
+    subscription = change_feed.subscribe(last_event_id)
+    try:
+        if subscription.backlog:
+            yield b"".join(subscription.backlog)
+            subscription.backlog = []
+
+        while not subscription.dropped:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), EVENT_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if message == END_OF_STREAM:
+                break
+            yield message
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+@router.get("/events", responses={200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}}})
+async def stream_todo_events(
+    last_event_id: Annotated[str | None, Header(description="最後に受信したイベントID（再接続時）")] = None,
+) -> StreamingResponse:
+    """
+    ToDoの変更イベントの購読（Server-Sent Events）
+
+    ToDoの作成・完了化・削除（一括操作を含む）を、永続化後に created / completed / deleted
+    イベントとして配信します。data は {"todos": [ToDo, ...]} 形式のJSONで、一括操作の変更は
+    一定件数ごとのイベントに分割されます。各イベントの id は「エポック-変更シーケンス番号」の形式で、
+    番号はイベントに含まれる最後のToDoの変更シーケンス番号（差分同期の since と同じ番号）です。
+    再接続時に Last-Event-ID を指定すると、それ以降のイベントを直近の履歴から再送します。
+    履歴から再送できない場合（購読者がいない間の変更、他のプロセス・再起動前のIDなど）は
+    reset イベントを送ります（クライアントは GET /todos で一覧を取得し直してください）。
+
+    受信が追いつかない購読者は、書き込み側を待たせないよう接続を切断します。
+
+    Args:
+        last_event_id (str | None): Last-Event-IDヘッダ
+
+    Returns:
+        StreamingResponse: text/event-stream 形式のレスポンス
+
+    Raises:
+        500 Internal Server Error: サーバー内部エラー
+    """
+    return StreamingResponse(
+        _stream_events(last_event_id),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.patch("/{id}/complete", response_model=ToDo)
@@ -102,24 +586,31 @@ async def complete_todo(
         500 Internal Server Error: サーバー内部エラー
     """
     # ToDoを取得
-    todo = get_todo_by_id(id)
+    storage = get_storage()
+    todo = await storage.get_todo_by_id(id)
 
     # 存在確認とis_activeチェック
-    if todo is None or not todo.get("is_active", False):
+    if todo is None or not todo.is_active:
         raise ToDoNotFoundException(id)
 
     # 既に完了済みの場合は何もしない（べき等性）
-    if todo.get("completed", False):
-        return ToDo(**todo)
+    if todo.completed:
+        return Response(content=todo.to_json(), media_type="application/json")
 
-    # 完了状態に更新
+    # 完了状態に更新（読み込み後に論理削除・物理削除されていた場合は更新されない）
     updates = {
         "completed": True,
         "updated_at": get_current_jst_time(),
     }
-    updated_todo = update_todo(id, updates)
+    updated_todo = await storage.update_todo(id, updates, only_active=True)
+    if updated_todo is None:
+        raise ToDoNotFoundException(id)
+    await storage.wait_for_durability()
+
+    body = updated_todo.to_json()
+    change_feed.publish("completed", [updated_todo])
 
-    return ToDo(**updated_todo)
+    return Response(content=body, media_type="application/json")
 
 
 @router.delete("/{id}", response_model=ToDo)
@@ -143,18 +634,20 @@ async def delete_todo(
         404 Not Found: 指定されたIDのToDoが存在しない、または論理削除済み
         500 Internal Server Error: サーバー内部エラー
     """
-    # ToDoを取得
-    todo = get_todo_by_id(id)
-
-    # 存在確認とis_activeチェック
-    if todo is None or not todo.get("is_active", False):
-        raise ToDoNotFoundException(id)
+    storage = get_storage()
 
     # 論理削除（is_activeをFalseに変更）
+    # 有効かどうかの判定は更新と不可分に行い、並行した削除のうち1件のみを成功させる
     updates = {
         "is_active": False,
         "updated_at": get_current_jst_time(),
     }
-    deleted_todo = update_todo(id, updates)
+    deleted_todo = await storage.update_todo(id, updates, only_active=True)
+    if deleted_todo is None:
+        raise ToDoNotFoundException(id)
+    await storage.wait_for_durability()
+
+    body = deleted_todo.to_json()
+    change_feed.publish("deleted", [deleted_todo])
 
-    return ToDo(**deleted_todo)
+    return Response(content=body, media_type="application/json")
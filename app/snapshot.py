@@ -0,0 +1,194 @@
+"""
+スナップショットファイル
+
+このモジュールは、データストアの全レコードをコンパクトなバイナリ形式で
+保存・読み込みする機能を提供します。
+
+ファイル形式（リトルエンディアン）:
+    ヘッダ:   マジック（8バイト）、next_id（u64）、LSN（u64）、変更シーケンス番号（u64）、
+              差分取得の下限（u64）、件数（u64）
+    固定長部: 件数分の [id（u64）、created_at（i64）、updated_at（i64）、変更シーケンス番号（u64）、
+              フラグ（u8）、タイトル長（u16）、説明長（u16）]（長さは文字数）
+    可変長部: 各レコードのタイトルと説明を固定長部と同じ順に連結した文字列（UTF-8）
+
+変更シーケンス番号を持たない旧形式（TODOSNP1）のファイルも読み込めます
+（各レコードの変更シーケンス番号とヘッダの2つの値は0として扱います）。
+
+読み込み時はファイルをメモリマップし、固定長部を struct.iter_unpack で、
+可変長部を1回の UTF-8 デコードでまとめて復元します（レコードごとのデコードは行いません）。
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+
+
+# ファイル先頭のマジックバイト列（形式のバージョン識別用）
+SNAPSHOT_MAGIC = b"TODOSNP2"
+
+# ヘッダ：マジック、next_id、LSN、変更シーケンス番号、差分取得の下限、件数
+HEADER = struct.Struct("<8sQQQQQ")
+
+# 固定長部の1レコード：id、created_at、updated_at、変更シーケンス番号、フラグ、タイトル長、説明長
+RECORD = struct.Struct("<QqqQBHH")
+
+# 旧形式（変更シーケンス番号なし）のマジック、ヘッダ、固定長部の1レコード
+SNAPSHOT_MAGIC_V1 = b"TODOSNP1"
+HEADER_V1 = struct.Struct("<8sQQQ")
+RECORD_V1 = struct.Struct("<QqqBHH")
+
+# フラグのビット
+FLAG_COMPLETED = 0b001
+FLAG_ACTIVE = 0b010
+FLAG_HAS_DESCRIPTION = 0b100
+
+
+class SnapshotFormatError(Exception):
+    """スナップショットファイルの形式が不正な場合に送出される例外"""
+
+
+def write_snapshot(
+    path: str,
+    rows: Iterable[list],
+    next_id: int,
+    lsn: int,
+    change_sequence: int = 0,
+    change_floor: int = 0,
+) -> int:
+    """
+    レコードをスナップショットファイルに書き出す
+
+    一時ファイルに書き出してfsyncした後に置き換えるため、
+    書き込み途中で停止しても既存のスナップショットは壊れません。
+
+    Args:
+        path (str): スナップショットファイルのパス
+        rows (Iterable[list]): ToDoRecord.to_row 形式のレコードの末尾に変更シーケンス番号を加えたもの
+        next_id (int): 次に割り当てるID
+        lsn (int): スナップショットに反映済みの追記型ログのLSN
+        change_sequence (int): 最後に割り当てた変更シーケンス番号
+        change_floor (int): 差分取得できる変更シーケンス番号の下限
+
+    Returns:
+        int: 書き出したレコード件数
+    """
+    fixed = bytearray()
+    strings = []
+    count = 0
+    for todo_id, title, description, completed, is_active, created_at, updated_at, change_seq in rows:
+        flags = (
+            (FLAG_COMPLETED if completed else 0)
+            | (FLAG_ACTIVE if is_active else 0)
+            | (FLAG_HAS_DESCRIPTION if description is not None else 0)
+        )
+        description = description if description is not None else ""
+        fixed += RECORD.pack(todo_id, created_at, updated_at, change_seq, flags, len(title), len(description))
+        strings.append(title)
+        strings.append(description)
+        count += 1
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, next_id, lsn, change_sequence, change_floor, count))
+        f.write(fixed)
+        f.write("".join(strings).encode())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # 置き換え（リネーム）自体を永続化する
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+    return count
+
+
+def read_snapshot(path: str) -> tuple[int, int, int, int, Iterator[tuple]]:
+    """
+    スナップショットファイルを読み込む
+
+    ファイルをメモリマップし、レコードはイテレータで順に取り出した時点で組み立てます。
+
+    Args:
+        path (str): スナップショットファイルのパス
+
+    Returns:
+        tuple[int, int, int, int, Iterator[tuple]]: next_id、LSN、変更シーケンス番号、差分取得の下限、
+        ToDoRecord.to_row の並びの末尾に変更シーケンス番号を加えたレコードのイテレータ
+
+    Raises:
+        SnapshotFormatError: ファイルの形式が不正な場合
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_V1.size:
+            raise SnapshotFormatError(f"Snapshot file is too short: {path}")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic = mapped[:len(SNAPSHOT_MAGIC)]
+    if magic == SNAPSHOT_MAGIC and size >= HEADER.size:
+        _, next_id, lsn, change_sequence, change_floor, count = HEADER.unpack_from(mapped, 0)
+        header, record = HEADER, RECORD
+    elif magic == SNAPSHOT_MAGIC_V1:
+        _, next_id, lsn, count = HEADER_V1.unpack_from(mapped, 0)
+        change_sequence = change_floor = 0
+        header, record = HEADER_V1, RECORD_V1
+    else:
+        mapped.close()
+        raise SnapshotFormatError(f"Invalid snapshot file: {path}")
+
+    strings_offset = header.size + record.size * count
+    if strings_offset > size:
+        mapped.close()
+        raise SnapshotFormatError(f"Invalid snapshot file: {path}")
+
+    return next_id, lsn, change_sequence, change_floor, _iter_rows(mapped, header, record, count, strings_offset)
+
+
+def _iter_rows(
+    mapped: mmap.mmap,
+    header: struct.Struct,
+    record: struct.Struct,
+    count: int,
+    strings_offset: int,
+) -> Iterator[tuple]:
+    """メモリマップしたスナップショットからレコードを順にデコードする"""
+    try:
+        view = memoryview(mapped)
+        fixed = view[header.size:strings_offset]
+        try:
+            text = str(view[strings_offset:], "utf-8")
+            # 旧形式には変更シーケンス番号がないため0を補う
+            fields = record.iter_unpack(fixed) if record is RECORD else (
+                (todo_id, created_at, updated_at, 0, flags, title_length, description_length)
+                for todo_id, created_at, updated_at, flags, title_length, description_length in record.iter_unpack(fixed)
+            )
+            position = 0
+            for todo_id, created_at, updated_at, change_seq, flags, title_length, description_length in fields:
+                end = position + title_length
+                title = text[position:end]
+                if flags & FLAG_HAS_DESCRIPTION:
+                    position = end + description_length
+                    description = text[end:position]
+                else:
+                    position = end
+                    description = None
+                yield (
+                    todo_id,
+                    title,
+                    description,
+                    flags & FLAG_COMPLETED != 0,
+                    flags & FLAG_ACTIVE != 0,
+                    created_at,
+                    updated_at,
+                    change_seq,
+                )
+        finally:
+            fixed.release()
+            view.release()
+    finally:
+        mapped.close()
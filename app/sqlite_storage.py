@@ -0,0 +1,659 @@
+"""
+SQLiteストレージ
+
+このモジュールは、ToDoStorage インターフェースのSQLite実装を提供します。
+同じデータベースファイルを複数のワーカープロセスから共有できます（uvicorn --workers）。
+データベースはWALモードで開き、読み込みは複数の接続を持つコネクションプールから、
+書き込みは単一の書き込み用接続から行います（SQLiteの書き込みは常に1つずつのため）。
+すべてのクエリは専用のスレッドプールで実行し、イベントループをブロックしません。
+
+SQL文はすべてパラメータ化した固定の文字列を使用するため、sqlite3 の接続ごとの
+ステートメントキャッシュにより2回目以降はプリペアド済みの文が再利用されます。
+"""
+
+import asyncio
+import queue
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Optional, TypeVar
+
+from app.database import SEARCH_FIELDS, ToDoRecord
+from app.storage import ToDoStorage
+from app.utils.datetime_utils import to_epoch_seconds
+from app.utils.search_utils import normalize_text, parse_query, tokenize
+
+
+T = TypeVar("T")
+
+# テーブルの列（ToDoRecord.__slots__ と同じ順序、変更シーケンス番号を除く）
+COLUMNS = "id, title, description, completed, is_active, created_at, updated_at"
+
+# 更新可能な列（変更シーケンス番号はストレージが付与する）
+UPDATABLE_COLUMNS = frozenset(ToDoRecord.__slots__) - {"id", "change_seq"}
+
+# IN 句1回あたりのID数（SQLiteのパラメータ数上限を超えないよう分割する）
+ID_CHUNK_SIZE = 500
+
+# 接続ごとにキャッシュするプリペアドステートメント数
+STATEMENT_CACHE_SIZE = 256
+
+# 1回のリースで確保するIDの件数
+DEFAULT_ID_BLOCK_SIZE = 1000
+
+# 全文検索テーブルのトークンの形式の版（2: CJK文字のユニグラムを追加）
+SEARCH_INDEX_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id          INTEGER PRIMARY KEY,
+    title       TEXT    NOT NULL,
+    description TEXT,
+    completed   INTEGER NOT NULL,
+    is_active   INTEGER NOT NULL,
+    created_at  INTEGER NOT NULL,
+    updated_at  INTEGER NOT NULL,
+    change_seq  INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS todos_active ON todos (id) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS todos_active_completed ON todos (completed, id) WHERE is_active = 1;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT    PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES
+    ('generation', 0), ('next_id', 1), ('epoch', 0), ('change_sequence', 0), ('change_floor', 0),
+    ('store_id', abs(random()) % 4294967296);
+CREATE VIRTUAL TABLE IF NOT EXISTS todos_search USING fts5 (tokens, tokenize = 'unicode61 remove_diacritics 0');
+"""
+
+SELECT_PAGE = f"SELECT {COLUMNS} FROM todos WHERE is_active = 1 AND id > ? ORDER BY id LIMIT ?"
+SELECT_PAGE_BY_COMPLETED = (
+    f"SELECT {COLUMNS} FROM todos WHERE is_active = 1 AND completed = ? AND id > ? ORDER BY id LIMIT ?"
+)
+SELECT_BY_ID = f"SELECT {COLUMNS} FROM todos WHERE id = ?"
+SELECT_CHANGES = f"SELECT {COLUMNS}, change_seq FROM todos WHERE change_seq > ? ORDER BY change_seq LIMIT ?"
+SELECT_META = "SELECT value FROM meta WHERE key = ?"
+SELECT_STATS = (
+    "SELECT COUNT(*), COALESCE(SUM(is_active), 0), COALESCE(SUM(is_active AND completed), 0) FROM todos"
+)
+# 件数統計のカウンタ（全件・有効・有効かつ完了済み）のキー
+STAT_KEYS = ("stat_total", "stat_active", "stat_completed")
+SELECT_STAT_COUNTERS = "SELECT key, value FROM meta WHERE key IN ('stat_total', 'stat_active', 'stat_completed')"
+ADD_META = "UPDATE meta SET value = value + ? WHERE key = ?"
+INSERT_TODO = f"INSERT INTO todos ({COLUMNS}, change_seq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_SEARCH = "INSERT INTO todos_search (rowid, tokens) VALUES (?, ?)"
+SEARCH_PAGE = (
+    f"SELECT {', '.join('t.' + column for column in COLUMNS.split(', '))} "
+    "FROM todos_search JOIN todos t ON t.id = todos_search.rowid "
+    "WHERE todos_search MATCH ? AND todos_search.rowid > ? AND t.is_active = 1 "
+    "ORDER BY todos_search.rowid LIMIT ?"
+)
+UPDATE_META = "UPDATE meta SET value = ? WHERE key = ?"
+BUMP_GENERATION = "UPDATE meta SET value = value + 1 WHERE key = 'generation'"
+BUMP_EPOCH = "UPDATE meta SET value = value + 1 WHERE key = 'epoch'"
+STAMP_CHANGE = "UPDATE todos SET change_seq = ? WHERE id = ?"
+RAISE_CHANGE_FLOOR = "UPDATE meta SET value = MAX(value, ?) WHERE key = 'change_floor'"
+BUMP_CHANGE_SEQUENCE = "UPDATE meta SET value = value + 1 WHERE key = 'change_sequence'"
+RESET_CHANGE_FLOOR = (
+    "UPDATE meta SET value = (SELECT value FROM meta WHERE key = 'change_sequence') WHERE key = 'change_floor'"
+)
+DELETE_TOMBSTONES = (
+    "DELETE FROM todos WHERE id > ? AND id <= ? AND is_active = 0 AND updated_at < ? RETURNING change_seq"
+)
+SELECT_ANY_AFTER = "SELECT 1 FROM todos WHERE id > ? LIMIT 1"
+RELEASE_ID_LEASE = (
+    "UPDATE meta SET value = ? WHERE key = 'next_id' AND value = ? "
+    "AND (SELECT value FROM meta WHERE key = 'epoch') = ?"
+)
+
+
+def _to_record(row: tuple) -> ToDoRecord:
+    """SELECT した行（COLUMNS の順、末尾に change_seq を含む場合もある）を ToDoRecord に変換する"""
+    todo_id, title, description, completed, is_active, created_at, updated_at, *change_seq = row
+    return ToDoRecord(todo_id, title, description, bool(completed), bool(is_active), created_at, updated_at, *change_seq)
+
+
+def _stat_counts(todos: list[ToDoRecord]) -> tuple[int, int, int]:
+    """ToDoの件数統計（全件, 有効, 有効かつ完了済み）を数える"""
+    active = [todo for todo in todos if todo.is_active]
+    return len(todos), len(active), sum(1 for todo in active if todo.completed)
+
+
+def _add_stats(connection: sqlite3.Connection, total: int, active: int, completed: int) -> None:
+    """件数統計のカウンタに差分を加算する（書き込みトランザクション内専用）"""
+    deltas = [(delta, key) for delta, key in zip((total, active, completed), STAT_KEYS) if delta]
+    if deltas:
+        connection.executemany(ADD_META, deltas)
+
+
+def _search_row(todo: ToDoRecord) -> tuple[int, str]:
+    """ToDoRecord を全文検索テーブルの行（rowid, 空白区切りのトークン）に変換する"""
+    return todo.id, " ".join(tokenize(todo.search_text()))
+
+
+def _chunks(items: list[int]) -> list[list[int]]:
+    """ID_CHUNK_SIZE 件ずつに分割する"""
+    return [items[i:i + ID_CHUNK_SIZE] for i in range(0, len(items), ID_CHUNK_SIZE)]
+
+
+def _placeholders(count: int) -> str:
+    """IN 句用のプレースホルダ（?, ?, ...）を生成する"""
+    return ", ".join("?" * count)
+
+
+class SQLiteStorage(ToDoStorage):
+    """SQLiteをバックエンドとするストレージ
+
+    読み込み用の接続を pool_size 本、書き込み用の接続を1本保持します。
+    読み込みは pool_size スレッドのスレッドプールで、書き込みは1スレッドで直列に実行するため、
+    プロセス内の書き込み同士がロック待ちになることはありません。書き込みはトランザクションの
+    コミット後に応答するため、応答時点で永続化済みです。
+
+    変更シーケンス番号（meta.change_sequence）は書き込みトランザクション内で採番するため、
+    複数プロセスで共有してもコミット順に単調増加します。
+
+    IDは共有カウンタ（meta.next_id）から id_block_size 件ずつブロック単位でリースし、
+    リースの範囲内ではプロセス内で採番します。複数プロセスで共有してもIDは重複せず、
+    作成のたびに共有カウンタを更新する必要もありません（ID順は作成順と一致しなくなります）。
+    clear_database はエポック（meta.epoch）を進め、他プロセスが保持するリースを無効化します。
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, id_block_size: int = DEFAULT_ID_BLOCK_SIZE):
+        """
+        Args:
+            path (str): データベースファイルのパス（存在しない場合は作成）
+            pool_size (int): 読み込み用コネクションプールの接続数
+            id_block_size (int): 1回のリースで確保するIDの件数
+
+        Raises:
+            ValueError: pool_size または id_block_size が1未満の場合
+        """
+        if pool_size < 1:
+            raise ValueError(f"pool_size must be at least 1, got {pool_size}")
+        if id_block_size < 1:
+            raise ValueError(f"id_block_size must be at least 1, got {id_block_size}")
+
+        self.path = path
+        self.id_block_size = id_block_size
+
+        # リース中のIDブロック（次に割り当てるID, 終端（含まない）, リース時のエポック）
+        # 書き込みスレッドからのみ参照・更新する
+        self._lease: tuple[int, int, int] = (0, 0, -1)
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.executescript(SCHEMA)
+        self._migrate_change_sequence()
+        self._backfill_search_index()
+        self._backfill_stats()
+        # データベースの作成時に決めた識別子（全ワーカー・再起動後も同じ値）
+        self._store_id: int = self._writer.execute(SELECT_META, ("store_id",)).fetchone()[0]
+
+        self._readers: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._connections = [self._writer]
+        for _ in range(pool_size):
+            connection = self._connect()
+            self._readers.put(connection)
+            self._connections.append(connection)
+
+        self._read_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sqlite-read")
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-write")
+
+        # 全件取得レスポンスボディのキャッシュ（世代番号, JSONバイト列）
+        self._body_cache: Optional[tuple[int, bytes]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """WALモード用の設定を施した接続を作成する（トランザクションは明示的に制御する）"""
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        # WALモードでは NORMAL でもコミット済みデータの整合性は保たれる（電源断時に直近のコミットが失われうる）
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA busy_timeout = 5000")
+        return connection
+
+    def _migrate_change_sequence(self) -> None:
+        """
+        変更シーケンス番号の導入前に作成されたデータベースの場合、列を追加して既存のToDoに番号を付与する
+
+        既存のToDoにはID順に番号を付与します。列の有無はトランザクション内で確認するため、
+        複数プロセスが同時に起動しても移行は1回だけ行われます。
+        """
+        connection = self._writer
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(todos)")}
+            if "change_seq" not in columns:
+                connection.execute("ALTER TABLE todos ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0")
+                connection.execute("UPDATE todos SET change_seq = id")
+                connection.execute(
+                    "UPDATE meta SET value = (SELECT COALESCE(MAX(id), 0) FROM todos) WHERE key = 'change_sequence'"
+                )
+            connection.execute("CREATE INDEX IF NOT EXISTS todos_change_seq ON todos (change_seq)")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _backfill_search_index(self) -> None:
+        """
+        全文検索テーブル導入前、またはトークンの形式が異なる版で作成されたデータベースの場合、
+        有効なToDoを全文検索テーブルに登録し直す
+        """
+        connection = self._writer
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute(SELECT_META, ("search_index",)).fetchone()
+            if version is None or version[0] < SEARCH_INDEX_VERSION:
+                connection.execute("DELETE FROM todos_search")
+                rows = connection.execute(SELECT_PAGE, (0, -1))
+                connection.executemany(INSERT_SEARCH, (_search_row(_to_record(row)) for row in rows))
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('search_index', ?)", (SEARCH_INDEX_VERSION,)
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _backfill_stats(self) -> None:
+        """
+        件数統計のカウンタの導入前に作成されたデータベースの場合、全件を集計してカウンタを作成する
+
+        以降のカウンタは、ToDoを変更する書き込みと同じトランザクションで更新します。
+        """
+        connection = self._writer
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute(SELECT_META, ("stat_total",)).fetchone() is None:
+                counts = connection.execute(SELECT_STATS).fetchone()
+                connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", zip(STAT_KEYS, counts))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    async def _read(self, func: Callable[..., T], *args: Any) -> T:
+        """プールから借りた読み込み用接続で func(connection, *args) を別スレッドで実行する"""
+        def run() -> T:
+            connection = self._readers.get()
+            try:
+                return func(connection, *args)
+            finally:
+                self._readers.put(connection)
+
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, run)
+
+    async def _write(self, func: Callable[..., T], *args: Any, bump_generation: bool = True) -> T:
+        """
+        書き込み用接続のトランザクション内で func(connection, *args) を別スレッドで実行する
+
+        bump_generation が True の場合は同じトランザクションで世代番号を進めます
+        （一覧の内容が変化しない書き込みでは False を指定し、ETagを維持します）。
+        """
+        def run() -> T:
+            connection = self._writer
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(connection, *args)
+                if bump_generation:
+                    connection.execute(BUMP_GENERATION)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+        return await asyncio.get_running_loop().run_in_executor(self._write_executor, run)
+
+    async def get_all_active_todos(self) -> list[ToDoRecord]:
+        def run(connection: sqlite3.Connection) -> list[ToDoRecord]:
+            return [_to_record(row) for row in connection.execute(SELECT_PAGE, (0, -1))]
+
+        return await self._read(run)
+
+    async def get_active_todos_json_page(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        completed: Optional[bool] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        def run(connection: sqlite3.Connection) -> tuple[list[bytes], Optional[int], bool]:
+            # 後続データの有無を判定するため1件多く取得する
+            fetch = -1 if limit is None else limit + 1
+            if completed is None:
+                rows = connection.execute(SELECT_PAGE, (after_id, fetch)).fetchall()
+            else:
+                rows = connection.execute(SELECT_PAGE_BY_COMPLETED, (completed, after_id, fetch)).fetchall()
+
+            has_more = limit is not None and len(rows) > limit
+            if has_more:
+                rows = rows[:limit]
+            return [_to_record(row).to_json() for row in rows], (rows[-1][0] if rows else None), has_more
+
+        return await self._read(run)
+
+    async def search_todos_json(
+        self,
+        query: str,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        tokens, phrases = parse_query(query)
+        if not tokens:
+            return [], None, False
+        match = " ".join(f'"{token}"' for token in tokens)
+
+        def run(connection: sqlite3.Connection) -> tuple[list[bytes], Optional[int], bool]:
+            # フレーズ照合で除外される行があるため、必要な件数が揃うまで続きを取得する
+            fetch = -1 if limit is None else limit + 1
+            matched = []
+            cursor = after_id
+            while True:
+                rows = connection.execute(SEARCH_PAGE, (match, cursor, fetch)).fetchall()
+                for row in rows:
+                    todo = _to_record(row)
+                    if phrases:
+                        text = normalize_text(todo.search_text())
+                        if not all(phrase in text for phrase in phrases):
+                            continue
+                    if limit is not None and len(matched) == limit:
+                        return [todo.to_json() for todo in matched], matched[-1].id, True
+                    matched.append(todo)
+                if fetch == -1 or len(rows) < fetch:
+                    return [todo.to_json() for todo in matched], (matched[-1].id if matched else None), False
+                cursor = rows[-1][0]
+
+        return await self._read(run)
+
+    async def get_changes_json(
+        self,
+        since: int,
+        limit: Optional[int] = None,
+    ) -> Optional[tuple[list[bytes], int, bool]]:
+        def run(connection: sqlite3.Connection) -> Optional[tuple[list[bytes], int, bool]]:
+            # 変更シーケンス番号と行を同じ読み込みトランザクションで取得する
+            connection.execute("BEGIN")
+            try:
+                change_sequence = connection.execute(SELECT_META, ("change_sequence",)).fetchone()[0]
+                change_floor = connection.execute(SELECT_META, ("change_floor",)).fetchone()[0]
+                if since > change_sequence or 0 < since < change_floor:
+                    return None
+                # 後続データの有無を判定するため1件多く取得する
+                fetch = -1 if limit is None else limit + 1
+                rows = connection.execute(SELECT_CHANGES, (since, fetch)).fetchall()
+            finally:
+                connection.execute("COMMIT")
+
+            has_more = limit is not None and len(rows) > limit
+            if has_more:
+                rows = rows[:limit]
+            high_water_mark = rows[-1][-1] if has_more else change_sequence
+            return [_to_record(row).to_json() for row in rows], high_water_mark, has_more
+
+        return await self._read(run)
+
+    async def render_active_todos_json(self) -> tuple[int, bytes]:
+        cached = self._body_cache
+
+        def run(connection: sqlite3.Connection) -> tuple[int, bytes]:
+            # 世代番号と行を同じ読み込みトランザクションで取得し、整合したボディを構築する
+            connection.execute("BEGIN")
+            try:
+                generation = connection.execute(SELECT_META, ("generation",)).fetchone()[0]
+                if cached is not None and cached[0] == generation:
+                    return cached
+                rows = connection.execute(SELECT_PAGE, (0, -1))
+                body = b"[" + b",".join(_to_record(row).to_json() for row in rows) + b"]"
+            finally:
+                connection.execute("COMMIT")
+            return generation, body
+
+        self._body_cache = await self._read(run)
+        return self._body_cache
+
+    async def get_generation(self) -> int:
+        def run(connection: sqlite3.Connection) -> int:
+            return connection.execute(SELECT_META, ("generation",)).fetchone()[0]
+
+        return await self._read(run)
+
+    @property
+    def store_epoch(self) -> int:
+        return self._store_id
+
+    async def get_stats(self) -> dict[str, int]:
+        # 全件を走査せず、書き込みトランザクション内で更新されるカウンタを読み込む
+        def run(connection: sqlite3.Connection) -> dict[str, int]:
+            counters = dict(connection.execute(SELECT_STAT_COUNTERS).fetchall())
+            total, active, completed = (counters[key] for key in STAT_KEYS)
+            return {
+                "total": total,
+                "active": active,
+                "open": active - completed,
+                "completed": completed,
+                "deleted": total - active,
+            }
+
+        return await self._read(run)
+
+    async def get_todo_by_id(self, todo_id: int) -> Optional[ToDoRecord]:
+        def run(connection: sqlite3.Connection) -> Optional[ToDoRecord]:
+            row = connection.execute(SELECT_BY_ID, (todo_id,)).fetchone()
+            return _to_record(row) if row is not None else None
+
+        return await self._read(run)
+
+    async def get_todos_by_ids(self, todo_ids: list[int]) -> dict[int, ToDoRecord]:
+        def run(connection: sqlite3.Connection) -> dict[int, ToDoRecord]:
+            found = {}
+            for chunk in _chunks(list(dict.fromkeys(todo_ids))):
+                sql = f"SELECT {COLUMNS} FROM todos WHERE id IN ({_placeholders(len(chunk))})"
+                for row in connection.execute(sql, chunk):
+                    found[row[0]] = _to_record(row)
+            return found
+
+        return await self._read(run)
+
+    async def create_todo(self, todo_data: dict) -> ToDoRecord:
+        return (await self.create_todos([todo_data]))[0]
+
+    async def create_todos(self, todos_data: list[dict]) -> list[ToDoRecord]:
+        if not todos_data:
+            return []
+
+        records = []
+        for todo_data in todos_data:
+            created_at = to_epoch_seconds(todo_data["created_at"])
+            updated_at = (
+                created_at if todo_data["updated_at"] == todo_data["created_at"]
+                else to_epoch_seconds(todo_data["updated_at"])
+            )
+            records.append(ToDoRecord(
+                id=0,
+                title=todo_data["title"],
+                description=todo_data.get("description"),
+                completed=todo_data.get("completed", False),
+                is_active=todo_data.get("is_active", True),
+                created_at=created_at,
+                updated_at=updated_at,
+            ))
+
+        def run(connection: sqlite3.Connection) -> list[ToDoRecord]:
+            # 連続したIDを確保（トランザクションが失敗した場合はリースを元に戻す）
+            lease = self._lease
+            try:
+                first_id = self._allocate_ids(connection, len(records))
+                first_seq = self._allocate_change_sequence(connection, len(records))
+                for offset, todo in enumerate(records):
+                    todo.id = first_id + offset
+                    todo.change_seq = first_seq + offset
+                connection.executemany(INSERT_TODO, ((*todo.to_row(), todo.change_seq) for todo in records))
+                connection.executemany(INSERT_SEARCH, (_search_row(todo) for todo in records if todo.is_active))
+                _add_stats(connection, *_stat_counts(records))
+            except BaseException:
+                self._lease = lease
+                raise
+            return records
+
+        return await self._write(run)
+
+    def _allocate_ids(self, connection: sqlite3.Connection, count: int) -> int:
+        """
+        リース中のブロックから連続した count 件のIDを割り当てる（書き込みスレッドのトランザクション内専用）
+
+        リースの残りが足りない場合や、他プロセスの clear_database でエポックが進んでいる場合は、
+        共有カウンタから新しいブロックをリースします（残りのIDは欠番になります）。
+
+        Args:
+            connection (sqlite3.Connection): 書き込み用接続（トランザクション中）
+            count (int): 割り当てる件数
+
+        Returns:
+            int: 割り当てた先頭のID
+        """
+        next_id, end, epoch = self._lease
+        current_epoch = connection.execute(SELECT_META, ("epoch",)).fetchone()[0]
+        if epoch != current_epoch or next_id + count > end:
+            next_id = connection.execute(SELECT_META, ("next_id",)).fetchone()[0]
+            end = next_id + max(self.id_block_size, count)
+            connection.execute(UPDATE_META, (end, "next_id"))
+
+        self._lease = (next_id + count, end, current_epoch)
+        return next_id
+
+    def _allocate_change_sequence(self, connection: sqlite3.Connection, count: int) -> int:
+        """
+        連続した count 個の変更シーケンス番号を割り当てる（書き込みスレッドのトランザクション内専用）
+
+        Args:
+            connection (sqlite3.Connection): 書き込み用接続（トランザクション中）
+            count (int): 割り当てる個数
+
+        Returns:
+            int: 割り当てた先頭の番号
+        """
+        first_seq = connection.execute(SELECT_META, ("change_sequence",)).fetchone()[0] + 1
+        connection.execute(UPDATE_META, (first_seq + count - 1, "change_sequence"))
+        return first_seq
+
+    def _release_id_lease(self) -> None:
+        """
+        未使用のリースを共有カウンタに返却する（書き込みスレッド専用）
+
+        リース後に他プロセスが新しいブロックをリースしていない場合のみ返却するため、
+        単一プロセスで運用している限り、再起動をまたいでもIDに欠番が生じません。
+        """
+        next_id, end, epoch = self._lease
+        if next_id < end:
+            self._writer.execute(RELEASE_ID_LEASE, (next_id, end, epoch))
+        self._lease = (0, 0, -1)
+
+    async def update_todo(self, todo_id: int, updates: dict, only_active: bool = False) -> Optional[ToDoRecord]:
+        updated = await self.update_todos([todo_id], updates, only_active)
+        return updated[0] if updated else None
+
+    async def update_todos(self, todo_ids: list[int], updates: dict, only_active: bool = False) -> list[ToDoRecord]:
+        updates = ToDoRecord.normalize_updates(updates)
+        unknown = set(updates) - UPDATABLE_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+        todo_ids = list(dict.fromkeys(todo_ids))
+        if not todo_ids or not updates:
+            return []
+
+        assignments = ", ".join(f"{column} = ?" for column in updates)
+        values = list(updates.values())
+        reindex_search = not SEARCH_FIELDS.isdisjoint(updates)
+        # 有効かどうかの判定を UPDATE 文に含め、判定と更新の間に他の書き込みが入らないようにする
+        condition = " AND is_active = 1" if only_active else ""
+        # 有効・完了済みの状態が変化し得る場合は、更新前後の件数の差分を件数統計のカウンタに反映する
+        count_stats = not {"is_active", "completed"}.isdisjoint(updates)
+
+        def run(connection: sqlite3.Connection) -> list[ToDoRecord]:
+            found = {}
+            before = [0, 0, 0]
+            for chunk in _chunks(todo_ids):
+                if count_stats:
+                    counts = connection.execute(
+                        f"{SELECT_STATS} WHERE id IN ({_placeholders(len(chunk))}){condition}", chunk
+                    ).fetchone()
+                    before = [b + count for b, count in zip(before, counts)]
+                sql = (
+                    f"UPDATE todos SET {assignments} "
+                    f"WHERE id IN ({_placeholders(len(chunk))}){condition} RETURNING {COLUMNS}"
+                )
+                for row in connection.execute(sql, values + chunk):
+                    found[row[0]] = _to_record(row)
+
+                # 検索対象のフィールドが変化した場合は全文検索テーブルを更新（論理削除済みは登録しない）
+                if reindex_search:
+                    connection.execute(f"DELETE FROM todos_search WHERE rowid IN ({_placeholders(len(chunk))})", chunk)
+                    connection.executemany(INSERT_SEARCH, (
+                        _search_row(found[todo_id]) for todo_id in chunk
+                        if todo_id in found and found[todo_id].is_active
+                    ))
+
+            # 更新したToDoに todo_ids の順で変更シーケンス番号を付与する
+            updated = [found[todo_id] for todo_id in todo_ids if todo_id in found]
+            if count_stats:
+                _add_stats(connection, *(after - b for after, b in zip(_stat_counts(updated), before)))
+            if updated:
+                first_seq = self._allocate_change_sequence(connection, len(updated))
+                for offset, todo in enumerate(updated):
+                    todo.change_seq = first_seq + offset
+                connection.executemany(STAMP_CHANGE, ((todo.change_seq, todo.id) for todo in updated))
+                # 更新したToDoがない場合（only_active で除外されたなど）は世代番号（ETag）を変化させない
+                connection.execute(BUMP_GENERATION)
+            return updated
+
+        return await self._write(run, bump_generation=False)
+
+    async def compact_deleted(
+        self,
+        deleted_before: datetime,
+        after_id: int = 0,
+        max_ids: int = 1000,
+    ) -> tuple[int, Optional[int]]:
+        threshold = to_epoch_seconds(deleted_before)
+
+        def run(connection: sqlite3.Connection) -> tuple[int, Optional[int]]:
+            # ID範囲ごとに短いトランザクションで削除し、他の書き込みを長時間待たせない
+            end = after_id + max_ids
+            purged = [row[0] for row in connection.execute(DELETE_TOMBSTONES, (after_id, end, threshold))]
+            if purged:
+                # 物理削除した変更は差分として返せなくなるため、差分取得の下限を引き上げる
+                connection.execute(RAISE_CHANGE_FLOOR, (max(purged),))
+                # 物理削除するのは論理削除済みのToDoのみのため、全件数のみが減る
+                _add_stats(connection, -len(purged), 0, 0)
+            has_more = connection.execute(SELECT_ANY_AFTER, (end,)).fetchone() is not None
+            return len(purged), (end if has_more else None)
+
+        # 論理削除済みのToDoは一覧に含まれないため、世代番号（ETag）は変化させない
+        return await self._write(run, bump_generation=False)
+
+    async def clear_database(self) -> None:
+        def run(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM todos")
+            connection.execute("DELETE FROM todos_search")
+            connection.executemany(UPDATE_META, ((0, key) for key in STAT_KEYS))
+            connection.execute(UPDATE_META, (1, "next_id"))
+            connection.execute(BUMP_EPOCH)
+            # 初期化前の番号からの差分取得を拒否するため、番号を1つ進めて下限とする
+            connection.execute(BUMP_CHANGE_SEQUENCE)
+            connection.execute(RESET_CHANGE_FLOOR)
+
+        await self._write(run)
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._write_executor, self._release_id_lease)
+        self._read_executor.shutdown()
+        self._write_executor.shutdown()
+        for connection in self._connections:
+            connection.close()
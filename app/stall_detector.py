@@ -0,0 +1,152 @@
+"""
+イベントループの停止検出
+
+このモジュールは、イベントループの遅延を継続的に計測し、CPU処理などでループが
+しきい値を超えて停止した場合に、その間に実行されていたエンドポイントとスタックを記録する機能を提供します。
+
+- ハートビート（イベントループ上のタスク）: 一定間隔でスリープし、予定より遅れて再開した時間を
+  ループの遅延として記録します。遅延がしきい値以上なら停止として記録し、ログに出力します。
+- ウォッチドッグ（別スレッド）: ハートビートがしきい値を超えて再開しない場合に、
+  停止中のイベントループのスレッドのスタックを取得し、スタック上のエンドポイント関数を特定します。
+
+停止回数・停止時間はエンドポイントごとに app.metrics のメトリクスとして出力されます。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Iterable
+from contextlib import suppress
+from types import CodeType
+from typing import Optional
+
+from app.metrics import Metrics, metrics
+from app.utils.route_utils import iter_api_routes, route_name
+
+
+logger = logging.getLogger(__name__)
+
+# 停止中にエンドポイント関数を特定できなかった場合のエンドポイント名
+UNKNOWN_ENDPOINT = "<unknown>"
+
+# ログに出力するスタックの最大フレーム数（内側から）
+STACK_LIMIT = 30
+
+
+def endpoint_names(routes: Iterable) -> dict[CodeType, str]:
+    """
+    ルートのエンドポイント関数のコードオブジェクトから「メソッド パス」への対応表を作成
+
+    Args:
+        routes (Iterable): FastAPIアプリケーションのルート（app.routes）
+
+    Returns:
+        dict[CodeType, str]: コードオブジェクト → エンドポイント名（例: GET /todos）
+    """
+    names = {}
+    for route in iter_api_routes(routes):
+        code = getattr(route.endpoint, "__code__", None)
+        if code is not None:
+            names[code] = route_name(route)
+    return names
+
+
+class StallDetector:
+    """
+    イベントループの停止検出
+
+    Args:
+        threshold (float): 停止とみなすループの遅延（秒）
+        interval (float): ハートビートの間隔（秒）
+        endpoints (dict[CodeType, str]): エンドポイント関数のコードオブジェクト → エンドポイント名
+        recorder (Metrics): 記録先（省略時はグローバルの metrics）
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        interval: float,
+        endpoints: dict[CodeType, str],
+        recorder: Metrics = metrics,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.endpoints = endpoints
+        self.recorder = recorder
+
+        # ハートビートが最後にスリープを開始した時刻（イベントループのスレッドのみが書き込む）
+        self._last_beat = time.perf_counter()
+        # ウォッチドッグが停止中に取得した (ハートビートの時刻, エンドポイント名, スタック)
+        self._sample: Optional[tuple[float, str, str]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """ハートビートとウォッチドッグを開始（実行中のイベントループ上で呼び出す）"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="stall-detector", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """ハートビートとウォッチドッグを停止"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _heartbeat(self) -> None:
+        """一定間隔でスリープし、再開の遅れをループの遅延として記録する"""
+        while True:
+            beat = self._last_beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - beat - self.interval)
+            self.recorder.observe_loop_lag(lag)
+
+            sample, self._sample = self._sample, None
+            if lag < self.threshold:
+                continue
+            endpoint, stack = UNKNOWN_ENDPOINT, ""
+            if sample is not None and sample[0] == beat:
+                _, endpoint, stack = sample
+            self.recorder.record_stall(endpoint, lag)
+            logger.warning("Event loop was blocked for %.3fs in %s\n%s", lag, endpoint, stack)
+
+    def _watch(self) -> None:
+        """ハートビートが再開しない場合に、イベントループのスレッドのスタックを取得する（別スレッド）"""
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._last_beat
+            if time.perf_counter() - beat < self.interval + self.threshold:
+                continue
+            if self._sample is not None and self._sample[0] == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._sample = (beat, *self._inspect(frame))
+
+    def _inspect(self, frame) -> tuple[str, str]:
+        """
+        スタックからエンドポイント名を特定し、スタックを文字列に整形する
+
+        Returns:
+            tuple[str, str]: (エンドポイント名, 整形したスタック)
+        """
+        endpoint = UNKNOWN_ENDPOINT
+        current = frame
+        while current is not None:
+            name = self.endpoints.get(current.f_code)
+            if name is not None:
+                endpoint = name
+                break
+            current = current.f_back
+        stack = traceback.format_list(traceback.extract_stack(frame)[-STACK_LIMIT:])
+        return endpoint, "".join(stack)
@@ -0,0 +1,358 @@
+"""
+ストレージインターフェース
+
+このモジュールは、ルーターが使用するデータストア操作の抽象インターフェースと、
+既定のインメモリ実装（app.database をそのまま利用）を提供します。
+ディスクベースのエンジンは同じインターフェースを実装することで差し替えられます。
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+from app import database
+from app.database import ToDoRecord
+
+
+class ToDoStorage(ABC):
+    """ToDoデータストアのインターフェース
+
+    すべての操作はコルーチンで、I/Oを伴う実装はイベントループをブロックしないよう
+    処理を別スレッドに委譲します。取得・更新結果はいずれも ToDoRecord で返します。
+    """
+
+    @abstractmethod
+    async def get_all_active_todos(self) -> list[ToDoRecord]:
+        """
+        有効なすべてのToDoを取得（is_active=True のみ）
+
+        Returns:
+            list[ToDoRecord]: 有効なToDoのリスト（ID昇順）
+        """
+
+    @abstractmethod
+    async def get_active_todos_json_page(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        completed: Optional[bool] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        """
+        有効なToDoをキーセット方式で取得し、レスポンスと同一形式のJSONバイト列で返す
+
+        Args:
+            after_id (int): このIDより大きいToDoのみを返す（0の場合は先頭から）
+            limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+            completed (Optional[bool]): 完了状態での絞り込み（None の場合は絞り込みなし）
+
+        Returns:
+            tuple[list[bytes], Optional[int], bool]: 各ToDoのJSONバイト列（ID昇順）、
+            ページ内の最後のID（0件の場合は None）、後続データが存在するかどうか
+        """
+
+    @abstractmethod
+    async def search_todos_json(
+        self,
+        query: str,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        """
+        タイトル・説明にクエリのすべての語を含む有効なToDoを検索し、JSONバイト列で返す
+
+        Args:
+            query (str): 検索クエリ
+            after_id (int): このIDより大きいToDoのみを返す（0の場合は先頭から）
+            limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+
+        Returns:
+            tuple[list[bytes], Optional[int], bool]: 各ToDoのJSONバイト列（ID昇順）、
+            ページ内の最後のID（0件の場合は None）、後続データが存在するかどうか
+        """
+
+    @abstractmethod
+    async def get_changes_json(
+        self,
+        since: int,
+        limit: Optional[int] = None,
+    ) -> Optional[tuple[list[bytes], int, bool]]:
+        """
+        指定された変更シーケンス番号より後に作成・更新されたToDoを変更順に取得し、JSONバイト列で返す
+
+        論理削除されたToDoも含み、取得にかかる費用は since 以降の変更件数に比例します。
+
+        Args:
+            since (int): クライアントが保持する変更シーケンス番号（0の場合はすべてのToDo）
+            limit (Optional[int]): 最大取得件数（None の場合は末尾まで）
+
+        Returns:
+            Optional[tuple[list[bytes], int, bool]]: 各ToDoのJSONバイト列（変更順）、次回の since に
+            指定する変更シーケンス番号、後続の変更が存在するかどうか。since 以降の変更が物理削除・
+            初期化で失われている、または since が現在の変更シーケンス番号より大きい場合は None
+        """
+
+    @abstractmethod
+    async def render_active_todos_json(self) -> tuple[int, bytes]:
+        """
+        有効なすべてのToDoのJSON配列ボディを取得
+
+        Returns:
+            tuple[int, bytes]: ボディ生成時の世代番号と、JSON配列のバイト列（ID昇順）
+        """
+
+    @abstractmethod
+    async def get_generation(self) -> int:
+        """
+        ストアの現在の世代番号を取得（データが変化するたびに増加、ETag用）
+
+        Returns:
+            int: 現在の世代番号
+        """
+
+    @property
+    @abstractmethod
+    def store_epoch(self) -> int:
+        """
+        ETag・差分同期トークンに含めるストアのエポック
+
+        世代番号・変更シーケンス番号が以前と同じ値に戻り得る場合（再起動、スナップショットからの復元、
+        別のデータベースなど）に異なる値となり、以前に発行したETag・トークンとの一致を防ぎます。
+        """
+
+    @abstractmethod
+    async def get_stats(self) -> dict[str, int]:
+        """
+        ToDoの件数統計を取得
+
+        Returns:
+            dict[str, int]: total / active / open / completed / deleted の各件数
+        """
+
+    @abstractmethod
+    async def get_todo_by_id(self, todo_id: int) -> Optional[ToDoRecord]:
+        """
+        指定されたIDのToDoを取得
+
+        Args:
+            todo_id (int): ToDo ID
+
+        Returns:
+            Optional[ToDoRecord]: 指定されたIDのToDoレコード、または None（存在しない場合）
+        """
+
+    @abstractmethod
+    async def get_todos_by_ids(self, todo_ids: list[int]) -> dict[int, ToDoRecord]:
+        """
+        指定された複数のIDのToDoを取得
+
+        Args:
+            todo_ids (list[int]): ToDo IDのリスト
+
+        Returns:
+            dict[int, ToDoRecord]: 存在するToDoのIDとレコードの辞書（存在しないIDは含まない）
+        """
+
+    @abstractmethod
+    async def create_todo(self, todo_data: dict) -> ToDoRecord:
+        """
+        新しいToDoを作成
+
+        Args:
+            todo_data (dict): ToDoデータ（id は自動設定、created_at / updated_at は datetime）
+
+        Returns:
+            ToDoRecord: 作成されたToDoレコード
+        """
+
+    @abstractmethod
+    async def create_todos(self, todos_data: list[dict]) -> list[ToDoRecord]:
+        """
+        複数のToDoを一括作成（連続したIDを割り当て）
+
+        Args:
+            todos_data (list[dict]): ToDoデータのリスト
+
+        Returns:
+            list[ToDoRecord]: 作成されたToDoレコードのリスト（todos_data と同じ順序）
+        """
+
+    @abstractmethod
+    async def update_todo(self, todo_id: int, updates: dict, only_active: bool = False) -> Optional[ToDoRecord]:
+        """
+        指定されたIDのToDoを更新
+
+        only_active の判定と更新は不可分に行われるため、事前に読み込んだ状態が
+        更新までの間に変化していても（並行した削除など）、論理削除済みのToDoは更新されません。
+
+        Args:
+            todo_id (int): ToDo ID
+            updates (dict): 更新するフィールドと値（created_at / updated_at は datetime）
+            only_active (bool): True の場合、論理削除済みのToDoは更新しない
+
+        Returns:
+            Optional[ToDoRecord]: 更新後のToDoレコード、または None（存在しない、または only_active で論理削除済みの場合）
+        """
+
+    @abstractmethod
+    async def update_todos(self, todo_ids: list[int], updates: dict, only_active: bool = False) -> list[ToDoRecord]:
+        """
+        複数のToDoに同じ更新を一括適用
+
+        Args:
+            todo_ids (list[int]): 更新対象のToDo ID（存在しないIDは無視）
+            updates (dict): 更新するフィールドと値（created_at / updated_at は datetime）
+            only_active (bool): True の場合、論理削除済みのToDoは更新しない（無視する）
+
+        Returns:
+            list[ToDoRecord]: 更新後のToDoレコードのリスト（todo_ids の順序、重複は除外）
+        """
+
+    @abstractmethod
+    async def compact_deleted(
+        self,
+        deleted_before: datetime,
+        after_id: int = 0,
+        max_ids: int = 1000,
+    ) -> tuple[int, Optional[int]]:
+        """
+        保持期間を過ぎた論理削除済みのToDoを、ID範囲 (after_id, after_id + max_ids] について物理削除
+
+        Args:
+            deleted_before (datetime): この日時より前に論理削除されたToDoを削除対象とする
+            after_id (int): このIDより大きいToDoから走査する
+            max_ids (int): 1回に走査するIDの範囲
+
+        Returns:
+            tuple[int, Optional[int]]: 物理削除した件数と、次に走査を開始するカーソル（末尾まで走査した場合は None）
+        """
+
+    @abstractmethod
+    async def clear_database(self) -> None:
+        """データベースを初期化（テスト用、世代番号はリセットせずに増加）"""
+
+    async def wait_for_durability(self) -> None:
+        """これまでの変更が永続化されるまで待機（既定では変更時点で永続化済みとして即座に戻る）"""
+
+    async def close(self) -> None:
+        """ストレージが保持する資源を解放"""
+
+
+class InMemoryStorage(ToDoStorage):
+    """インメモリストレージ（既定）
+
+    app.database のモジュール関数をそのまま呼び出します。各操作は await を挟まずに
+    完結するため、別スレッドには委譲せずイベントループ上で直接実行します。
+    """
+
+    async def get_all_active_todos(self) -> list[ToDoRecord]:
+        return database.get_all_active_todos()
+
+    async def get_active_todos_json_page(
+        self,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        completed: Optional[bool] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        page_ids, has_more = database.get_active_todo_ids_page(after_id, limit, completed)
+        return database.get_todos_json(page_ids), (page_ids[-1] if page_ids else None), has_more
+
+    async def search_todos_json(
+        self,
+        query: str,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+    ) -> tuple[list[bytes], Optional[int], bool]:
+        # 転置インデックスが未構築の場合は（起動時のバックグラウンド構築と並行して）構築を進めて待つ
+        await database.build_search_index()
+        page_ids, has_more = database.search_active_todo_ids(query, after_id, limit)
+        return database.get_todos_json(page_ids), (page_ids[-1] if page_ids else None), has_more
+
+    async def get_changes_json(
+        self,
+        since: int,
+        limit: Optional[int] = None,
+    ) -> Optional[tuple[list[bytes], int, bool]]:
+        changes = database.get_changed_todo_ids(since, limit)
+        if changes is None:
+            return None
+        changed_ids, high_water_mark, has_more = changes
+        return database.get_todos_json(changed_ids), high_water_mark, has_more
+
+    async def render_active_todos_json(self) -> tuple[int, bytes]:
+        return database.render_active_todos_json()
+
+    async def get_generation(self) -> int:
+        return database.get_generation()
+
+    @property
+    def store_epoch(self) -> int:
+        return database.store_epoch
+
+    async def get_stats(self) -> dict[str, int]:
+        return database.get_stats()
+
+    async def get_todo_by_id(self, todo_id: int) -> Optional[ToDoRecord]:
+        return database.get_todo_by_id(todo_id)
+
+    async def get_todos_by_ids(self, todo_ids: list[int]) -> dict[int, ToDoRecord]:
+        found = {}
+        for todo_id in todo_ids:
+            todo = database.get_todo_by_id(todo_id)
+            if todo is not None:
+                found[todo_id] = todo
+        return found
+
+    async def create_todo(self, todo_data: dict) -> ToDoRecord:
+        return database.create_todo(todo_data)
+
+    async def create_todos(self, todos_data: list[dict]) -> list[ToDoRecord]:
+        return database.create_todos(todos_data)
+
+    async def update_todo(self, todo_id: int, updates: dict, only_active: bool = False) -> Optional[ToDoRecord]:
+        return database.update_todo(todo_id, updates, only_active)
+
+    async def update_todos(self, todo_ids: list[int], updates: dict, only_active: bool = False) -> list[ToDoRecord]:
+        return database.update_todos(todo_ids, updates, only_active)
+
+    async def compact_deleted(
+        self,
+        deleted_before: datetime,
+        after_id: int = 0,
+        max_ids: int = 1000,
+    ) -> tuple[int, Optional[int]]:
+        return database.compact_deleted(deleted_before, after_id, max_ids)
+
+    async def clear_database(self) -> None:
+        database.clear_database()
+
+    async def wait_for_durability(self) -> None:
+        await database.wait_for_durability()
+
+
+# グローバル変数：APIが使用するストレージ（既定はインメモリ）
+storage: ToDoStorage = InMemoryStorage()
+
+
+def get_storage() -> ToDoStorage:
+    """
+    APIが使用するストレージを取得
+
+    Returns:
+        ToDoStorage: 現在のストレージ
+    """
+    return storage
+
+
+def set_storage(new_storage: ToDoStorage) -> ToDoStorage:
+    """
+    APIが使用するストレージを差し替える
+
+    Args:
+        new_storage (ToDoStorage): 以降のリクエストで使用するストレージ
+
+    Returns:
+        ToDoStorage: 差し替え前のストレージ
+    """
+    global storage
+    previous, storage = storage, new_storage
+    return previous
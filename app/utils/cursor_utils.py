@@ -0,0 +1,58 @@
+"""
+ページングカーソルユーティリティ
+
+このモジュールは、キーセットページングで使用する
+不透明なカーソル文字列のエンコード・デコード機能を提供します。
+"""
+
+import base64
+import binascii
+
+from app.models import InvalidCursorException
+
+
+# カーソル文字列のプレフィックス（形式のバージョン識別用）
+CURSOR_PREFIX = "id:"
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    ページ末尾のToDo IDからカーソル文字列を生成
+
+    Args:
+        last_id (int): ページ末尾のToDo ID
+
+    Returns:
+        str: URLセーフなカーソル文字列
+
+    Examples:
+        >>> decode_cursor(encode_cursor(42))
+        42
+    """
+    raw = f"{CURSOR_PREFIX}{last_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    カーソル文字列からToDo IDを復元
+
+    Args:
+        cursor (str): encode_cursor で生成されたカーソル文字列
+
+    Returns:
+        int: カーソルが指すToDo ID
+
+    Raises:
+        InvalidCursorException: カーソル文字列が不正な場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorException(cursor) from None
+
+    if not raw.startswith(CURSOR_PREFIX) or not raw[len(CURSOR_PREFIX):].isdigit():
+        raise InvalidCursorException(cursor)
+
+    return int(raw[len(CURSOR_PREFIX):])
@@ -5,6 +5,7 @@
 """
 
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 
 
 # JSTタイムゾーン（UTC+09:00）
@@ -25,4 +26,60 @@ def get_current_jst_time() -> datetime:
         >>> now.microsecond
         0
     """
-    return datetime.now(JST).replace(microsecond=0)
\ No newline at end of file
+    return datetime.now(JST).replace(microsecond=0)
+
+
+def to_epoch_seconds(value: datetime) -> int:
+    """
+    タイムゾーン付き日時をUNIXエポック秒に変換
+
+    get_current_jst_time はマイクロ秒を切り捨てるため、秒単位の整数で情報は失われません。
+
+    Args:
+        value (datetime): タイムゾーン付きの日時
+
+    Returns:
+        int: UNIXエポック秒
+
+    Examples:
+        >>> to_epoch_seconds(datetime(2025, 10, 30, 10, 30, tzinfo=JST))
+        1761787800
+    """
+    return int(value.timestamp())
+
+
+def from_epoch_seconds(seconds: int) -> datetime:
+    """
+    UNIXエポック秒をJSTタイムゾーン付き日時に変換
+
+    Args:
+        seconds (int): UNIXエポック秒
+
+    Returns:
+        datetime: JSTタイムゾーン付きの日時（マイクロ秒なし）
+
+    Examples:
+        >>> from_epoch_seconds(1761787800).isoformat()
+        '2025-10-30T10:30:00+09:00'
+    """
+    return datetime.fromtimestamp(seconds, JST)
+
+
+@lru_cache(maxsize=4096)
+def format_epoch_seconds(seconds: int) -> str:
+    """
+    UNIXエポック秒をJSTのISO 8601文字列に変換（ToDoレスポンスの日時と同一形式）
+
+    同じ時刻（一括作成・一括更新で共通のタイムスタンプなど）は変換結果を再利用します。
+
+    Args:
+        seconds (int): UNIXエポック秒
+
+    Returns:
+        str: JSTオフセット付きのISO 8601文字列
+
+    Examples:
+        >>> format_epoch_seconds(1761787800)
+        '2025-10-30T10:30:00+09:00'
+    """
+    return from_epoch_seconds(seconds).isoformat()
@@ -0,0 +1,61 @@
+"""
+ETagユーティリティ
+
+このモジュールは、ストアのエポックと世代番号に基づくETagの生成と
+If-None-Match ヘッダとの照合機能を提供します。
+"""
+
+
+def make_etag(epoch: int, generation: int) -> str:
+    """
+    ストアのエポックと世代番号から強いETagを生成
+
+    世代番号は再起動やスナップショットからの復元で同じ値に戻り得るため、
+    ストアごとに異なるエポックを含めて、以前に発行したETagと一致しないようにします。
+
+    Args:
+        epoch (int): ストアのエポック
+        generation (int): ストアの世代番号
+
+    Returns:
+        str: ダブルクォートで囲まれたETag値
+
+    Examples:
+        >>> make_etag(0x3f2a9c1e, 42)
+        '"3f2a9c1e-g42"'
+    """
+    return f'"{epoch:x}-g{generation}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match ヘッダの値がETagと一致するか判定
+
+    RFC 9110 に従い弱い比較を行います（W/ プレフィックスは無視）。
+
+    Args:
+        if_none_match (str | None): If-None-Match ヘッダの値
+        etag (str): 現在のETag値
+
+    Returns:
+        bool: いずれかのETagが一致する、または "*" の場合は True
+
+    Examples:
+        >>> etag_matches('W/"3f2a9c1e-g41", "3f2a9c1e-g42"', '"3f2a9c1e-g42"')
+        True
+        >>> etag_matches(None, '"3f2a9c1e-g42"')
+        False
+    """
+    if if_none_match is None:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
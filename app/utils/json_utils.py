@@ -0,0 +1,95 @@
+"""
+JSONエンコードユーティリティ
+
+このモジュールは、APIレスポンスのJSONエンコード機能を提供します。
+エンコーダは orjson（インストールされている場合）または標準ライブラリの json から選択でき、
+どちらもFastAPI既定の JSONResponse と同一のバイト列（区切りの空白なし、非ASCII文字は
+エスケープせずUTF-8）を出力します。
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 選択可能なJSONエンコーダ
+# auto:   orjson がインストールされていれば orjson、なければ stdlib
+# orjson: orjson（未インストールの場合は設定エラー）
+# stdlib: 標準ライブラリの json
+JSON_ENCODERS = ("auto", "orjson", "stdlib")
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    """標準ライブラリの json でエンコードする（FastAPI既定の JSONResponse と同じ引数）"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    """orjson でエンコードする"""
+    return orjson.dumps(content)
+
+
+# グローバル変数：使用中のJSONエンコーダの名前と関数
+encoder_name: str = "orjson" if orjson is not None else "stdlib"
+_dumps: Callable[[Any], bytes] = _orjson_dumps if orjson is not None else _stdlib_dumps
+
+
+def set_json_encoder(name: str) -> str:
+    """
+    以降のエンコードに使用するJSONエンコーダを設定
+
+    Args:
+        name (str): JSON_ENCODERS のいずれか
+
+    Returns:
+        str: 実際に使用するエンコーダの名前（orjson / stdlib）
+
+    Raises:
+        ValueError: 名前が不正な場合、または orjson が指定されたがインストールされていない場合
+    """
+    global encoder_name, _dumps
+
+    if name not in JSON_ENCODERS:
+        raise ValueError(f"JSON encoder must be one of {JSON_ENCODERS}, got {name!r}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON encoder 'orjson' is not installed")
+
+    use_orjson = orjson is not None and name != "stdlib"
+    encoder_name = "orjson" if use_orjson else "stdlib"
+    _dumps = _orjson_dumps if use_orjson else _stdlib_dumps
+    return encoder_name
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON互換の値を設定中のエンコーダでエンコード
+
+    Args:
+        content (Any): dict / list / str / int / float / bool / None からなる値
+
+    Returns:
+        bytes: JSONのバイト列（UTF-8）
+
+    Examples:
+        >>> dumps({"id": 1, "completed": False, "description": None})
+        b'{"id":1,"completed":false,"description":null}'
+    """
+    return _dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """設定中のJSONエンコーダでボディを生成する JSONResponse
+
+    FastAPIアプリケーションの default_response_class に指定すると、
+    レスポンスモデルを返すすべてのエンドポイントのエンコードに使用されます。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
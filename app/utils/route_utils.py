@@ -0,0 +1,45 @@
+"""
+ルートユーティリティ
+
+このモジュールは、FastAPIアプリケーションのルートの列挙と、
+メトリクスや設定で使用するルート名（「メソッド パス」形式）の生成機能を提供します。
+"""
+
+from collections.abc import Iterable, Iterator
+
+from fastapi.routing import APIRoute
+
+
+def iter_api_routes(routes: Iterable) -> Iterator[APIRoute]:
+    """
+    アプリケーションのルートから APIRoute を列挙（include_router したルーターのルートを含む）
+
+    新しいバージョンのFastAPIでは include_router したルーターのルートが展開されずに保持されるため、
+    再帰的にたどります（このアプリでは include_router に prefix を指定しないため、
+    ルーターのパスをそのまま使用できます）。
+
+    Args:
+        routes (Iterable): FastAPIアプリケーションのルート（app.routes）
+
+    Yields:
+        APIRoute: エンドポイントのルート
+    """
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            yield from iter_api_routes(included.routes)
+        elif isinstance(route, APIRoute):
+            yield route
+
+
+def route_name(route: APIRoute) -> str:
+    """
+    ルートを「メソッド パス」形式の名前に変換
+
+    Args:
+        route (APIRoute): エンドポイントのルート
+
+    Returns:
+        str: ルート名（例: PATCH /todos/{id}/complete）
+    """
+    return f"{','.join(sorted(route.methods))} {route.path}"
@@ -0,0 +1,90 @@
+"""
+全文検索ユーティリティ
+
+このモジュールは、全文検索の転置インデックスで使用するトークン分割機能を提供します。
+
+テキストはNFKC正規化（全角英数字・半角カナの統一）と小文字化を行ったうえで、
+日本語などのCJK文字の連続は文字バイグラム（2文字ずつ）と1文字ずつのユニグラムに、
+それ以外の英数字などは単語単位に分割します。
+検索クエリでは、2文字以上のCJK文字の連続はバイグラムのみ、1文字だけの場合はその1文字で照合します
+（ユニグラムは1文字の検索語のためだけに登録します）。
+"""
+
+import re
+import unicodedata
+
+
+# CJK文字（ひらがな・カタカナ・CJK統合漢字・互換漢字・ハングル）
+CJK_CHARACTERS = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+
+# CJK文字の連続、またはそれ以外の単語構成文字の連続
+TOKEN_PATTERN = re.compile(f"([{CJK_CHARACTERS}]+)|([^\\W{CJK_CHARACTERS}]+)")
+
+
+def normalize_text(text: str) -> str:
+    """
+    検索用にテキストを正規化（NFKC正規化と小文字化）
+
+    Args:
+        text (str): 正規化するテキスト
+
+    Returns:
+        str: 正規化したテキスト
+    """
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize(text: str) -> set[str]:
+    """
+    テキストを転置インデックスに登録するトークンに分割
+
+    Args:
+        text (str): 分割するテキスト
+
+    Returns:
+        set[str]: トークンの集合（CJK文字はバイグラムとユニグラム）
+
+    Examples:
+        >>> sorted(tokenize("牛乳を ＴＯＤＯ"))
+        ['todo', 'を', '乳', '乳を', '牛', '牛乳']
+    """
+    tokens = set()
+    for cjk, word in TOKEN_PATTERN.findall(normalize_text(text)):
+        if word:
+            tokens.add(word)
+        else:
+            tokens.update(cjk)
+            tokens.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _query_tokens(text: str) -> set[str]:
+    """検索クエリを照合用のトークンに分割（CJK文字の連続は、2文字以上ならバイグラムのみ）"""
+    tokens = set()
+    for cjk, word in TOKEN_PATTERN.findall(text):
+        if word:
+            tokens.add(word)
+        elif len(cjk) == 1:
+            tokens.add(cjk)
+        else:
+            tokens.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def parse_query(query: str) -> tuple[set[str], list[str]]:
+    """
+    検索クエリをトークンと照合用フレーズに分割
+
+    3文字以上のCJK文字の連続は、バイグラムがすべて含まれていても連続して出現するとは
+    限らないため、検索結果を絞り込む照合用フレーズとしても返します。
+
+    Args:
+        query (str): 検索クエリ
+
+    Returns:
+        tuple[set[str], list[str]]: すべてを含むToDoを検索するトークンの集合と、
+        正規化済みテキストに部分文字列として含まれる必要があるフレーズのリスト
+    """
+    normalized = normalize_text(query)
+    phrases = [cjk for cjk, _ in TOKEN_PATTERN.findall(normalized) if len(cjk) >= 3]
+    return _query_tokens(normalized), phrases
@@ -0,0 +1,64 @@
+"""
+並行した同一処理の集約（single-flight）
+
+このモジュールは、同じキーで同時に呼び出された非同期処理を1回の実行にまとめ、
+実行中の処理の結果をすべての呼び出し元で共有する機能を提供します。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    同一キーの並行した非同期処理を1回の実行にまとめる
+
+    実行中の処理と同じキーで呼び出された場合は新たに実行せず、その処理の完了を待って同じ結果を返します
+    （例外も同様に共有します）。完了した結果は保持しないため、キャッシュではありません。
+    処理は独立したタスクとして実行するため、最初の呼び出し元がキャンセルされても
+    （クライアントの切断など）ほかの呼び出し元には影響しません。
+    タスクは即座に実行を開始するため、await で中断せずに完了する処理（インメモリストレージなど）では
+    イベントループを経由せず、集約しない場合と同じコストで結果を返します。
+
+    呼び出しはイベントループ上でのみ行われるため、ロックは使用しません。
+    """
+
+    def __init__(self):
+        # キー → 実行中の処理のタスク
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        キーに対応する処理を実行、または実行中の処理の結果を待機
+
+        Args:
+            key (Hashable): 同一の処理とみなすキー
+            func (Callable[[], Awaitable[T]]): 実行中の処理がない場合に実行する処理
+
+        Returns:
+            tuple[T, bool]: 処理の結果と、実行中の処理の結果を共有したかどうか
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.Task(func(), loop=asyncio.get_running_loop(), eager_start=True)
+            if task.done():
+                return task.result(), False
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        """完了した処理を取り除く（呼び出し元がすべてキャンセルされた場合の例外は取得済みにする）"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        """実行中の処理の数"""
+        return len(self._calls)
@@ -0,0 +1,70 @@
+"""
+差分同期トークンユーティリティ
+
+このモジュールは、差分同期（GET /todos?since=）で使用する
+「ストアのエポック-変更シーケンス番号」形式のトークンの生成・解析機能を提供します。
+
+変更シーケンス番号は再起動（WALなしのインメモリストレージ）やデータベースの作り直しで
+0から数え直しになるため、ストアのエポックを含めて以前のストアで発行されたトークンを判別します。
+"""
+
+import re
+from typing import Optional
+
+
+# トークンの形式（全件取得の "0"、または「16進数のエポック-変更シーケンス番号」）
+CHANGE_TOKEN_PATTERN = r"^(0|[0-9a-f]+-[0-9]+)$"
+
+_CHANGE_TOKEN_RE = re.compile(CHANGE_TOKEN_PATTERN)
+
+
+def encode_change_token(epoch: int, sequence: int) -> str:
+    """
+    ストアのエポックと変更シーケンス番号から差分同期トークンを生成
+
+    Args:
+        epoch (int): ストアのエポック
+        sequence (int): 変更シーケンス番号
+
+    Returns:
+        str: 差分同期トークン
+
+    Examples:
+        >>> encode_change_token(0x3f2a9c1e, 1250)
+        '3f2a9c1e-1250'
+    """
+    return f"{epoch:x}-{sequence}"
+
+
+def decode_change_token(token: str, epoch: int) -> Optional[int]:
+    """
+    差分同期トークンから変更シーケンス番号を復元
+
+    Args:
+        token (str): 差分同期トークン（CHANGE_TOKEN_PATTERN に一致すること）
+        epoch (int): 現在のストアのエポック
+
+    Returns:
+        Optional[int]: 変更シーケンス番号（"0" の場合は 0）、
+        他のストア（再起動前・作り直す前など）で発行されたトークンの場合は None
+
+    Raises:
+        ValueError: トークンの形式が不正な場合
+
+    Examples:
+        >>> decode_change_token("3f2a9c1e-1250", 0x3f2a9c1e)
+        1250
+        >>> decode_change_token("0", 0x3f2a9c1e)
+        0
+        >>> decode_change_token("1b-1250", 0x3f2a9c1e) is None
+        True
+    """
+    if not _CHANGE_TOKEN_RE.match(token):
+        raise ValueError(f"Invalid change token: {token!r}")
+    if token == "0":
+        return 0
+
+    token_epoch, _, sequence = token.partition("-")
+    if int(token_epoch, 16) != epoch:
+        return None
+    return int(sequence)
@@ -0,0 +1,325 @@
+"""
+追記型ログ（WAL: Write-Ahead Log）
+
+このモジュールは、データストアへの変更を1行1件のJSONとしてファイルに追記し、
+再起動時に再生して状態を復元するためのログ機能を提供します。
+各行には追記順の通し番号（LSN）が "n" として記録されます。
+
+書き込みは専用のスレッドで行い、イベントループをブロックしません。
+一定時間内に到着した書き込みはまとめて1回のfsyncで永続化します（グループコミット）。
+書き込み・fsyncに失敗した場合（ディスクフルなど）、ログは失敗状態となり、
+永続化を待機中・以降の操作はすべて WriteAheadLogError で失敗します。
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+
+from app.config import WAL_FSYNC_POLICIES
+
+
+class WriteAheadLogError(RuntimeError):
+    """追記型ログの書き込みに失敗した（以降のレコードは永続化されない）場合に送出される例外"""
+
+
+class WriteAheadLog:
+    """追記型ログファイル
+
+    append でレコードをキューに積み、書き込みスレッドがバッチ単位でファイルに追記します。
+    各レコードには追記順の通し番号（LSN）が割り当てられ、wait_durable で
+    指定したLSNまでの永続化を非同期に待つことができます。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync_policy: str = "group",
+        group_commit_window: float = 0.001,
+        fsync_interval: float = 1.0,
+        start_lsn: int = 0,
+    ):
+        """
+        Args:
+            path (str): ログファイルのパス（存在しない場合は作成）
+            fsync_policy (str): fsyncポリシー（always / group / interval / off）
+            group_commit_window (float): 後続の書き込みを待ち合わせる時間（秒）
+            fsync_interval (float): fsyncポリシーが interval の場合のfsync間隔（秒）
+            start_lsn (int): 既存ログの最終LSN（以降のレコードはこの次の番号から採番）
+
+        Raises:
+            ValueError: fsyncポリシーが不正な場合
+        """
+        if fsync_policy not in WAL_FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {WAL_FSYNC_POLICIES}, got {fsync_policy!r}")
+
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.group_commit_window = group_commit_window
+        self.fsync_interval = fsync_interval
+
+        self._file = open(path, "ab")
+        self._condition = threading.Condition()
+        self._pending: list[bytes] = []
+        self._appended_lsn = start_lsn
+        self._durable_lsn = start_lsn
+        self._truncate_upto: int | None = None
+        self._waiters: list[tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._closed = False
+        # 書き込みスレッドで発生した例外（発生後はログを使用できない）
+        self._error: BaseException | None = None
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name="wal-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def waits_for_fsync(self) -> bool:
+        """応答前にfsyncを待つポリシーかどうか"""
+        return self.fsync_policy in ("always", "group")
+
+    def append(self, entry: dict) -> int:
+        """
+        レコードを書き込みキューに追加（ブロックしない）
+
+        Args:
+            entry (dict): JSONシリアライズ可能なレコード
+
+        Returns:
+            int: 割り当てられたLSN
+
+        Raises:
+            WriteAheadLogError: 書き込みスレッドが書き込みに失敗している場合
+        """
+        with self._condition:
+            self._raise_if_failed()
+            if self._closed:
+                raise RuntimeError("write-ahead log is closed")
+            self._appended_lsn += 1
+            lsn = self._appended_lsn
+            line = json.dumps({"n": lsn, **entry}, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+            self._pending.append(line)
+            self._condition.notify()
+        return lsn
+
+    @property
+    def appended_lsn(self) -> int:
+        """最後に追記（キューに追加）したレコードのLSN"""
+        return self._appended_lsn
+
+    def truncate(self, upto_lsn: int) -> None:
+        """
+        指定したLSN以前のレコードをログから削除するよう書き込みスレッドに依頼（ブロックしない）
+
+        スナップショットに反映済みのレコードを取り除き、ログの肥大化を防ぎます。
+
+        Args:
+            upto_lsn (int): 削除するレコードの最大LSN
+        """
+        with self._condition:
+            self._truncate_upto = max(self._truncate_upto or 0, upto_lsn)
+            self._condition.notify()
+
+    async def wait_durable(self, lsn: int) -> None:
+        """
+        指定したLSNまでのレコードが永続化されるまで待機
+
+        fsyncを待たないポリシー（interval / off）の場合は即座に戻ります。
+
+        Args:
+            lsn (int): 待機対象のLSN
+
+        Raises:
+            WriteAheadLogError: 永続化前に書き込みスレッドが書き込みに失敗した場合
+        """
+        if not self.waits_for_fsync:
+            return
+
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._durable_lsn >= lsn:
+                return
+            self._raise_if_failed()
+            future = loop.create_future()
+            self._waiters.append((lsn, loop, future))
+
+        await future
+
+    def close(self) -> None:
+        """未書き込みのレコードを書き出してfsyncし、ログファイルを閉じる"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+
+    def _raise_if_failed(self) -> None:
+        """書き込みスレッドが失敗していれば WriteAheadLogError を送出する（_condition の保持中に呼び出す）"""
+        if self._error is not None:
+            raise WriteAheadLogError(f"write-ahead log writer failed: {self._error!r}") from self._error
+
+    def _run(self) -> None:
+        """書き込みスレッド：書き込みに失敗した場合はログを失敗状態にし、待機中のリクエストに例外を通知する"""
+        try:
+            self._write_loop()
+        except Exception as exc:
+            self._fail(exc)
+
+    def _fail(self, error: Exception) -> None:
+        """ログを失敗状態にし、待機中のリクエストをすべて WriteAheadLogError で再開させる"""
+        with self._condition:
+            self._error = error
+            self._pending = []
+            waiters, self._waiters = self._waiters, []
+
+        for _, loop, future in waiters:
+            exception = WriteAheadLogError(f"write-ahead log writer failed: {error!r}")
+            exception.__cause__ = error
+            loop.call_soon_threadsafe(_reject, future, exception)
+
+    def _write_loop(self) -> None:
+        """キューのレコードをバッチ単位で追記・fsyncする"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed and self._truncate_upto is None:
+                    # interval ポリシーで未fsyncのデータがあれば、書き込みがなくても間隔ごとにfsyncする
+                    interval_due = self.fsync_policy == "interval" and self._unsynced
+                    timeout = self.fsync_interval if interval_due else None
+                    if not self._condition.wait(timeout) and interval_due:
+                        break
+                if not self._pending and self._closed:
+                    break
+
+            if self._truncate_upto is not None:
+                self._rewrite_without_prefix()
+
+            if not self._pending:
+                self._fsync()
+                continue
+
+            # 後続の書き込みを待ち合わせて1回のfsyncにまとめる
+            if self.fsync_policy == "group" and self.group_commit_window > 0:
+                time.sleep(self.group_commit_window)
+
+            with self._condition:
+                batch = self._pending
+                self._pending = []
+                batch_lsn = self._appended_lsn
+
+            self._write(batch)
+            self._mark_durable(batch_lsn)
+
+        self._fsync()
+        self._mark_durable(self._appended_lsn)
+
+    def _write(self, batch: list[bytes]) -> None:
+        """バッチをファイルに追記し、ポリシーに従ってfsyncする"""
+        if self.fsync_policy == "always":
+            for line in batch:
+                self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            return
+
+        self._file.write(b"".join(batch))
+        self._file.flush()
+        self._unsynced = True
+
+        if self.fsync_policy == "group" or (
+            self.fsync_policy == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+        ):
+            self._fsync()
+
+    def _rewrite_without_prefix(self) -> None:
+        """依頼されたLSN以前のレコードを除いたログファイルに置き換える（書き込みスレッド専用）"""
+        with self._condition:
+            upto_lsn = self._truncate_upto
+            self._truncate_upto = None
+
+        self._file.close()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as out:
+            for line, entry in _iter_entries(self.path):
+                if entry["n"] > upto_lsn:
+                    out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.path)
+
+        # 置き換え（リネーム）自体を永続化する
+        directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        self._file = open(self.path, "ab")
+        self._unsynced = False
+
+    def _fsync(self) -> None:
+        """書き込み済みのデータをディスクに永続化する"""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def _mark_durable(self, lsn: int) -> None:
+        """永続化済みLSNを更新し、待機中のリクエストを再開させる"""
+        with self._condition:
+            self._durable_lsn = max(self._durable_lsn, lsn)
+            ready = [waiter for waiter in self._waiters if waiter[0] <= self._durable_lsn]
+            self._waiters = [waiter for waiter in self._waiters if waiter[0] > self._durable_lsn]
+
+        for _, loop, future in ready:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """待機中の Future を完了させる（キャンセル済みの場合は何もしない）"""
+    if not future.done():
+        future.set_result(None)
+
+
+def _reject(future: asyncio.Future, exception: BaseException) -> None:
+    """待機中の Future を例外で完了させる（キャンセル済みの場合は何もしない）"""
+    if not future.done():
+        future.set_exception(exception)
+
+
+def _iter_entries(path: str) -> Iterator[tuple[bytes, dict]]:
+    """ログファイルの完全な行とそのレコードを順に読み出す（末尾の不完全な行・壊れた行以降は無視）"""
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            yield line, entry
+
+
+def read_wal(path: str, after_lsn: int = 0) -> Iterator[dict]:
+    """
+    ログファイルのレコードを先頭から順に読み出す
+
+    書き込み途中でプロセスが停止した場合に残る末尾の不完全な行は無視します。
+
+    Args:
+        path (str): ログファイルのパス
+        after_lsn (int): このLSNより後のレコードのみを返す（スナップショット適用後の再生用）
+
+    Yields:
+        dict: ログレコード（"n" にLSNを含む）
+    """
+    for _, entry in _iter_entries(path):
+        if entry["n"] > after_lsn:
+            yield entry
@@ -0,0 +1,83 @@
+"""
+ワーカープロセスの排他制御
+
+インメモリストレージはプロセスごとに独立しているため、uvicorn --workers N で
+複数のワーカーを起動すると、ワーカーごとにデータとIDの採番が分かれてしまいます。
+このモジュールは、同じ親プロセスから起動されたワーカーのうち1つだけが
+インメモリストレージを使用できるようにするロックを提供します。
+"""
+
+import multiprocessing
+import os
+import tempfile
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows では排他制御を行わない
+    fcntl = None
+
+
+class WorkerLockError(RuntimeError):
+    """複数のワーカープロセスがインメモリストレージを使用しようとした場合に送出される例外"""
+
+
+def _lock_path() -> str:
+    """親プロセス（uvicorn のスーパーバイザ）ごとのロックファイルのパス"""
+    return os.path.join(tempfile.gettempdir(), f"todo-app-{os.getppid()}.lock")
+
+
+def acquire_worker_lock() -> Optional[int]:
+    """
+    インメモリストレージを使用するワーカーが1つだけであることを保証するロックを取得
+
+    親プロセス（uvicorn のスーパーバイザ）ごとのロックファイルに排他ロックをかけます。
+    ロックはプロセスの終了時に自動的に解放されます（release_worker_lock で解放した場合はロックファイルも削除します）。
+    単一プロセスで起動されている場合は何もしません。
+
+    Returns:
+        Optional[int]: ロックを保持しているファイルディスクリプタ（ロック不要の場合は None）
+
+    Raises:
+        WorkerLockError: 同じ親プロセスの別のワーカーが既にロックを保持している場合
+    """
+    if fcntl is None or multiprocessing.parent_process() is None:
+        return None
+
+    path = _lock_path()
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise WorkerLockError(
+                "In-memory storage cannot be shared between worker processes; "
+                "set TODO_STORAGE=sqlite to run with multiple workers"
+            ) from None
+
+        # 開いてからロックするまでの間に解放側が削除したファイルであれば、作り直されたファイルで再試行
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+def release_worker_lock(fd: Optional[int]) -> None:
+    """
+    acquire_worker_lock で取得したロックを解放し、ロックファイルを削除
+
+    ロックを保持したまま削除します。削除前のファイルを開いていた他のワーカーは、
+    acquire_worker_lock 内で作り直したファイルのロックを取得し直します。
+
+    Args:
+        fd (Optional[int]): acquire_worker_lock の戻り値
+    """
+    if fd is not None:
+        try:
+            os.unlink(_lock_path())
+        except FileNotFoundError:
+            pass
+        os.close(fd)
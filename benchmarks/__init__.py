@@ -0,0 +1,8 @@
+"""
+パフォーマンスベンチマーク
+
+このパッケージは、ToDo APIのデータストアおよびエンドポイントの
+性能を計測するためのスクリプトを提供します。
+
+各スクリプトはリポジトリのルートから `python -m benchmarks.<module>` で実行します。
+"""
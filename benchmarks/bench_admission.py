@@ -0,0 +1,146 @@
+"""
+過負荷時のアドミッション制御の負荷試験
+
+ASGIアプリをプロセス内で駆動し（httpx.AsyncClient + ASGITransport）、軽い書き込み（作成・完了化・削除）と
+全件取得（GET /todos）を混在させた負荷で、まずクローズドループ（同時実行数固定）により
+アプリの処理能力（リクエスト/秒）を計測します。
+次に、処理能力の --overload 倍（既定 2 倍）の到着率でオープンループの負荷をかけ、
+アドミッション制御なし・ありのそれぞれについて、種類ごとの成功件数・拒否（503）件数と
+成功したリクエストのレイテンシ（p50 / p99、予定到着時刻から完了まで）を比較します。
+
+アドミッション制御なしでは処理待ちのリクエストが際限なく積み上がりレイテンシが伸び続けますが、
+ありの場合は超過分を即座に拒否するため、成功したリクエストのレイテンシは待ち時間の上限程度に収まり、
+軽い書き込みが全件取得より優先されます。
+
+負荷生成側とアプリが同じイベントループを共有するため、到着済みのリクエストは
+実際のサーバーと同様にイベントループで処理を待つことになります（別プロセスの負荷生成では、
+CPUが少ない環境では負荷生成側が先に飽和し、アプリに過負荷をかけられません）。
+
+実行例:
+    python -m benchmarks.bench_admission
+    python -m benchmarks.bench_admission --rows 20000 --duration 10 --max-concurrency 8 --overload 3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.admission import admission
+from app.main import app
+from app.storage import get_storage
+
+
+async def _request(client: httpx.AsyncClient, rng: random.Random, rows: int, list_ratio: float) -> tuple[str, int]:
+    """全件取得または軽い書き込みを1件送信し、(種類, ステータスコード) を返す"""
+    if rng.random() < list_ratio:
+        return "list", (await client.get("/todos")).status_code
+    choice = rng.random()
+    if choice < 0.4:
+        response = await client.patch(f"/todos/{rng.randrange(1, rows + 1)}/complete")
+    elif choice < 0.7:
+        response = await client.post("/todos", json={"title": "load test"})
+    else:
+        response = await client.delete(f"/todos/{rng.randrange(1, rows + 1)}")
+    return "write", response.status_code
+
+
+async def measure_capacity(client: httpx.AsyncClient, args: argparse.Namespace) -> float:
+    """クローズドループで処理能力（リクエスト/秒）を計測する"""
+    rng = random.Random(0)
+    completed = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            await _request(client, rng, args.rows, args.list_ratio)
+            completed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return completed / (time.perf_counter() - start)
+
+
+async def offer_load(client: httpx.AsyncClient, rate: float, args: argparse.Namespace) -> dict:
+    """到着率 rate（リクエスト/秒）のオープンループで負荷をかけ、種類ごとの結果を返す"""
+    rng = random.Random(1)
+    results: dict[str, dict[str, list]] = {kind: {"ok": [], "shed": [], "error": []} for kind in ("write", "list")}
+
+    async def one(arrival: float):
+        kind, status_code = await _request(client, rng, args.rows, args.list_ratio)
+        outcome = "shed" if status_code == 503 else "error" if status_code >= 500 else "ok"
+        # ループが塞がっていて予定時刻に送信できなかった時間も待ち時間に含める
+        results[kind][outcome].append(time.perf_counter() - arrival)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * args.duration)):
+        arrival = start + i / rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(arrival)))
+    await asyncio.gather(*tasks)
+    return results
+
+
+async def run(args: argparse.Namespace, max_concurrency: int, rate: float | None) -> tuple[float, dict | None]:
+    """rows 件を作成した状態で、rate が None なら処理能力を、指定されていればその到着率での結果を返す"""
+    storage = get_storage()
+    await storage.clear_database()
+    admission.configure(
+        max_concurrency, args.queue_size, args.queue_timeout_ms / 1000, {"GET /todos": args.list_limit},
+        routes=app.routes,
+    )
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for start in range(0, args.rows, 10_000):
+                count = min(10_000, args.rows - start)
+                await client.post("/todos/batch", json=[{"title": f"ToDo {start + i}"} for i in range(count)])
+            if rate is None:
+                return await measure_capacity(client, args), None
+            return rate, await offer_load(client, rate, args)
+    finally:
+        admission.configure(0, 0, 0.0, {})
+        await storage.clear_database()
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile / 100))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="事前に作成しておく件数")
+    parser.add_argument("--duration", type=float, default=5.0, help="各計測の時間（秒）")
+    parser.add_argument("--list-ratio", type=float, default=0.2, help="全件取得の割合")
+    parser.add_argument("--concurrency", type=int, default=16, help="処理能力の計測時の同時実行数")
+    parser.add_argument("--overload", type=float, default=2.0, help="処理能力に対する到着率の倍率")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="アドミッション制御ありの同時処理数の上限")
+    parser.add_argument("--queue-size", type=int, default=32, help="アドミッション制御ありの待ち行列の最大長")
+    parser.add_argument("--queue-timeout-ms", type=int, default=100, help="アドミッション制御ありの最大待ち時間（ミリ秒）")
+    parser.add_argument("--list-limit", type=int, default=2, help="GET /todos の同時処理数の上限")
+    args = parser.parse_args()
+
+    capacity, _ = asyncio.run(run(args, 0, None))
+    rate = capacity * args.overload
+    print(f"capacity: {capacity:.0f} req/s, offered load: {rate:.0f} req/s ({args.overload:g}x)")
+    print(f"{'admission':>10} {'kind':>6} {'ok':>7} {'shed':>7} {'error':>6} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for label, max_concurrency in (("off", 0), ("on", args.max_concurrency)):
+        _, results = asyncio.run(run(args, max_concurrency, rate))
+        for kind, outcome in results.items():
+            print(
+                f"{label:>10} {kind:>6} {len(outcome['ok']):>7} {len(outcome['shed']):>7} {len(outcome['error']):>6}"
+                f" {_percentile(outcome['ok'], 50):>9.1f} {_percentile(outcome['ok'], 99):>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
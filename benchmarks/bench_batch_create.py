@@ -0,0 +1,59 @@
+"""
+ToDo一括作成のスループットベンチマーク
+
+ASGIアプリをプロセス内で駆動し（TestClient）、N件のToDoを
+N回の POST /todos で作成した場合と、1回の POST /todos/batch で作成した場合の
+スループット（件/秒）を比較します。
+
+実行例:
+    python -m benchmarks.bench_batch_create
+    python -m benchmarks.bench_batch_create --items 100 1000
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database import clear_database
+from app.main import app
+
+
+def run_single(client: TestClient, items: list[dict]) -> float:
+    """1件ずつ POST /todos で作成し、経過秒数を返す"""
+    clear_database()
+    start = time.perf_counter()
+    for item in items:
+        response = client.post("/todos", json=item)
+        assert response.status_code == 201
+    return time.perf_counter() - start
+
+
+def run_batch(client: TestClient, items: list[dict]) -> float:
+    """POST /todos/batch で一括作成し、経過秒数を返す"""
+    clear_database()
+    start = time.perf_counter()
+    response = client.post("/todos/batch", json=items)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 201
+    assert len(response.json()["created"]) == len(items)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    print(f"{'items':>8} {'single(items/s)':>16} {'batch(items/s)':>15} {'speedup':>8}")
+    for count in args.items:
+        items = [{"title": f"ToDo {i}", "description": "インポート"} for i in range(count)]
+        single = run_single(client, items)
+        batch = run_batch(client, items)
+        print(f"{count:>8} {count / single:>16.0f} {count / batch:>15.0f} {single / batch:>7.1f}x")
+    clear_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ToDo一括完了化・一括削除のベンチマーク
+
+ASGIアプリをプロセス内で駆動し（TestClient）、指定件数のToDoを
+1回の POST /todos/batch/complete と POST /todos/batch/delete で処理した際の
+所要時間を計測します。比較用に1件ずつの PATCH / DELETE の1件あたりの時間も計測します。
+
+実行例:
+    python -m benchmarks.bench_batch_update
+    python -m benchmarks.bench_batch_update --rows 1000000 --ids 100000
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def populate(rows: int) -> None:
+    """データストアに rows 件のToDoを一括投入する"""
+    database.clear_database()
+    now = get_current_jst_time()
+    database.create_todos([
+        {"title": f"ToDo {i}", "description": None, "created_at": now, "updated_at": now}
+        for i in range(rows)
+    ])
+
+
+def timed_post(client: TestClient, url: str, ids: list[int]) -> float:
+    """一括エンドポイントを呼び出し、経過秒数を返す"""
+    start = time.perf_counter()
+    response = client.post(url, json={"ids": ids})
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    assert len(response.json()["succeeded"]) == len(ids)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="ストアの総件数")
+    parser.add_argument("--ids", type=int, default=100_000, help="1リクエストで処理する件数")
+    parser.add_argument("--single", type=int, default=1_000, help="1件ずつ処理する比較用の件数")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+
+    populate(args.rows)
+    ids = list(range(1, args.ids + 1))
+    complete = timed_post(client, "/todos/batch/complete", ids)
+    delete = timed_post(client, "/todos/batch/delete", ids)
+
+    populate(args.rows)
+    start = time.perf_counter()
+    for todo_id in range(1, args.single + 1):
+        client.patch(f"/todos/{todo_id}/complete")
+    single_complete = (time.perf_counter() - start) / args.single
+    start = time.perf_counter()
+    for todo_id in range(1, args.single + 1):
+        client.delete(f"/todos/{todo_id}")
+    single_delete = (time.perf_counter() - start) / args.single
+
+    print(f"rows={args.rows} ids={args.ids}")
+    print(f"{'operation':>10} {'batch total(ms)':>16} {'batch per-id(us)':>17} {'single per-id(us)':>18}")
+    print(f"{'complete':>10} {complete * 1000:>16.1f} {complete / args.ids * 1e6:>17.2f} {single_complete * 1e6:>18.1f}")
+    print(f"{'delete':>10} {delete * 1000:>16.1f} {delete / args.ids * 1e6:>17.2f} {single_delete * 1e6:>18.1f}")
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+エンドポイント別のスループット・レイテンシのベンチマーク
+
+ASGIアプリをプロセス内で駆動するか（既定、httpx.AsyncClient + ASGITransport）、
+--target uvicorn で実際に起動した uvicorn に localhost 経由でリクエストを送り、
+シナリオごとにスループット（リクエスト/秒）とレイテンシ（p50 / p95 / p99）を計測して
+結果をJSONファイルに保存します。
+
+シナリオ:
+- create:       POST /todos
+- list-<N>:     N 件のToDoがある状態で GET /todos（全件）
+- complete:     PATCH /todos/{id}/complete（未完了のToDoを1件ずつ）
+- delete:       DELETE /todos/{id}（有効なToDoを1件ずつ）
+- mixed-<R>:    読み込み R%（GET /todos?limit=50）と書き込み（POST /todos）の混在
+
+--baseline に以前の結果ファイルを指定すると、シナリオごとに比較して表示し、
+スループットの低下またはレイテンシの増加が許容範囲を超えたシナリオがあれば終了コード 1 で終了します。
+プロセス内で駆動する場合、アプリの起動処理（lifespan）は実行されないため、
+ストレージは --storage で選択します（TODO_* の環境変数は --target uvicorn の場合のみ有効です）。
+
+実行例:
+    python -m benchmarks.bench_endpoints --output baseline.json
+    python -m benchmarks.bench_endpoints --baseline baseline.json --output current.json
+    python -m benchmarks.bench_endpoints --target uvicorn --storage sqlite --scenarios create list mixed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import httpx
+
+from app.main import app
+from app.routers.todos import MAX_BATCH_SIZE
+from app.sqlite_storage import SQLiteStorage
+from app.storage import get_storage, set_storage
+from app.utils import json_utils
+
+
+# シナリオの種類（list と mixed は --list-sizes / --read-ratios ごとに展開される）
+SCENARIO_KINDS = ("create", "list", "complete", "delete", "mixed")
+
+# 比較対象とするレイテンシのパーセンタイル
+PERCENTILES = (50, 95, 99)
+
+# リクエスト（メソッド、パス、クエリパラメータ、JSONボディ）を生成する関数
+# 引数は (リクエストの通し番号, 事前に作成したToDoのIDリスト, 乱数生成器)
+RequestFactory = Callable[[int, list[int], random.Random], tuple[str, str, dict | None, object]]
+
+
+def _create(i: int, ids: list[int], rng: random.Random):
+    return "POST", "/todos", None, {"title": f"ToDo {i}", "description": "牛乳とパンを買う"}
+
+
+def _list(i: int, ids: list[int], rng: random.Random):
+    return "GET", "/todos", None, None
+
+
+def _complete(i: int, ids: list[int], rng: random.Random):
+    return "PATCH", f"/todos/{ids[i]}/complete", None, None
+
+
+def _delete(i: int, ids: list[int], rng: random.Random):
+    return "DELETE", f"/todos/{ids[i]}", None, None
+
+
+def _mixed(read_ratio: float) -> RequestFactory:
+    def factory(i: int, ids: list[int], rng: random.Random):
+        if rng.random() < read_ratio:
+            return "GET", "/todos", {"limit": 50}, None
+        return _create(i, ids, rng)
+    return factory
+
+
+def build_scenarios(args: argparse.Namespace) -> list[tuple[str, int, RequestFactory]]:
+    """
+    コマンドライン引数から (シナリオ名, 事前に作成する件数, リクエスト生成関数) のリストを作成
+
+    complete / delete はリクエストごとに別のToDoを対象とするため、リクエスト数分のToDoを事前に作成します。
+    """
+    # 計測前のウォームアップを含めたリクエスト数
+    total = args.requests + args.warmup
+
+    scenarios = []
+    for kind in args.scenarios:
+        if kind == "create":
+            scenarios.append(("create", 0, _create))
+        elif kind == "list":
+            scenarios += [(f"list-{rows}", rows, _list) for rows in args.list_sizes]
+        elif kind == "complete":
+            scenarios.append(("complete", total, _complete))
+        elif kind == "delete":
+            scenarios.append(("delete", total, _delete))
+        elif kind == "mixed":
+            scenarios += [
+                (f"mixed-{round(ratio * 100)}", args.mixed_rows, _mixed(ratio)) for ratio in args.read_ratios
+            ]
+    return scenarios
+
+
+def _free_port() -> int:
+    """空いているTCPポートを取得する"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    """ヘルスチェックが成功するまで待機する"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start in time")
+
+
+@asynccontextmanager
+async def asgi_client(args: argparse.Namespace, tmp: str) -> AsyncIterator[httpx.AsyncClient]:
+    """空のストレージでASGIアプリをプロセス内で駆動するクライアント"""
+    sqlite_storage = None
+    previous = None
+    if args.storage == "sqlite":
+        sqlite_storage = SQLiteStorage(os.path.join(tmp, "bench.db"))
+        previous = set_storage(sqlite_storage)
+    await get_storage().clear_database()
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+    finally:
+        await get_storage().clear_database()
+        if sqlite_storage is not None:
+            set_storage(previous)
+            await sqlite_storage.close()
+
+
+@asynccontextmanager
+async def uvicorn_client(args: argparse.Namespace, tmp: str) -> AsyncIterator[httpx.AsyncClient]:
+    """空のストレージで uvicorn を起動し、localhost 経由で接続するクライアント"""
+    port = _free_port()
+    env = dict(os.environ, TODO_STORAGE=args.storage, TODO_SQLITE_PATH=os.path.join(tmp, "bench.db"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await _wait_until_ready(client)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def seed(client: httpx.AsyncClient, rows: int) -> list[int]:
+    """POST /todos/batch で rows 件のToDoを作成し、IDのリストを返す"""
+    ids = []
+    for start in range(0, rows, MAX_BATCH_SIZE):
+        chunk = [{"title": f"ToDo {i}", "description": "牛乳とパンを買う"} for i in range(start, min(rows, start + MAX_BATCH_SIZE))]
+        response = await client.post("/todos/batch", json=chunk)
+        response.raise_for_status()
+        ids += [todo["id"] for todo in response.json()["created"]]
+    return ids
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    ids: list[int],
+    requests: int,
+    concurrency: int,
+    offset: int = 0,
+) -> tuple[float, list[float]]:
+    """
+    concurrency 並列で合計 requests 件のリクエストを送信
+
+    Returns:
+        tuple[float, list[float]]: (経過秒数, 各リクエストのレイテンシ（秒）)
+    """
+    rng = random.Random(offset)
+    remaining = iter(range(offset, offset + requests))
+    latencies = []
+
+    async def worker():
+        for i in remaining:
+            method, path, params, body = factory(i, ids, rng)
+            start = time.perf_counter()
+            response = await client.request(method, path, params=params, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {path} returned {response.status_code}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+def summarize(elapsed: float, latencies: list[float]) -> dict:
+    """計測結果をリクエスト/秒とレイテンシのパーセンタイル（ミリ秒）に集計する"""
+    latencies = sorted(latencies)
+    summary = {"requests": len(latencies), "req_per_s": len(latencies) / elapsed}
+    for percentile in PERCENTILES:
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        summary[f"p{percentile}_ms"] = latencies[index] * 1000
+    return summary
+
+
+async def run_scenario(args: argparse.Namespace, name: str, rows: int, factory: RequestFactory) -> dict:
+    """空のストレージに rows 件を作成してからシナリオを実行し、集計結果を返す"""
+    connect = uvicorn_client if args.target == "uvicorn" else asgi_client
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        async with connect(args, tmp) as client:
+            ids = await seed(client, rows)
+            if args.warmup:
+                await drive(client, factory, ids, args.warmup, args.concurrency)
+            elapsed, latencies = await drive(client, factory, ids, args.requests, args.concurrency, args.warmup)
+    return summarize(elapsed, latencies)
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    max_throughput_drop: float,
+    max_latency_increase: float,
+) -> list[str]:
+    """
+    結果をベースラインと比較し、許容範囲を超えた劣化の一覧を返す
+
+    Args:
+        results (dict): 今回の計測結果（シナリオ名 → 集計結果）
+        baseline (dict): ベースラインの計測結果（シナリオ名 → 集計結果）
+        max_throughput_drop (float): 許容するスループットの低下率（0.1 で 10%）
+        max_latency_increase (float): 許容するレイテンシの増加率（0.2 で 20%）
+
+    Returns:
+        list[str]: 劣化の説明（なければ空）
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        drop = 1 - current["req_per_s"] / base["req_per_s"]
+        if drop > max_throughput_drop:
+            regressions.append(f"{name}: req/s {base['req_per_s']:.0f} -> {current['req_per_s']:.0f} (-{drop:.0%})")
+        for percentile in PERCENTILES:
+            key = f"p{percentile}_ms"
+            increase = current[key] / base[key] - 1
+            if increase > max_latency_increase:
+                regressions.append(f"{name}: {key} {base[key]:.2f} -> {current[key]:.2f} (+{increase:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi",
+                        help="asgi: プロセス内で駆動 / uvicorn: uvicorn を起動して localhost 経由で計測")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIO_KINDS, default=list(SCENARIO_KINDS))
+    parser.add_argument("--requests", type=int, default=2_000, help="シナリオあたりの計測リクエスト数")
+    parser.add_argument("--warmup", type=int, default=100, help="計測前に送るリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=16, help="同時接続数")
+    parser.add_argument("--list-sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                        help="list シナリオで事前に作成する件数")
+    parser.add_argument("--read-ratios", type=float, nargs="+", default=[0.9, 0.5],
+                        help="mixed シナリオの読み込みの割合")
+    parser.add_argument("--mixed-rows", type=int, default=1_000, help="mixed シナリオで事前に作成する件数")
+    parser.add_argument("--output", default="bench_endpoints.json", help="結果を保存するJSONファイル")
+    parser.add_argument("--baseline", default=None, help="比較するベースラインの結果ファイル")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.10,
+                        help="許容するスループットの低下率（0.10 で 10%%）")
+    parser.add_argument("--max-latency-increase", type=float, default=0.20,
+                        help="許容するレイテンシ（p50/p95/p99）の増加率（0.20 で 20%%）")
+    parser.add_argument("--dir", default=None, help="データベースファイルを作成するディレクトリ")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+
+    results = {}
+    print(f"{'scenario':>12} {'req/s':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'vs base':>8}")
+    for name, rows, factory in build_scenarios(args):
+        summary = asyncio.run(run_scenario(args, name, rows, factory))
+        results[name] = summary
+        versus = ""
+        if baseline is not None and name in baseline:
+            versus = f"{summary['req_per_s'] / baseline[name]['req_per_s'] - 1:+.0%}"
+        print(
+            f"{name:>12} {summary['req_per_s']:>10.0f} {summary['p50_ms']:>9.2f}"
+            f" {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} {versus:>8}"
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "json_encoder": json_utils.encoder_name,
+                "target": args.target,
+                "storage": args.storage,
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+            },
+            "scenarios": results,
+        }, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_throughput_drop, args.max_latency_increase)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
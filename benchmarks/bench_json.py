@@ -0,0 +1,87 @@
+"""
+JSONエンコーダ別のレスポンス構築ベンチマーク
+
+件数ごとに、ToDo一覧（JSON配列）のボディを構築する時間をエンコーダ別に比較します。
+いずれもJSONキャッシュのない状態（初回読み出し）から計測します。
+
+- model:  行ごとに ToDo(**todo) を生成して model_dump_json でエンコード（従来の ToDo 経由の実装）
+- stdlib: ToDoRecord.to_json を標準ライブラリの json でエンコード
+- orjson: ToDoRecord.to_json を orjson でエンコード（インストールされている場合のみ）
+
+すべてのエンコーダの出力がバイト単位で一致することを確認してから計測します。
+
+実行例:
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --rows 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import time
+
+from app import database
+from app.models import ToDo
+from app.utils import json_utils
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def populate(rows: int) -> None:
+    """データストアに rows 件のToDoを一括投入する"""
+    database.clear_database()
+    now = get_current_jst_time()
+    database.create_todos([
+        {"title": f"ToDo {i} 買い物", "description": "牛乳とパンを買う" if i % 2 else None, "created_at": now, "updated_at": now}
+        for i in range(rows)
+    ])
+
+
+def render_model() -> bytes:
+    """ToDo モデル経由でエンコードしたJSON配列"""
+    fragments = [ToDo(**todo.to_dict()).model_dump_json().encode() for todo in database.get_all_active_todos()]
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def render_record() -> bytes:
+    """キャッシュを空にしてから ToDoRecord.to_json でエンコードしたJSON配列"""
+    database.todos_json_cache.clear()
+    return b"[" + b",".join(database.get_todos_json(database.active_ids)) + b"]"
+
+
+def measure(func, repeat: int) -> float:
+    """関数を repeat 回実行し、最良値（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoders = ["stdlib"] + (["orjson"] if json_utils.orjson is not None else [])
+    previous = json_utils.encoder_name
+
+    print(f"{'rows':>8} {'encoder':>8} {'total(ms)':>10} {'per-row(us)':>12}")
+    for rows in args.rows:
+        populate(rows)
+        expected = render_model()
+
+        results = [("model", measure(render_model, args.repeat))]
+        for name in encoders:
+            json_utils.set_json_encoder(name)
+            assert render_record() == expected, f"{name} output differs from model_dump_json"
+            results.append((name, measure(render_record, args.repeat)))
+
+        for name, elapsed in results:
+            print(f"{rows:>8} {name:>8} {elapsed * 1000:>10.1f} {elapsed / rows * 1e6:>12.3f}")
+
+    json_utils.set_json_encoder(previous)
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+有効ToDo一覧取得のベンチマーク
+
+総件数（10k/100k/1M）と論理削除率を変えながら、
+全件走査＋ソートによる従来実装と有効IDインデックスによる実装の
+`get_all_active_todos` のレイテンシを比較します。
+
+実行例:
+    python -m benchmarks.bench_list_active
+    python -m benchmarks.bench_list_active --sizes 10000 100000 --delete-ratios 0 0.9
+"""
+
+import argparse
+import time
+
+from app import database
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def legacy_get_all_active_todos() -> list[database.ToDoRecord]:
+    """従来実装：全件を走査して is_active で絞り込み、ID昇順にソート"""
+    active_todos = [todo for todo in database.todos_db.values() if todo.is_active]
+    return sorted(active_todos, key=lambda x: x.id)
+
+
+def populate(total: int, delete_ratio: float) -> None:
+    """
+    データストアにToDoを投入し、先頭から均等に論理削除する
+
+    Args:
+        total (int): 投入する総件数
+        delete_ratio (float): 論理削除する割合（0.0〜1.0）
+    """
+    database.clear_database()
+    now = get_current_jst_time()
+    for i in range(total):
+        database.create_todo({
+            "title": f"ToDo {i}",
+            "description": None,
+            "completed": False,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    if delete_ratio > 0:
+        step = 1 / delete_ratio
+        position = 0.0
+        while int(position) < total:
+            database.update_todo(int(position) + 1, {"is_active": False, "updated_at": now})
+            position += step
+
+
+def measure(func, repeat: int) -> float:
+    """関数を repeat 回実行し、最良値（ミリ秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--delete-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9, 0.99])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'total':>10} {'deleted':>8} {'active':>10} {'legacy(ms)':>12} {'indexed(ms)':>12} {'speedup':>8}")
+    for total in args.sizes:
+        for ratio in args.delete_ratios:
+            populate(total, ratio)
+            active = len(database.active_ids)
+            assert legacy_get_all_active_todos() == database.get_all_active_todos()
+
+            legacy = measure(legacy_get_all_active_todos, args.repeat)
+            indexed = measure(database.get_all_active_todos, args.repeat)
+            print(
+                f"{total:>10} {ratio:>8.0%} {active:>10} "
+                f"{legacy:>12.2f} {indexed:>12.2f} {legacy / indexed:>7.1f}x"
+            )
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+GET /todos の同時リクエストの集約（single-flight）のベンチマーク
+
+ASGIアプリをプロセス内で駆動し（httpx.AsyncClient + ASGITransport）、--rows 件のToDoがある状態で
+1件作成して一覧の内容を変化させた直後に --readers 件（既定 500 件）の GET /todos を同時に送る
+「変更直後の一斉再取得」を --rounds 回繰り返します。
+集約あり・なし（実行中の構築を共有せず毎回構築）のそれぞれについて、ストレージごとに
+1回あたりの所要時間、ボディの構築回数、レスポンスのレイテンシ（p50 / p99）を比較します。
+
+インメモリストレージは構築中に await しないため集約の対象にならず（構築回数は読み込み件数と同じですが、
+2件目以降は世代ごとにキャッシュ済みの全件ボディを返すだけです）、集約の有無による差はほとんどありません。
+SQLiteストレージでは構築が別スレッドで行われるため、集約しない場合は同時に到着したリクエストの数だけ
+全件の読み込みとエンコードが行われます。
+
+実行例:
+    python -m benchmarks.bench_list_coalescing
+    python -m benchmarks.bench_list_coalescing --rows 20000 --readers 1000 --storage sqlite
+    python -m benchmarks.bench_list_coalescing --limit 100
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.main import app
+from app.metrics import metrics
+from app.routers import todos
+from app.routers.todos import MAX_BATCH_SIZE
+from app.sqlite_storage import SQLiteStorage
+from app.storage import get_storage, set_storage
+from app.utils.singleflight import SingleFlight
+
+
+class _NoCoalescing:
+    """比較用: 実行中の構築を共有せず、リクエストごとに構築する"""
+
+    async def do(self, key, func):
+        return await func(), False
+
+
+async def _round(client: httpx.AsyncClient, readers: int, params: dict) -> tuple[float, list[float]]:
+    """1件作成した直後に readers 件の一覧取得を同時に送り、(所要時間, 各レイテンシ) を返す"""
+    (await client.post("/todos", json={"title": "changed"})).raise_for_status()
+    latencies = []
+
+    async def read():
+        start = time.perf_counter()
+        response = await client.get("/todos", params=params)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(read() for _ in range(readers)))
+    return time.perf_counter() - start, latencies
+
+
+async def run(args: argparse.Namespace, storage_name: str, coalescing: bool) -> dict:
+    """空のストレージに rows 件を作成してから一斉再取得を繰り返し、集計結果を返す"""
+    sqlite_storage = None
+    previous_storage = None
+    previous_flights = todos.list_flights
+    todos.list_flights = SingleFlight() if coalescing else _NoCoalescing()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if storage_name == "sqlite":
+            sqlite_storage = SQLiteStorage(os.path.join(tmp, "bench.db"))
+            previous_storage = set_storage(sqlite_storage)
+        await get_storage().clear_database()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                for start in range(0, args.rows, MAX_BATCH_SIZE):
+                    count = min(MAX_BATCH_SIZE, args.rows - start)
+                    await client.post("/todos/batch", json=[{"title": f"ToDo {start + i}"} for i in range(count)])
+                params = {} if args.limit is None else {"limit": args.limit}
+
+                metrics.clear()
+                elapsed, latencies = 0.0, []
+                for _ in range(args.rounds):
+                    seconds, round_latencies = await _round(client, args.readers, params)
+                    elapsed += seconds
+                    latencies += round_latencies
+                builds = args.rounds * args.readers - metrics.list_coalesced
+        finally:
+            todos.list_flights = previous_flights
+            await get_storage().clear_database()
+            if sqlite_storage is not None:
+                set_storage(previous_storage)
+                await sqlite_storage.close()
+
+    latencies.sort()
+    return {
+        "round_ms": elapsed / args.rounds * 1000,
+        "builds": builds / args.rounds,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="事前に作成しておく件数")
+    parser.add_argument("--readers", type=int, default=500, help="変更直後に同時に送る一覧取得の件数")
+    parser.add_argument("--rounds", type=int, default=5, help="変更と一斉再取得の繰り返し回数")
+    parser.add_argument("--limit", type=int, default=None, help="一覧取得の limit（省略時は全件取得）")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), nargs="+", default=["memory", "sqlite"])
+    args = parser.parse_args()
+
+    print(f"{args.readers} concurrent readers x {args.rounds} rounds, {args.rows} rows, limit={args.limit}")
+    print(f"{'storage':>8} {'coalescing':>10} {'round(ms)':>10} {'builds':>8} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for storage_name in args.storage:
+        for coalescing in (False, True):
+            result = asyncio.run(run(args, storage_name, coalescing))
+            print(
+                f"{storage_name:>8} {'on' if coalescing else 'off':>10} {result['round_ms']:>10.1f}"
+                f" {result['builds']:>8.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
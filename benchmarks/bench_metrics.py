@@ -0,0 +1,88 @@
+"""
+メトリクス収集ミドルウェアのオーバーヘッドのベンチマーク
+
+空のレスポンスを返すだけのASGIアプリを、MetricsMiddleware あり・なしで直接呼び出し
+（HTTPクライアントを介さない）、1リクエストあたりの所要時間の差をミドルウェアのコストとして計測します。
+比較用に、実際のアプリ（GET /todos?limit=50）をプロセス内で駆動した場合の1リクエストあたりの時間も計測します。
+
+実行例:
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --calls 500000 --routes 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app import database
+from app.main import app
+from app.metrics import Metrics, MetricsMiddleware
+from app.utils.datetime_utils import get_current_jst_time
+
+
+class _Route:
+    """ルーティング済みのスコープに設定されるルートの代わり"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+async def _empty_app(scope, receive, send) -> None:
+    """空のレスポンスを返すだけのASGIアプリ"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def call_app(asgi_app, calls: int, routes: int) -> float:
+    """asgi_app を calls 回呼び出し、1回あたりの秒数を返す"""
+    scopes = [
+        {"type": "http", "method": "GET", "path": f"/r{i}", "route": _Route(f"/r{i}")} for i in range(routes)
+    ]
+    start = time.perf_counter()
+    for i in range(calls):
+        await asgi_app(scopes[i % routes], None, _send)
+    return (time.perf_counter() - start) / calls
+
+
+async def call_endpoint(requests: int) -> float:
+    """GET /todos?limit=50 をプロセス内で requests 回呼び出し、1回あたりの秒数を返す"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/todos", params={"limit": 50})
+        return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--routes", type=int, default=10, help="呼び出しを分散させるルート数")
+    parser.add_argument("--requests", type=int, default=2_000, help="実際のエンドポイントの呼び出し回数")
+    args = parser.parse_args()
+
+    bare = asyncio.run(call_app(_empty_app, args.calls, args.routes))
+    wrapped = asyncio.run(call_app(MetricsMiddleware(_empty_app, Metrics()), args.calls, args.routes))
+
+    database.clear_database()
+    now = get_current_jst_time()
+    database.create_todos([{"title": f"ToDo {i}", "created_at": now, "updated_at": now} for i in range(1_000)])
+    endpoint = asyncio.run(call_endpoint(args.requests))
+    database.clear_database()
+
+    print(f"{'case':>22} {'per-call(us)':>13}")
+    print(f"{'bare ASGI app':>22} {bare * 1e6:>13.2f}")
+    print(f"{'with MetricsMiddleware':>22} {wrapped * 1e6:>13.2f}")
+    print(f"{'middleware overhead':>22} {(wrapped - bare) * 1e6:>13.2f}")
+    print(f"{'GET /todos?limit=50':>22} {endpoint * 1e6:>13.2f}")
+    print(f"overhead relative to GET /todos?limit=50: {(wrapped - bare) / endpoint:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+ToDo 1件あたりのメモリ使用量の計測
+
+tracemalloc を用いて、従来の dict 表現（timezone付き datetime を保持）と
+ToDoRecord 表現（__slots__、エポック秒）で todos_db を構築した場合の
+1件あたりのバイト数を比較します。タイトル文字列などは両者で共通の条件です。
+
+実行例:
+    python -m benchmarks.bench_record_memory
+    python -m benchmarks.bench_record_memory --rows 100000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from app import database
+from app.utils.datetime_utils import from_epoch_seconds, get_current_jst_time, to_epoch_seconds
+
+
+def build_legacy(rows: int, base: int) -> dict[int, dict]:
+    """従来実装：1件ごとに dict と datetime を保持"""
+    db = {}
+    for i in range(1, rows + 1):
+        now = from_epoch_seconds(base + i)
+        db[i] = {
+            "id": i,
+            "title": f"ToDo {i}",
+            "description": None,
+            "completed": False,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+    return db
+
+
+def build_records(rows: int, base: int) -> dict[int, database.ToDoRecord]:
+    """新実装：database.create_todo と同じく ToDoRecord を保持"""
+    db = {}
+    for i in range(1, rows + 1):
+        now = base + i
+        db[i] = database.ToDoRecord(
+            id=i,
+            title=f"ToDo {i}",
+            description=None,
+            completed=False,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+    return db
+
+
+def measure(builder, rows: int, base: int) -> float:
+    """builder で rows 件を構築した際の1件あたりの確保バイト数を返す"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    db = builder(rows, base)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del db
+    gc.collect()
+    return (after - before) / rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = to_epoch_seconds(get_current_jst_time())
+    legacy = measure(build_legacy, args.rows, base)
+    records = measure(build_records, args.rows, base)
+
+    print(f"rows={args.rows}")
+    print(f"{'representation':>16} {'bytes/todo':>11}")
+    print(f"{'dict+datetime':>16} {legacy:>11.1f}")
+    print(f"{'ToDoRecord':>16} {records:>11.1f}")
+    print(f"{'reduction':>16} {1 - records / legacy:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
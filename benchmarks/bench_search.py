@@ -0,0 +1,101 @@
+"""
+全文検索（転置インデックス）のベンチマーク
+
+日本語・英数字が混在するタイトルのToDoを指定件数投入し、転置インデックスの構築時間と、
+ヒット件数の異なるクエリの検索時間（database.search_active_todo_ids、limit 件まで）を計測します。
+比較用に全件を走査して部分文字列で照合した場合の時間も計測します。
+
+実行例:
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --rows 1000000 --limit 100
+"""
+
+import argparse
+import random
+import time
+
+from app import database
+from app.utils.datetime_utils import get_current_jst_time
+from app.utils.search_utils import normalize_text
+
+
+# タイトルを組み立てる語彙（日本語の名詞・動詞と英単語）
+NOUNS = [
+    "牛乳", "会議", "資料", "部屋", "報告書", "メール", "請求書", "予約", "洗濯物", "買い物",
+    "歯医者", "プレゼン", "見積もり", "契約書", "引っ越し", "ゴミ出し", "振込", "議事録", "週報", "発注",
+]
+VERBS = ["を買う", "を作成する", "を掃除する", "を確認する", "を送る", "を準備する", "を提出する", "に行く", "を整理する"]
+WORDS = ["review", "deploy", "invoice", "draft", "meeting", "report", "backup", "release", "budget", "TODO"]
+
+QUERIES = ["牛乳", "報告書 確認", "契約書を提出", "deploy", "meeting 資料", "存在しない語"]
+
+
+def populate(rows: int, seed: int = 0) -> None:
+    """データストアに rows 件のToDoを一括投入する"""
+    rng = random.Random(seed)
+    database.clear_database()
+    now = get_current_jst_time()
+    database.create_todos([
+        {
+            "title": f"{rng.choice(NOUNS)}{rng.choice(VERBS)} {rng.choice(WORDS)} #{i}",
+            "description": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+
+
+def scan(query: str, limit: int) -> list[int]:
+    """比較用：全件を走査してクエリの各語を部分文字列として含むToDoを探す"""
+    terms = normalize_text(query).split()
+    matched = []
+    for todo in database.get_all_active_todos():
+        text = normalize_text(todo.search_text())
+        if all(term in text for term in terms):
+            matched.append(todo.id)
+            if len(matched) == limit:
+                break
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100, help="1回の検索で取得する最大件数")
+    parser.add_argument("--repeat", type=int, default=100, help="クエリごとの計測回数")
+    args = parser.parse_args()
+
+    populate(args.rows)
+
+    start = time.perf_counter()
+    longest_slice = 0.0
+    done = False
+    while not done:
+        slice_start = time.perf_counter()
+        done = database.build_search_index_slice()
+        longest_slice = max(longest_slice, time.perf_counter() - slice_start)
+    print(
+        f"rows={args.rows} index build: {time.perf_counter() - start:.2f}s, tokens={len(database.search_index)}, "
+        f"longest slice: {longest_slice * 1000:.1f}ms"
+    )
+
+    print(f"{'query':>16} {'hits':>8} {'index(ms)':>10} {'scan(ms)':>10}")
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            ids, _ = database.search_active_todo_ids(query, limit=args.limit)
+        indexed = (time.perf_counter() - start) / args.repeat * 1000
+
+        start = time.perf_counter()
+        scan(query, args.limit)
+        scanned = (time.perf_counter() - start) * 1000
+
+        total, _ = database.search_active_todo_ids(query)
+        print(f"{query:>16} {len(total):>8} {indexed:>10.3f} {scanned:>10.1f}")
+
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
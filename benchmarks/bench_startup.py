@@ -0,0 +1,87 @@
+"""
+コールドスタート（復元）時間のベンチマーク
+
+指定件数のToDoを持つストアについて、以下の2通りで復元に要する時間を比較します。
+
+- log only:        追記型ログ（1件ずつの作成レコード）を先頭から全件再生
+- snapshot + tail: スナップショットを読み込み、以降のログ末尾のみを再生
+
+実行例:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --rows 100000 --tail 1000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app import database
+from app.utils.datetime_utils import get_current_jst_time
+from app.wal import WriteAheadLog
+
+
+def build_store(wal_path: str, rows: int, tail: int, snapshot_path: str | None) -> None:
+    """
+    ログを記録しながらストアを構築する
+
+    snapshot_path を指定した場合は、最後の tail 件の変更の前にスナップショットを取得します。
+    """
+    database.clear_database()
+    log = WriteAheadLog(wal_path, fsync_policy="off")
+    database.attach_wal(log)
+
+    now = get_current_jst_time()
+    for i in range(rows):
+        database.create_todo({
+            "title": f"ToDo {i}",
+            "description": "牛乳とパンを買う" if i % 2 else None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        if snapshot_path is not None and i == rows - tail - 1:
+            asyncio.run(database.save_snapshot(snapshot_path))
+
+    database.attach_wal(None)
+    log.close()
+    database.clear_database()
+
+
+def restore(wal_path: str, snapshot_path: str | None) -> float:
+    """スナップショット（任意）とログから復元し、経過秒数を返す"""
+    database.clear_database()
+    start = time.perf_counter()
+    lsn = database.restore_snapshot(snapshot_path) if snapshot_path is not None else 0
+    database.replay_wal(wal_path, after_lsn=lsn)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="スナップショット後に追記されるログ件数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wal_path = os.path.join(tmp, "log_only.wal")
+        build_store(wal_path, args.rows, args.tail, None)
+        log_only = restore(wal_path, None)
+        assert len(database.todos_db) == args.rows
+
+        wal_path = os.path.join(tmp, "with_snapshot.wal")
+        snapshot_path = os.path.join(tmp, "with_snapshot.snapshot")
+        build_store(wal_path, args.rows, args.tail, snapshot_path)
+        with_snapshot = restore(wal_path, snapshot_path)
+        assert len(database.todos_db) == args.rows
+
+        print(f"rows={args.rows} tail={args.tail}")
+        print(f"snapshot size: {os.path.getsize(snapshot_path) / 1e6:.1f} MB, log tail size: {os.path.getsize(wal_path) / 1e6:.2f} MB")
+        print(f"{'mode':>16} {'restore(s)':>11}")
+        print(f"{'log only':>16} {log_only:>11.2f}")
+        print(f"{'snapshot + tail':>16} {with_snapshot:>11.2f}")
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
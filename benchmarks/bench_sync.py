@@ -0,0 +1,86 @@
+"""
+差分同期（GET /todos?since=）のベンチマーク
+
+指定件数のToDoを投入して変更シーケンス番号を控えた後、変更件数（作成・完了化・論理削除の混在）を
+変えながら、since 以降の差分の取得時間（database.get_changed_todo_ids と JSONの取得）を計測します。
+比較用に、全件のJSON配列ボディを構築する時間も計測します（いずれもJSONキャッシュなし）。
+
+実行例:
+    python -m benchmarks.bench_sync
+    python -m benchmarks.bench_sync --rows 1000000 --deltas 10 100 1000 10000
+"""
+
+import argparse
+import random
+import time
+
+from app import database
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def populate(rows: int) -> None:
+    """データストアに rows 件のToDoを一括投入する"""
+    database.clear_database()
+    now = get_current_jst_time()
+    database.create_todos([
+        {"title": f"ToDo {i}", "description": None, "created_at": now, "updated_at": now}
+        for i in range(rows)
+    ])
+
+
+def mutate(count: int, rng: random.Random) -> None:
+    """作成・完了化・論理削除を合わせて count 件行う"""
+    now = get_current_jst_time()
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.4:
+            database.create_todo({"title": "new", "description": None, "created_at": now, "updated_at": now})
+        else:
+            todo_id = rng.randrange(1, database.next_id)
+            updates = {"completed": True} if choice < 0.8 else {"is_active": False}
+            database.update_todo(todo_id, {**updates, "updated_at": now})
+
+
+def sync(since: int) -> int:
+    """since 以降の差分をJSONで取得し、件数を返す"""
+    changed_ids, _, _ = database.get_changed_todo_ids(since)
+    return len(database.get_todos_json(changed_ids))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--deltas", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20, help="差分ごとの計測回数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    populate(args.rows)
+
+    print(f"{'delta':>8} {'changed':>8} {'since(ms)':>10} {'full(ms)':>10}")
+    for delta in args.deltas:
+        since = database.change_sequence
+        mutate(delta, rng)
+
+        # どちらもJSONキャッシュのない状態から計測する
+        elapsed = 0.0
+        for _ in range(args.repeat):
+            database.todos_json_cache.clear()
+            start = time.perf_counter()
+            changed = sync(since)
+            elapsed += time.perf_counter() - start
+        synced = elapsed / args.repeat * 1000
+
+        database.todos_json_cache.clear()
+        database.active_todos_body_cache = None
+        start = time.perf_counter()
+        database.render_active_todos_json()
+        full = (time.perf_counter() - start) * 1000
+
+        print(f"{delta:>8} {changed:>8} {synced:>10.3f} {full:>10.1f}")
+
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
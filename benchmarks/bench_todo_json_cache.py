@@ -0,0 +1,87 @@
+"""
+ToDoごとのJSONキャッシュのマイクロベンチマーク
+
+GET /todos のレスポンス構築について、1件あたりのコストを比較します。
+
+- legacy: 行ごとに ToDo(**todo) でバリデーションし、FastAPI と同様に
+  jsonable な dict に変換してから json.dumps でエンコード（従来実装）
+- cold:   キャッシュが空の状態から get_todos_json で連結（初回読み出し）
+- cached: キャッシュ済みのJSON断片を連結するだけ（2回目以降）
+
+実行例:
+    python -m benchmarks.bench_todo_json_cache
+    python -m benchmarks.bench_todo_json_cache --rows 10000 --repeat 3
+"""
+
+import argparse
+import json
+import time
+
+from app import database
+from app.models import ToDo
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def populate(rows: int) -> None:
+    """データストアに rows 件のToDoを投入する"""
+    database.clear_database()
+    now = get_current_jst_time()
+    for i in range(rows):
+        database.create_todo({
+            "title": f"ToDo {i}",
+            "description": "牛乳とパンを買う" if i % 2 else None,
+            "completed": i % 3 == 0,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+
+def render_legacy() -> bytes:
+    """従来実装：行ごとのバリデーションとシリアライズ"""
+    models = [ToDo(**todo.to_dict()) for todo in database.get_all_active_todos()]
+    content = [model.model_dump(mode="json") for model in models]
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_cached() -> bytes:
+    """キャッシュ実装：エンコード済みJSON断片の連結"""
+    page_ids, _ = database.get_active_todo_ids_page()
+    return b"[" + b",".join(database.get_todos_json(page_ids)) + b"]"
+
+
+def render_cold() -> bytes:
+    """キャッシュを空にしてから連結（初回読み出しのコスト）"""
+    database.todos_json_cache.clear()
+    return render_cached()
+
+
+def measure(func, repeat: int) -> float:
+    """関数を repeat 回実行し、最良値（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    populate(args.rows)
+    assert json.loads(render_legacy()) == json.loads(render_cached())
+
+    print(f"rows={args.rows}")
+    print(f"{'mode':>8} {'total(ms)':>10} {'per-row(us)':>12}")
+    for name, func in (("legacy", render_legacy), ("cold", render_cold), ("cached", render_cached)):
+        elapsed = measure(func, args.repeat)
+        print(f"{name:>8} {elapsed * 1000:>10.1f} {elapsed / args.rows * 1e6:>12.3f}")
+    database.clear_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+マルチワーカー構成の負荷試験
+
+SQLiteストレージ（共有ファイル）で uvicorn --workers N のサーバーを実際に起動し、
+複数の負荷生成プロセスから GET /todos（1ページ）と POST /todos を混在させたリクエストを送って、
+ワーカー数ごとのスループット（リクエスト/秒）とレイテンシを計測します。
+最後に全ワーカーが作成したIDに重複がないことを確認します。
+
+ワーカー数に比例してスループットが伸びるのは、空きCPUコアがある場合に限られます
+（負荷生成プロセスも同じマシンのCPUを使用します）。
+
+実行例:
+    python -m benchmarks.bench_workers
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --duration 10 --write-ratio 0.1
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _free_port() -> int:
+    """空いているTCPポートを取得する"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    """ヘルスチェックが成功するまで待機する"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not start in time")
+
+
+async def _generate_load(base_url: str, duration: float, concurrency: int, write_ratio: float) -> tuple[list, list]:
+    """duration 秒間 concurrency 並列でリクエストを送り、レイテンシと作成したIDを返す"""
+    latencies = []
+    created_ids = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                if random.random() < write_ratio:
+                    response = await client.post("/todos", json={"title": "load test"})
+                    created_ids.append(response.json()["id"])
+                else:
+                    response = await client.get("/todos", params={"limit": 50})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, created_ids
+
+
+def _load_process(base_url: str, duration: float, concurrency: int, write_ratio: float, results) -> None:
+    """負荷生成プロセスのエントリーポイント"""
+    results.put(asyncio.run(_generate_load(base_url, duration, concurrency, write_ratio)))
+
+
+def run(workers: int, args: argparse.Namespace) -> tuple[float, float, float, int]:
+    """ワーカー数 workers のサーバーに負荷をかけ、(リクエスト/秒, p50, p99, 重複ID数) を返す"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        env = dict(os.environ, TODO_STORAGE="sqlite", TODO_SQLITE_PATH=os.path.join(tmp, "bench.db"))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            env=env,
+        )
+        try:
+            _wait_until_ready(base_url)
+
+            # 読み込み対象のデータを用意
+            httpx.post(base_url + "/todos/batch", json=[{"title": f"ToDo {i}"} for i in range(args.rows)])
+
+            results = multiprocessing.Queue()
+            generators = [
+                multiprocessing.Process(
+                    target=_load_process,
+                    args=(base_url, args.duration, args.concurrency, args.write_ratio, results),
+                )
+                for _ in range(args.load_processes)
+            ]
+            for generator in generators:
+                generator.start()
+            latencies, created_ids = [], []
+            for _ in generators:
+                process_latencies, process_ids = results.get()
+                latencies += process_latencies
+                created_ids += process_ids
+            for generator in generators:
+                generator.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    duplicates = len(created_ids) - len(set(created_ids))
+    return (
+        len(latencies) / args.duration,
+        latencies[len(latencies) // 2] * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+        duplicates,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=5.0, help="1構成あたりの計測時間（秒）")
+    parser.add_argument("--concurrency", type=int, default=32, help="負荷生成プロセスあたりの同時接続数")
+    parser.add_argument("--load-processes", type=int, default=4, help="負荷生成プロセス数")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="POST /todos の割合")
+    parser.add_argument("--rows", type=int, default=1_000, help="事前に作成しておく件数")
+    parser.add_argument("--dir", default=None, help="データベースファイルを作成するディレクトリ")
+    args = parser.parse_args()
+
+    print(f"cpu cores: {os.cpu_count()}")
+    print(f"{'workers':>8} {'req/s':>10} {'p50(ms)':>9} {'p99(ms)':>9} {'dup ids':>8}")
+    for workers in args.workers:
+        throughput, p50, p99, duplicates = run(workers, args)
+        print(f"{workers:>8} {throughput:>10.0f} {p50:>9.1f} {p99:>9.1f} {duplicates:>8}")
+
+
+if __name__ == "__main__":
+    main()
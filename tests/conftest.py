@@ -2,17 +2,49 @@
 pytestの共通設定とフィクスチャ
 
 このモジュールは、テスト全体で使用されるフィクスチャを提供します。
+APIのテストはインメモリ・SQLiteの両方のストレージバックエンドで実行されます。
 """
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.database import clear_database
+from app.sqlite_storage import SQLiteStorage
+from app.storage import get_storage, set_storage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def storage(request, tmp_path):
+    """
+    APIが使用するストレージのフィクスチャ
+
+    memory の場合は既定のインメモリストレージを初期化して使用し、
+    sqlite の場合はテストごとに新しいSQLiteデータベースに差し替えます。
+
+    Returns:
+        ToDoStorage: テスト中にAPIが使用するストレージ
+    """
+    # データベースをクリア
+    clear_database()
+
+    if request.param == "memory":
+        yield get_storage()
+        return
+
+    sqlite_storage = SQLiteStorage(str(tmp_path / "todos.db"), pool_size=2)
+    previous = set_storage(sqlite_storage)
+    try:
+        yield sqlite_storage
+    finally:
+        set_storage(previous)
+        asyncio.run(sqlite_storage.close())
 
 
 @pytest.fixture
-def client():
+def client(storage):
     """
     FastAPI TestClientのフィクスチャ
 
@@ -22,8 +54,5 @@ def client():
     Returns:
         TestClient: FastAPIのテストクライアント
     """
-    # データベースをクリア
-    clear_database()
-
     # TestClientを返す
     return TestClient(app)
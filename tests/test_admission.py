@@ -0,0 +1,162 @@
+"""
+アドミッション制御（app.admission）のテスト
+"""
+
+import asyncio
+
+import pytest
+
+from app.admission import SHED_EVICTED, SHED_QUEUE_FULL, SHED_TIMEOUT, AdmissionController, admission
+from app.main import app
+from app.metrics import Metrics, metrics
+
+
+LIST = "GET /todos"
+COMPLETE = "PATCH /todos/{id}/complete"
+STATS = "GET /todos/stats"
+
+
+def _controller(max_concurrency: int, queue_size: int, route_limits=None, queue_timeout: float = 1.0):
+    controller = AdmissionController(Metrics())
+    controller.configure(max_concurrency, queue_size, queue_timeout, route_limits or {})
+    return controller
+
+
+def test_waiters_start_in_priority_order():
+    """正常系: 枠が空くと、優先度の高いルート（軽い書き込み）から到着順に開始される"""
+    controller = _controller(1, 10)
+    started = []
+
+    async def request(route):
+        assert await controller.acquire(route) is None
+        started.append(route)
+        await asyncio.sleep(0)
+        controller.release(route)
+
+    async def run():
+        assert await controller.acquire(STATS) is None
+        tasks = [asyncio.create_task(request(route)) for route in (LIST, STATS, COMPLETE, LIST, COMPLETE)]
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 5
+        controller.release(STATS)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert started == [COMPLETE, COMPLETE, STATS, LIST, LIST]
+    assert controller.active == 0 and controller.queue_depth == 0
+
+
+def test_full_queue_sheds_or_evicts_lower_priority():
+    """異常系: 待ち行列が満杯の場合、優先度が同じか低ければ拒否し、高ければ最も優先度の低い待機中のものと入れ替える"""
+    controller = _controller(1, 2)
+
+    async def run():
+        await controller.acquire(STATS)
+        list_waiter = asyncio.create_task(controller.acquire(LIST))
+        stats_waiter = asyncio.create_task(controller.acquire(STATS))
+        await asyncio.sleep(0)
+
+        rejected = await controller.acquire(LIST)
+        complete_waiter = asyncio.create_task(controller.acquire(COMPLETE))
+        await asyncio.sleep(0)
+        evicted = await list_waiter
+
+        controller.release(STATS)
+        return rejected, evicted, await complete_waiter, stats_waiter.done()
+
+    rejected, evicted, complete, stats_started = asyncio.run(run())
+
+    assert rejected == SHED_QUEUE_FULL
+    assert evicted == SHED_EVICTED
+    assert complete is None
+    assert not stats_started
+
+
+def test_queue_timeout():
+    """異常系: 待ち時間が上限を超えると拒否され、待ち行列から取り除かれる"""
+    controller = _controller(1, 10, queue_timeout=0.01)
+
+    async def run():
+        await controller.acquire(STATS)
+        return await controller.acquire(COMPLETE)
+
+    assert asyncio.run(run()) == SHED_TIMEOUT
+    assert controller.queue_depth == 0
+
+
+def test_route_limit_does_not_block_other_routes():
+    """正常系: ルートの上限に達したルートは待機し、他のルートは全体の枠内で即座に開始される"""
+    controller = _controller(4, 10, {LIST: 1})
+
+    async def run():
+        await controller.acquire(LIST)
+        second_list = asyncio.create_task(controller.acquire(LIST))
+        await asyncio.sleep(0)
+        assert await controller.acquire(COMPLETE) is None
+        assert not second_list.done()
+        controller.release(LIST)
+        return await second_list
+
+    assert asyncio.run(run()) is None
+    assert controller.route_active == {LIST: 1, COMPLETE: 1}
+
+
+def test_cancelled_waiter_is_removed():
+    """異常系: 待機中にクライアントが切断された場合は待ち行列から取り除かれ、枠は失われない"""
+    controller = _controller(1, 10)
+
+    async def run():
+        await controller.acquire(STATS)
+        waiter = asyncio.create_task(controller.acquire(COMPLETE))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release(STATS)
+
+    asyncio.run(run())
+
+    assert controller.queue_depth == 0
+    assert controller.active == 0
+
+
+@pytest.fixture
+def overloaded():
+    """全体の枠を使い切った状態のアドミッション制御（待ち行列なし）"""
+    metrics.clear()
+    admission.configure(1, 0, 0.0, {}, retry_after=3, routes=app.routes)
+    admission.active = 1
+    yield admission
+    admission.configure(0, 0, 0.0, {})
+    metrics.clear()
+
+
+def test_overloaded_requests_rejected_with_retry_after(client, overloaded):
+    """異常系: 過負荷時は 503 と Retry-After を即座に返し、拒否件数がメトリクスに記録される"""
+    response = client.post("/todos", json={"title": "ToDo 1"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json()["error_code"] == "OVERLOADED"
+
+    # 対象外のルート（メトリクス・ヘルスチェック）は制限されない
+    assert client.get("/").status_code == 200
+    body = client.get("/metrics").text
+    assert 'todo_admission_shed_total{route="POST /todos",reason="queue_full"} 1' in body
+    assert 'todo_http_requests_total{method="POST",route="/todos",status="503"} 1' in body
+    assert "todo_admission_queue_depth 0" in body
+
+
+def test_admitted_requests_release_slots(client):
+    """正常系: 許可されたリクエストは完了時に枠を返す"""
+    admission.configure(2, 10, 1.0, {LIST: 1}, routes=app.routes)
+    try:
+        client.post("/todos", json={"title": "ToDo 1"})
+        assert client.get("/todos").status_code == 200
+        assert client.patch("/todos/1/complete").status_code == 200
+        assert client.delete("/todos/99").status_code == 404
+        assert admission.active == 0
+        assert set(admission.route_active.values()) == {0}
+    finally:
+        admission.configure(0, 0, 0.0, {})
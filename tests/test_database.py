@@ -0,0 +1,126 @@
+"""
+app.database のインデックス管理のテスト
+"""
+
+import json
+
+import pytest
+
+from app import database
+from app.models import ToDo
+from app.utils.datetime_utils import get_current_jst_time
+
+
+@pytest.fixture
+def db():
+    """各テスト実行前後にデータベースをクリアするフィクスチャ"""
+    database.clear_database()
+    yield database
+    database.clear_database()
+
+
+def _new_todo(title: str) -> dict:
+    now = get_current_jst_time()
+    return {
+        "title": title,
+        "description": None,
+        "completed": False,
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def test_active_index_follows_create_and_delete(db):
+    """正常系: 作成で追加、論理削除で除外される"""
+    for i in range(5):
+        db.create_todo(_new_todo(f"ToDo {i}"))
+
+    db.update_todo(2, {"is_active": False})
+    db.update_todo(4, {"is_active": False})
+
+    assert db.active_ids == [1, 3, 5]
+    assert [todo.id for todo in db.get_all_active_todos()] == [1, 3, 5]
+
+
+def test_active_index_ignores_unrelated_updates(db):
+    """正常系: is_active 以外の更新ではインデックスが変化しない"""
+    db.create_todo(_new_todo("ToDo 1"))
+    db.update_todo(1, {"completed": True})
+    db.update_todo(1, {"is_active": True})
+
+    assert db.active_ids == [1]
+
+
+def test_active_index_keeps_order_on_reactivation(db):
+    """正常系: 再有効化されたIDもID昇順の位置に戻る"""
+    for i in range(3):
+        db.create_todo(_new_todo(f"ToDo {i}"))
+    db.update_todo(1, {"is_active": False})
+    db.update_todo(1, {"is_active": True})
+
+    assert db.active_ids == [1, 2, 3]
+
+
+def test_clear_database_resets_index(db):
+    """正常系: clear_database でインデックスも初期化される"""
+    db.create_todo(_new_todo("ToDo 1"))
+    db.clear_database()
+
+    assert db.active_ids == []
+    assert db.get_all_active_todos() == []
+
+
+def test_json_cache_matches_model_encoding(db):
+    """正常系: キャッシュされるJSONは ToDo モデルのエンコード結果と一致する"""
+    todo = db.create_todo(_new_todo("買い物に行く"))
+
+    assert db.get_todos_json([1]) == [ToDo(**todo.to_dict()).model_dump_json().encode()]
+    assert 1 in db.todos_json_cache
+
+
+def test_json_cache_invalidated_on_update(db):
+    """正常系: update_todo でキャッシュが無効化され、最新の状態が返る"""
+    db.create_todo(_new_todo("ToDo 1"))
+    db.get_todos_json([1])
+
+    db.update_todo(1, {"completed": True})
+
+    assert 1 not in db.todos_json_cache
+    assert json.loads(db.get_todos_json([1])[0])["completed"] is True
+
+
+def test_record_stores_epoch_seconds(db):
+    """正常系: タイムスタンプはエポック秒で保持され、to_dict でJSTの datetime に戻る"""
+    todo_data = _new_todo("ToDo 1")
+    todo = db.create_todo(dict(todo_data))
+
+    assert isinstance(todo.created_at, int)
+    assert todo.to_dict()["created_at"] == todo_data["created_at"]
+    assert todo.to_dict()["created_at"].utcoffset() == todo_data["created_at"].utcoffset()
+
+
+def test_record_update_converts_datetime(db):
+    """正常系: update_todo に渡した datetime はエポック秒に変換される"""
+    db.create_todo(_new_todo("ToDo 1"))
+    updated_at = get_current_jst_time()
+
+    todo = db.update_todo(1, {"completed": True, "updated_at": updated_at})
+
+    assert todo.updated_at == int(updated_at.timestamp())
+    assert todo.to_dict()["updated_at"] == updated_at
+
+
+def test_completed_indexes_follow_updates(db):
+    """正常系: 完了化・論理削除に合わせて完了状態別インデックスが更新される"""
+    for i in range(4):
+        db.create_todo(_new_todo(f"ToDo {i}"))
+
+    db.update_todo(1, {"completed": True})
+    db.update_todo(2, {"completed": True})
+    db.update_todo(2, {"is_active": False})
+    db.update_todo(3, {"is_active": False})
+
+    assert db.completed_ids == [1]
+    assert db.open_ids == [4]
+    assert db.active_ids == [1, 4]
@@ -0,0 +1,77 @@
+"""
+レスポンスのJSONエンコーダ（app.utils.json_utils）のテスト
+"""
+
+import json
+
+import pytest
+
+from app.database import ToDoRecord
+from app.models import ToDo, ToDoBatchCreateResponse
+from app.utils import json_utils
+from app.utils.datetime_utils import get_current_jst_time, to_epoch_seconds
+
+
+# エンコード結果が分かれやすい文字列（引用符・制御文字・DEL・非ASCII・絵文字）
+TRICKY_TITLES = [
+    "買い物に行く",
+    'quote " backslash \\ slash /',
+    "tab\tnewline\nreturn\r nul\x00 bell\x07 del\x7f",
+    "emoji 😀 / 𠮷野家 / é",
+    "  ",
+]
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def encoder(request):
+    """各JSONエンコーダに切り替えるフィクスチャ（orjson が未インストールの場合はスキップ）"""
+    if request.param == "orjson" and json_utils.orjson is None:
+        pytest.skip("orjson is not installed")
+    previous = json_utils.encoder_name
+    json_utils.set_json_encoder(request.param)
+    yield request.param
+    json_utils.set_json_encoder(previous)
+
+
+def _record(title: str, description) -> ToDoRecord:
+    now = to_epoch_seconds(get_current_jst_time())
+    return ToDoRecord(1, title, description, True, False, now, now)
+
+
+@pytest.mark.parametrize("title", TRICKY_TITLES)
+def test_record_json_matches_model_encoding(encoder, title):
+    """正常系: ToDoRecord.to_json は ToDo モデルのエンコード結果とバイト単位で一致する"""
+    for description in (None, title):
+        record = _record(title, description)
+
+        assert record.to_json() == ToDo(**record.to_dict()).model_dump_json().encode()
+
+
+def test_response_matches_default_json_response(encoder, client):
+    """正常系: APIのレスポンスボディはFastAPI既定のエンコード結果と一致する"""
+    created = client.post("/todos", json={"title": TRICKY_TITLES[2], "description": TRICKY_TITLES[3]})
+    batch = client.post("/todos/batch", json=[{"title": title} for title in TRICKY_TITLES] + [{"title": ""}])
+    stats = client.get("/todos/stats")
+
+    assert created.status_code == 201
+    assert created.content == ToDo(**created.json()).model_dump_json().encode()
+    assert batch.status_code == 201
+    assert batch.content == ToDoBatchCreateResponse(**batch.json()).model_dump_json().encode()
+    assert [error["index"] for error in batch.json()["errors"]] == [4, 5]  # 空白のみ・空文字のタイトル
+    assert stats.content == json.dumps(stats.json(), separators=(",", ":")).encode()
+
+
+def test_set_json_encoder_rejects_unknown_name():
+    """異常系: 不正なエンコーダ名は ValueError"""
+    with pytest.raises(ValueError):
+        json_utils.set_json_encoder("msgpack")
+
+
+def test_set_json_encoder_auto():
+    """正常系: auto は orjson がインストールされていれば orjson を選択する"""
+    previous = json_utils.encoder_name
+    try:
+        expected = "orjson" if json_utils.orjson is not None else "stdlib"
+        assert json_utils.set_json_encoder("auto") == expected
+    finally:
+        json_utils.set_json_encoder(previous)
@@ -0,0 +1,98 @@
+"""
+GET /metrics（メトリクス）のテスト
+"""
+
+import asyncio
+
+import pytest
+
+from app.metrics import Metrics, MetricsMiddleware, metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """テストごとにメトリクスを初期化する"""
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def _samples(client) -> dict[str, float]:
+    """GET /metrics のレスポンスを サンプル名（ラベル込み） → 値 の辞書に変換する"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_count_requests_by_route_and_status(client):
+    """正常系: ルートのパステンプレートとステータスコードごとにリクエストが集計される"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    client.post("/todos", json={"title": "ToDo 2"})
+    client.patch("/todos/1/complete")
+    client.delete("/todos/99")
+    client.get("/no-such-path")
+
+    samples = _samples(client)
+
+    assert samples['todo_http_requests_total{method="POST",route="/todos",status="201"}'] == 2
+    assert samples['todo_http_requests_total{method="PATCH",route="/todos/{id}/complete",status="200"}'] == 1
+    assert samples['todo_http_requests_total{method="DELETE",route="/todos/{id}",status="404"}'] == 1
+    assert samples['todo_http_requests_total{method="GET",route="<unmatched>",status="404"}'] == 1
+    assert samples["todo_not_found_total"] == 1
+    assert samples["todo_http_requests_in_flight"] == 1  # GET /metrics 自身
+
+
+def test_metrics_latency_histogram_is_cumulative(client):
+    """正常系: ヒストグラムのバケットは累積値で、+Inf バケットと件数が一致する"""
+    for _ in range(3):
+        client.get("/todos")
+
+    samples = _samples(client)
+    labels = 'method="GET",route="/todos"'
+    buckets = [value for name, value in samples.items()
+               if name.startswith(f"todo_http_request_duration_seconds_bucket{{{labels}")]
+
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == samples[f"todo_http_request_duration_seconds_count{{{labels}}}"] == 3
+    assert samples[f"todo_http_request_duration_seconds_sum{{{labels}}}"] > 0
+
+
+def test_metrics_store_gauges(client, storage):
+    """正常系: ストアの件数（全件・有効・論理削除済み）がゲージとして出力される"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(5)])
+    client.delete("/todos/2")
+
+    samples = _samples(client)
+
+    assert samples["todo_store_rows"] == 5
+    assert samples["todo_store_active_rows"] == 4
+    assert samples["todo_store_tombstones"] == 1
+    if storage.__class__.__name__ == "InMemoryStorage":
+        assert samples["todo_store_next_id"] == 6
+    else:
+        assert "todo_store_next_id" not in samples
+
+
+def test_middleware_records_exceptions_as_500():
+    """異常系: アプリが例外を送出した場合は 500 として記録し、処理中の件数を戻す"""
+    recorder = Metrics(buckets=(0.1,))
+
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    async def run():
+        middleware = MetricsMiddleware(failing_app, recorder)
+        with pytest.raises(RuntimeError):
+            await middleware({"type": "http", "method": "GET", "path": "/"}, None, None)
+
+    asyncio.run(run())
+
+    assert recorder.responses == {("GET", "<unmatched>", 500): 1}
+    assert recorder.in_flight == 0
+    assert recorder.latencies[("GET", "<unmatched>")].bucket_counts == [1, 0]
@@ -0,0 +1,85 @@
+"""
+リクエストのプロファイリング（app.profiling、GET /debug/profiles）のテスト
+"""
+
+import marshal
+
+import pytest
+
+from app.profiling import profiler
+
+
+@pytest.fixture
+def configure_profiler():
+    """テスト中のプロファイラ設定を変更し、終了時に無効に戻すフィクスチャ"""
+    yield profiler.configure
+    profiler.configure(False, 0, 100)
+
+
+def test_profiling_disabled_by_default(client):
+    """正常系: 無効な場合はヘッダを付けても計測せず、結果も保持しない"""
+    response = client.post("/todos", headers={"X-Profile": "1"}, json={"title": "ToDo 1"})
+
+    assert response.status_code == 201
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/debug/profiles").json() == []
+
+
+def test_profile_on_demand(client, configure_profiler):
+    """正常系: X-Profile ヘッダ付きのリクエストのみ計測し、IDで結果を取得できる"""
+    configure_profiler(True, 0, 10)
+    client.post("/todos", json={"title": "ToDo 1"})
+    client.patch("/todos/1/complete")
+    response = client.delete("/todos/1", headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    profile_id = int(response.headers["X-Profile-Id"])
+
+    profiles = client.get("/debug/profiles").json()
+    assert [(p["id"], p["method"], p["path"], p["sampled"]) for p in profiles] == [
+        (profile_id, "DELETE", "/todos/{id}", False),
+    ]
+    assert profiles[0]["duration_ms"] > 0
+
+    text = client.get(f"/debug/profiles/{profile_id}", params={"sort": "tottime", "limit": 5})
+    assert text.status_code == 200
+    assert text.headers["content-type"].startswith("text/plain")
+    assert "function calls" in text.text
+
+    binary = client.get(f"/debug/profiles/{profile_id}", params={"format": "pstats"})
+    assert binary.status_code == 200
+    stats = marshal.loads(binary.content)
+    assert any(name == "delete_todo" for _, _, name in stats)
+
+
+def test_profile_sampling_keeps_rolling_buffer(client, configure_profiler):
+    """正常系: サンプリングでは N 件に1件を計測し、直近の結果のみ保持する"""
+    configure_profiler(False, 3, 2)
+    for i in range(9):
+        response = client.post("/todos", json={"title": f"ToDo {i + 1}"})
+        assert ("X-Profile-Id" in response.headers) == (i % 3 == 2)
+
+    profiles = client.get("/debug/profiles").json()
+    assert [(p["id"], p["sampled"]) for p in profiles] == [(3, True), (2, True)]
+
+
+def test_profile_not_found(client, configure_profiler):
+    """異常系: 保持していないIDの場合は 404"""
+    configure_profiler(True, 0, 10)
+    response = client.get("/debug/profiles/1")
+
+    assert response.status_code == 404
+    assert response.json()["error_code"] == "PROFILE_NOT_FOUND"
+
+
+def test_profile_recorded_when_handler_raises(client, configure_profiler):
+    """異常系: ハンドラが例外を送出した場合も計測結果を保持し、次のリクエストを計測できる"""
+    configure_profiler(True, 0, 10)
+    response = client.delete("/todos/99", headers={"X-Profile": "1"})
+    assert response.status_code == 404
+
+    client.post("/todos", json={"title": "ToDo 1"})
+    response = client.delete("/todos/1", headers={"X-Profile": "1"})
+
+    assert response.headers["X-Profile-Id"] == "2"
+    assert [p["id"] for p in client.get("/debug/profiles").json()] == [2, 1]
@@ -0,0 +1,141 @@
+"""
+スナップショットの保存・読み込みと、スナップショット＋ログ末尾による復元のテスト
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database, snapshot
+from app.main import app
+from app.snapshot import SnapshotFormatError, read_snapshot, write_snapshot
+from app.utils.datetime_utils import get_current_jst_time
+from app.wal import WriteAheadLog, read_wal
+
+
+@pytest.fixture
+def db():
+    """各テスト実行前後にデータベースをクリアするフィクスチャ"""
+    database.clear_database()
+    yield database
+    database.attach_wal(None)
+    database.clear_database()
+
+
+def _new_todo(title: str, description: str | None = None) -> dict:
+    now = get_current_jst_time()
+    return {"title": title, "description": description, "created_at": now, "updated_at": now}
+
+
+def _state():
+    return (
+        [todo.to_row() + [todo.change_seq] for todo in database.todos_db.values()],
+        database.next_id,
+        database.get_stats(),
+        database.change_sequence,
+        database.get_changed_todo_ids(0),
+    )
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """正常系: 書き出したレコードをそのまま読み出せる"""
+    rows = [
+        [1, "買い物に行く", "牛乳とパンを買う", False, True, 1761787800, 1761787800, 1],
+        [2, "ToDo 2", None, True, True, 1761787801, 1761787900, 7],
+        [5, "削除済み", None, False, False, 1761787802, 1761787950, 9],
+    ]
+    path = str(tmp_path / "todos.snapshot")
+
+    assert write_snapshot(path, rows, next_id=6, lsn=42, change_sequence=9, change_floor=4) == 3
+
+    next_id, lsn, change_sequence, change_floor, loaded = read_snapshot(path)
+    assert (next_id, lsn, change_sequence, change_floor) == (6, 42, 9, 4)
+    assert [list(row) for row in loaded] == rows
+
+
+def test_snapshot_reads_v1_format(db, tmp_path):
+    """正常系: 変更シーケンス番号のない旧形式を読み込み、復元時にID順で番号を付与する"""
+    path = tmp_path / "todos.snapshot"
+    fixed = b"".join([
+        snapshot.RECORD_V1.pack(1, 1761787800, 1761787800, snapshot.FLAG_ACTIVE, 3, 0),
+        snapshot.RECORD_V1.pack(3, 1761787801, 1761787900, snapshot.FLAG_COMPLETED, 2, 0),
+    ])
+    path.write_bytes(snapshot.HEADER_V1.pack(snapshot.SNAPSHOT_MAGIC_V1, 4, 42, 2) + fixed + "牛乳を削除".encode())
+
+    next_id, lsn, change_sequence, change_floor, loaded = read_snapshot(str(path))
+    assert (next_id, lsn, change_sequence, change_floor) == (4, 42, 0, 0)
+    assert [list(row) for row in loaded] == [
+        [1, "牛乳を", None, False, True, 1761787800, 1761787800, 0],
+        [3, "削除", None, True, False, 1761787801, 1761787900, 0],
+    ]
+
+    assert db.restore_snapshot(str(path)) == 42
+    assert [todo.change_seq for todo in db.todos_db.values()] == [1, 2]
+    assert db.get_changed_todo_ids(0) == ([1, 3], 2, False)
+
+
+def test_snapshot_invalid_file(tmp_path):
+    """異常系: 形式が不正なファイル"""
+    path = tmp_path / "todos.snapshot"
+    path.write_bytes(b"not a snapshot file at all, definitely")
+
+    with pytest.raises(SnapshotFormatError):
+        read_snapshot(str(path))
+
+
+def test_restore_from_snapshot_and_log_tail(db, tmp_path):
+    """正常系: スナップショットと以降のログ末尾だけで状態が復元され、ログは切り詰められる"""
+    wal_path = str(tmp_path / "todos.wal")
+    snapshot_path = str(tmp_path / "todos.snapshot")
+    log = WriteAheadLog(wal_path)
+    db.attach_wal(log)
+
+    db.create_todos([_new_todo(f"ToDo {i}", "説明" if i % 2 else None) for i in range(10)])
+    db.update_todos([1, 2], {"completed": True})
+    db.update_todo(3, {"is_active": False})
+    snapshot_lsn = asyncio.run(db.save_snapshot(snapshot_path))
+
+    db.create_todo(_new_todo("ToDo after snapshot"))
+    db.update_todo(1, {"is_active": False})
+    expected = _state()
+
+    db.attach_wal(None)
+    log.close()
+    db.clear_database()
+
+    # スナップショット以前のログは切り詰められている
+    assert all(entry["n"] > snapshot_lsn for entry in read_wal(wal_path))
+
+    lsn = db.restore_snapshot(snapshot_path)
+    assert lsn == snapshot_lsn
+    db.replay_wal(wal_path, after_lsn=lsn)
+
+    assert _state() == expected
+    assert db.active_ids == [2, 4, 5, 6, 7, 8, 9, 10, 11]
+    assert db.completed_ids == [2]
+
+
+def test_restart_uses_periodic_snapshot(tmp_path, monkeypatch, db):
+    """正常系: 稼働中に取得されたスナップショットとログ末尾から再起動時に復元される"""
+    wal_path = tmp_path / "todos.wal"
+    monkeypatch.setenv("TODO_WAL_PATH", str(wal_path))
+    monkeypatch.setenv("TODO_SNAPSHOT_INTERVAL_S", "0.01")
+    monkeypatch.setenv("TODO_SNAPSHOT_MIN_ENTRIES", "1")
+
+    with TestClient(app) as client:
+        client.post("/todos/batch", json=[{"title": f"ToDo {i}"} for i in range(5)])
+        client.delete("/todos/2")
+        deadline = time.monotonic() + 5
+        while not (tmp_path / "todos.wal.snapshot").exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        client.patch("/todos/3/complete")
+        before = client.get("/todos").json()
+
+    assert (tmp_path / "todos.wal.snapshot").exists()
+    db.clear_database()
+
+    with TestClient(app) as client:
+        assert client.get("/todos").json() == before
+        assert client.post("/todos", json={"title": "ToDo 6"}).json()["id"] == 6
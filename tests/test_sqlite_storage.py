@@ -0,0 +1,339 @@
+"""
+SQLiteストレージのテスト
+
+APIの振る舞いは conftest の storage フィクスチャにより両バックエンドで検証されるため、
+ここではSQLite固有の永続化・設定を検証します。
+"""
+
+import asyncio
+import sqlite3
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.sqlite_storage import SELECT_STATS, SQLiteStorage
+from app.storage import InMemoryStorage, get_storage
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def _new_todo(title: str) -> dict:
+    now = get_current_jst_time()
+    return {
+        "title": title,
+        "description": None,
+        "completed": False,
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def test_sqlite_uses_wal_journal_mode(tmp_path):
+    """正常系: データベースがWALモードで作成される"""
+    path = tmp_path / "todos.db"
+    asyncio.run(SQLiteStorage(str(path)).close())
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_sqlite_persists_across_reopen(tmp_path):
+    """正常系: 閉じて開き直しても内容とIDの採番が引き継がれる"""
+    path = str(tmp_path / "todos.db")
+
+    async def first():
+        storage = SQLiteStorage(path)
+        await storage.create_todos([_new_todo("ToDo 1"), _new_todo("ToDo 2")])
+        await storage.update_todo(1, {"completed": True})
+        await storage.close()
+
+    async def second():
+        storage = SQLiteStorage(path)
+        try:
+            created = await storage.create_todo(_new_todo("ToDo 3"))
+            return created, await storage.get_all_active_todos(), await storage.get_stats()
+        finally:
+            await storage.close()
+
+    asyncio.run(first())
+    created, todos, stats = asyncio.run(second())
+
+    assert created.id == 3
+    assert [(todo.id, todo.completed) for todo in todos] == [(1, True), (2, False), (3, False)]
+    assert stats == {"total": 3, "active": 3, "open": 2, "completed": 1, "deleted": 0}
+
+
+def test_sqlite_concurrent_reads_and_writes(tmp_path):
+    """正常系: 並行する作成・取得がすべて完了し、IDが重複しない"""
+    async def main():
+        storage = SQLiteStorage(str(tmp_path / "todos.db"), pool_size=4)
+        try:
+            results = await asyncio.gather(*(
+                storage.create_todo(_new_todo(f"ToDo {i}")) if i % 2 == 0 else storage.get_stats()
+                for i in range(100)
+            ))
+            return [result.id for result in results if not isinstance(result, dict)]
+        finally:
+            await storage.close()
+
+    ids = asyncio.run(main())
+
+    assert sorted(ids) == list(range(1, 51))
+
+
+def test_sqlite_rejects_unknown_columns(tmp_path):
+    """異常系: 存在しない列の更新は ValueError"""
+    async def main():
+        storage = SQLiteStorage(str(tmp_path / "todos.db"))
+        try:
+            await storage.update_todos([1], {"title; DROP TABLE todos": "x"})
+        finally:
+            await storage.close()
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_lifespan_selects_sqlite_backend(tmp_path, monkeypatch):
+    """正常系: TODO_STORAGE=sqlite で起動するとSQLiteに保存され、終了後は既定に戻る"""
+    path = tmp_path / "todos.db"
+    monkeypatch.setenv("TODO_STORAGE", "sqlite")
+    monkeypatch.setenv("TODO_SQLITE_PATH", str(path))
+
+    with TestClient(app) as client:
+        assert isinstance(get_storage(), SQLiteStorage)
+        client.post("/todos", json={"title": "ToDo 1"})
+
+    assert isinstance(get_storage(), InMemoryStorage)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT title FROM todos").fetchall() == [("ToDo 1",)]
+
+
+def test_sqlite_shared_between_storages_leases_distinct_ids(tmp_path):
+    """正常系: 同じファイルを共有する複数のストレージ（ワーカー）でIDが重複しない"""
+    path = str(tmp_path / "todos.db")
+
+    async def main():
+        workers = [SQLiteStorage(path, id_block_size=4) for _ in range(3)]
+        try:
+            created = []
+            for i in range(30):
+                created.append(await workers[i % 3].create_todo(_new_todo(f"ToDo {i}")))
+            created += await workers[0].create_todos([_new_todo(f"Batch {i}") for i in range(10)])
+            return created, await workers[1].get_stats(), await workers[2].get_all_active_todos()
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    created, stats, todos = asyncio.run(main())
+
+    ids = [todo.id for todo in created]
+    assert len(set(ids)) == 40
+    assert ids[-10:] == list(range(ids[-10], ids[-10] + 10))
+    assert stats["total"] == 40
+    assert [todo.id for todo in todos] == sorted(ids)
+
+
+def test_sqlite_clear_invalidates_other_leases(tmp_path):
+    """正常系: 他のストレージの clear_database 後は新しいリースから採番される"""
+    path = str(tmp_path / "todos.db")
+
+    async def main():
+        first, second = SQLiteStorage(path), SQLiteStorage(path)
+        try:
+            await first.create_todo(_new_todo("ToDo 1"))
+            await second.create_todo(_new_todo("ToDo 2"))
+            await first.clear_database()
+            after_clear = await second.create_todo(_new_todo("ToDo 3"))
+            following = await first.create_todo(_new_todo("ToDo 4"))
+            return after_clear.id, following.id
+        finally:
+            await first.close()
+            await second.close()
+
+    after_clear_id, following_id = asyncio.run(main())
+
+    assert after_clear_id == 1
+    assert following_id != after_clear_id
+
+
+def test_sqlite_backfills_search_index(tmp_path):
+    """正常系: 全文検索テーブル導入前のデータベースは開いた時点で検索対象に登録される"""
+    path = str(tmp_path / "todos.db")
+
+    async def create():
+        storage = SQLiteStorage(path)
+        await storage.create_todos([_new_todo("牛乳を買う"), _new_todo("会議の準備")])
+        await storage.close()
+
+    asyncio.run(create())
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM todos_search")
+        connection.execute("DELETE FROM meta WHERE key = 'search_index'")
+
+    async def search():
+        storage = SQLiteStorage(path)
+        try:
+            return await storage.search_todos_json("牛乳")
+        finally:
+            await storage.close()
+
+    fragments, last_id, has_more = asyncio.run(search())
+
+    assert (len(fragments), last_id, has_more) == (1, 1, False)
+
+
+def test_sqlite_reindexes_search_for_new_token_format(tmp_path):
+    """正常系: 1文字の語のトークンを含まない旧形式の全文検索テーブルは開いた時点で登録し直される"""
+    path = str(tmp_path / "todos.db")
+
+    async def create():
+        storage = SQLiteStorage(path)
+        await storage.create_todos([_new_todo("牛乳を買う")])
+        await storage.close()
+
+    asyncio.run(create())
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE todos_search SET tokens = '牛乳 乳を を買 買う'")
+        connection.execute("UPDATE meta SET value = 1 WHERE key = 'search_index'")
+
+    async def search():
+        storage = SQLiteStorage(path)
+        try:
+            return await storage.search_todos_json("牛")
+        finally:
+            await storage.close()
+
+    fragments, last_id, has_more = asyncio.run(search())
+
+    assert (len(fragments), last_id, has_more) == (1, 1, False)
+
+
+def test_sqlite_stats_counters_match_table(tmp_path):
+    """正常系: 件数統計のカウンタが作成・更新・物理削除・初期化のたびに全件集計と一致する"""
+    path = str(tmp_path / "todos.db")
+
+    def scanned() -> dict[str, int]:
+        with sqlite3.connect(path) as connection:
+            total, active, completed = connection.execute(SELECT_STATS).fetchone()
+        return {"total": total, "active": active, "open": active - completed, "completed": completed,
+                "deleted": total - active}
+
+    async def main():
+        storage = SQLiteStorage(path)
+        try:
+            stats = []
+            await storage.create_todos([_new_todo(f"ToDo {i}") for i in range(5)] + [
+                {**_new_todo("完了済み"), "completed": True},
+                {**_new_todo("削除済み"), "is_active": False},
+            ])
+            stats.append((await storage.get_stats(), scanned()))
+            await storage.update_todos([1, 2, 6, 7, 99], {"completed": True}, only_active=True)
+            await storage.update_todos([2, 3, 3], {"is_active": False})
+            await storage.update_todos([4], {"title": "変更"})
+            stats.append((await storage.get_stats(), scanned()))
+            await storage.compact_deleted(get_current_jst_time() + timedelta(seconds=1))
+            stats.append((await storage.get_stats(), scanned()))
+            await storage.clear_database()
+            stats.append((await storage.get_stats(), scanned()))
+            return stats
+        finally:
+            await storage.close()
+
+    stats = asyncio.run(main())
+
+    assert stats[1][0] == {"total": 7, "active": 4, "open": 2, "completed": 2, "deleted": 3}
+    for counters, table in stats:
+        assert counters == table
+
+
+def test_sqlite_backfills_stats_counters(tmp_path):
+    """正常系: 件数統計のカウンタ導入前のデータベースは開いた時点で全件を集計する"""
+    path = str(tmp_path / "todos.db")
+
+    async def create():
+        storage = SQLiteStorage(path)
+        await storage.create_todos([_new_todo("ToDo 1"), {**_new_todo("ToDo 2"), "completed": True}])
+        await storage.close()
+
+    asyncio.run(create())
+    with sqlite3.connect(path) as connection:
+        connection.execute("DELETE FROM meta WHERE key LIKE 'stat_%'")
+
+    async def stats():
+        storage = SQLiteStorage(path)
+        try:
+            return await storage.get_stats()
+        finally:
+            await storage.close()
+
+    assert asyncio.run(stats()) == {"total": 2, "active": 2, "open": 1, "completed": 1, "deleted": 0}
+
+
+def test_sqlite_migrates_change_sequence(tmp_path):
+    """正常系: 変更シーケンス番号の導入前のデータベースは開いた時点でID順に番号が付与される"""
+    path = str(tmp_path / "todos.db")
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            CREATE TABLE todos (
+                id INTEGER PRIMARY KEY, title TEXT NOT NULL, description TEXT, completed INTEGER NOT NULL,
+                is_active INTEGER NOT NULL, created_at INTEGER NOT NULL, updated_at INTEGER NOT NULL
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT INTO meta (key, value) VALUES ('generation', 3), ('next_id', 4), ('epoch', 0);
+            INSERT INTO todos VALUES (1, 'ToDo 1', NULL, 0, 1, 1761787800, 1761787800);
+            INSERT INTO todos VALUES (3, 'ToDo 3', NULL, 1, 0, 1761787800, 1761787900);
+        """)
+
+    async def main():
+        storage = SQLiteStorage(path)
+        try:
+            before = await storage.get_changes_json(0)
+            await storage.update_todo(1, {"completed": True})
+            after = await storage.get_changes_json(before[1])
+            return before, after
+        finally:
+            await storage.close()
+
+    (fragments, mark, has_more), (changed, new_mark, _) = asyncio.run(main())
+
+    assert (len(fragments), mark, has_more) == (2, 3, False)
+    assert len(changed) == 1 and b'"id":1' in changed[0]
+    assert new_mark == 4
+
+
+def test_sqlite_change_sequence_shared_between_storages(tmp_path):
+    """正常系: 同じファイルを共有する複数のストレージ（ワーカー）の変更にも重複しない番号が付与される"""
+    path = str(tmp_path / "todos.db")
+
+    async def main():
+        workers = [SQLiteStorage(path) for _ in range(2)]
+        try:
+            for i in range(6):
+                await workers[i % 2].create_todo(_new_todo(f"ToDo {i}"))
+            changes = await workers[0].get_changes_json(0)
+            partial = await workers[1].get_changes_json(2)
+            return changes, partial
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    (fragments, mark, _), (partial, _, _) = asyncio.run(main())
+
+    assert len(fragments) == 6 and mark == 6
+    assert len(partial) == 4
+
+
+def test_sqlite_store_epoch_persists_per_database(tmp_path):
+    """正常系: ETagのエポックは開き直しても同じで、別のデータベースとは異なる"""
+    async def epoch(path):
+        storage = SQLiteStorage(str(path))
+        await storage.close()
+        return storage.store_epoch
+
+    first = asyncio.run(epoch(tmp_path / "first.db"))
+
+    assert asyncio.run(epoch(tmp_path / "first.db")) == first
+    assert asyncio.run(epoch(tmp_path / "second.db")) != first
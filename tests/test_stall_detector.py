@@ -0,0 +1,90 @@
+"""
+イベントループの停止検出（app.stall_detector）のテスト
+"""
+
+import asyncio
+import logging
+import time
+
+from app.main import app
+from app.metrics import Metrics
+from app.stall_detector import UNKNOWN_ENDPOINT, StallDetector, endpoint_names
+
+
+async def blocking_endpoint(seconds: float) -> None:
+    """イベントループをブロックするエンドポイントの代わり"""
+    time.sleep(seconds)
+
+
+def _run(detector: StallDetector, *blocks: float) -> None:
+    """停止検出を動かしながら、blocks の秒数ずつイベントループをブロックする"""
+    async def run():
+        detector.start()
+        try:
+            for seconds in blocks:
+                await asyncio.sleep(0.05)
+                await blocking_endpoint(seconds)
+            await asyncio.sleep(0.05)
+        finally:
+            await detector.stop()
+
+    asyncio.run(run())
+
+
+def test_endpoint_names_from_app_routes():
+    """正常系: アプリのエンドポイント関数が「メソッド パス」に対応付けられる"""
+    names = set(endpoint_names(app.routes).values())
+
+    assert {"POST /todos", "GET /todos", "PATCH /todos/{id}/complete", "DELETE /todos/{id}"} <= names
+
+
+def test_stall_attributed_to_blocking_endpoint(caplog):
+    """正常系: しきい値を超えた停止は、実行中のエンドポイントとスタックとともに記録される"""
+    recorder = Metrics()
+    detector = StallDetector(0.05, 0.01, {blocking_endpoint.__code__: "GET /blocking"}, recorder)
+
+    with caplog.at_level(logging.WARNING, logger="app.stall_detector"):
+        _run(detector, 0.3)
+
+    count, seconds = recorder.stalls["GET /blocking"]
+    assert count == 1
+    assert seconds >= 0.25
+    assert recorder.loop_lag.count > 0
+    assert "GET /blocking" in caplog.text
+    assert "time.sleep(seconds)" in caplog.text
+
+
+def test_short_blocks_are_not_stalls():
+    """正常系: しきい値未満の遅延はループの遅延としてのみ記録される"""
+    recorder = Metrics()
+    detector = StallDetector(0.2, 0.01, {blocking_endpoint.__code__: "GET /blocking"}, recorder)
+
+    _run(detector, 0.02, 0.02)
+
+    assert recorder.stalls == {}
+    assert recorder.loop_lag.count > 0
+
+
+def test_stall_outside_endpoint_is_unknown():
+    """正常系: エンドポイント関数の外での停止は <unknown> として記録される"""
+    recorder = Metrics()
+    detector = StallDetector(0.05, 0.01, {}, recorder)
+
+    _run(detector, 0.3)
+
+    assert list(recorder.stalls) == [UNKNOWN_ENDPOINT]
+
+
+def test_stall_metrics_rendered():
+    """正常系: ループの遅延と停止がメトリクスとして出力される"""
+    recorder = Metrics()
+    recorder.observe_loop_lag(0.002)
+    recorder.record_stall("GET /todos", 0.5)
+    recorder.record_stall("GET /todos", 0.25)
+
+    text = recorder.render([])
+
+    assert "todo_event_loop_lag_seconds_count 1" in text
+    assert 'todo_event_loop_lag_seconds_bucket{le="0.0025"} 1' in text
+    assert 'todo_event_loop_stalls_total{endpoint="GET /todos"} 2' in text
+    assert 'todo_event_loop_stall_seconds_total{endpoint="GET /todos"} 0.75' in text
@@ -0,0 +1,78 @@
+"""
+POST /todos/batch エンドポイントのテスト
+"""
+
+from app.routers import todos
+
+
+def test_batch_create_success(client):
+    """正常系: 複数件を作成し、連続したIDと共通のタイムスタンプが割り当てられる"""
+    client.post("/todos", json={"title": "既存のToDo"})
+
+    response = client.post(
+        "/todos/batch",
+        json=[
+            {"title": "ToDo A", "description": "説明A"},
+            {"title": "ToDo B"},
+            {"title": "ToDo C"},
+        ],
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["errors"] == []
+    assert [todo["id"] for todo in data["created"]] == [2, 3, 4]
+    assert data["created"][0]["description"] == "説明A"
+    assert data["created"][1]["description"] is None
+    assert len({todo["created_at"] for todo in data["created"]}) == 1
+    assert all(todo["completed"] is False and todo["is_active"] is True for todo in data["created"])
+
+    # 一覧に反映されていることを確認
+    assert [todo["id"] for todo in client.get("/todos").json()] == [1, 2, 3, 4]
+
+
+def test_batch_create_partial_errors(client):
+    """正常系: 不正な項目はエラーとして報告され、他の項目は作成される"""
+    response = client.post(
+        "/todos/batch",
+        json=[
+            {"title": "ToDo A"},
+            {"title": "   "},
+            {"description": "タイトルなし"},
+            "not-an-object",
+            {"title": "ToDo B", "description": ""},
+            {"title": "ToDo C"},
+        ],
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert [todo["title"] for todo in data["created"]] == ["ToDo A", "ToDo C"]
+    assert [todo["id"] for todo in data["created"]] == [1, 2]
+    assert [error["index"] for error in data["errors"]] == [1, 2, 3, 4]
+    assert "Title must not be whitespace only" in str(data["errors"][0]["detail"])
+
+
+def test_batch_create_empty(client):
+    """正常系: 空配列の場合は何も作成されない"""
+    response = client.post("/todos/batch", json=[])
+
+    assert response.status_code == 201
+    assert response.json() == {"created": [], "errors": []}
+
+
+def test_batch_create_not_a_list(client):
+    """異常系: リクエストボディが配列でない"""
+    response = client.post("/todos/batch", json={"title": "ToDo A"})
+
+    assert response.status_code == 422
+
+
+def test_batch_create_too_many_items(client):
+    """異常系: 最大件数を超える"""
+    items = [{"title": f"ToDo {i}"} for i in range(todos.MAX_BATCH_SIZE + 1)]
+
+    response = client.post("/todos/batch", json=items)
+
+    assert response.status_code == 422
+    assert client.get("/todos/stats").json()["total"] == 0
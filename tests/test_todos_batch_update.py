@@ -0,0 +1,112 @@
+"""
+POST /todos/batch/complete, POST /todos/batch/delete エンドポイントのテスト
+"""
+
+import asyncio
+
+import httpx
+
+from app.main import app
+
+
+def _create_todos(client, count):
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(count)])
+
+
+def test_batch_complete_success(client):
+    """正常系: 複数件を完了化し、存在しない・削除済みIDは not_found"""
+    _create_todos(client, 4)
+    client.delete("/todos/3")
+
+    response = client.post("/todos/batch/complete", json={"ids": [1, 3, 2, 999]})
+
+    assert response.status_code == 200
+    assert response.json() == {"succeeded": [1, 2], "not_found": [3, 999]}
+
+    todos = {todo["id"]: todo for todo in client.get("/todos").json()}
+    assert todos[1]["completed"] is True
+    assert todos[2]["completed"] is True
+    assert todos[4]["completed"] is False
+
+
+def test_batch_complete_idempotent(client):
+    """正常系: 完了済みのToDoは成功扱いで updated_at が変わらない"""
+    _create_todos(client, 2)
+    client.patch("/todos/1/complete")
+    updated_at = client.get("/todos").json()[0]["updated_at"]
+
+    response = client.post("/todos/batch/complete", json={"ids": [1, 1, 2]})
+
+    assert response.json() == {"succeeded": [1, 1, 2], "not_found": []}
+    assert client.get("/todos").json()[0]["updated_at"] == updated_at
+    assert client.get("/todos/stats").json()["completed"] == 2
+
+
+def test_batch_delete_success(client):
+    """正常系: 複数件を論理削除し、存在しない・削除済み・重複IDは not_found"""
+    _create_todos(client, 4)
+    client.delete("/todos/4")
+
+    response = client.post("/todos/batch/delete", json={"ids": [2, 4, 1, 2, 999]})
+
+    assert response.status_code == 200
+    assert response.json() == {"succeeded": [2, 1], "not_found": [4, 2, 999]}
+    assert [todo["id"] for todo in client.get("/todos").json()] == [3]
+    assert client.patch("/todos/1/complete").status_code == 404
+
+
+def test_batch_delete_many_keeps_indexes(client):
+    """正常系: 一括再構築が働く件数でも一覧・絞り込み・統計が整合する"""
+    _create_todos(client, 200)
+    client.post("/todos/batch/complete", json={"ids": list(range(1, 201, 2))})
+
+    response = client.post("/todos/batch/delete", json={"ids": list(range(1, 101))})
+
+    assert len(response.json()["succeeded"]) == 100
+    assert [todo["id"] for todo in client.get("/todos").json()] == list(range(101, 201))
+    assert [todo["id"] for todo in client.get("/todos", params={"completed": "true"}).json()] == list(range(101, 201, 2))
+    assert client.get("/todos/stats").json() == {
+        "total": 200, "active": 100, "open": 50, "completed": 50, "deleted": 100,
+    }
+
+
+def test_batch_update_invalid_ids(client):
+    """異常系: 不正なID（0）"""
+    response = client.post("/todos/batch/delete", json={"ids": [1, 0]})
+
+    assert response.status_code == 422
+
+
+def test_batch_update_missing_body(client):
+    """異常系: ids 未指定"""
+    response = client.post("/todos/batch/complete", json={})
+
+    assert response.status_code == 422
+
+
+def test_batch_complete_deleted_concurrently(client, storage, monkeypatch):
+    """異常系: 読み込み後に削除されたToDoは完了化せず not_found、完了済みだったToDoは成功"""
+    _create_todos(client, 3)
+    client.patch("/todos/3/complete")
+    get_todos_by_ids = storage.get_todos_by_ids
+
+    async def slow_get_todos_by_ids(todo_ids):
+        todos = await get_todos_by_ids(todo_ids)
+        await asyncio.sleep(0.05)
+        return todos
+
+    monkeypatch.setattr(storage, "get_todos_by_ids", slow_get_todos_by_ids)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            complete = asyncio.ensure_future(async_client.post("/todos/batch/complete", json={"ids": [1, 2, 3]}))
+            await asyncio.sleep(0.01)
+            return await async_client.post("/todos/batch/delete", json={"ids": [2, 2]}), await complete
+
+    deleted, completed = asyncio.run(run())
+
+    assert deleted.json() == {"succeeded": [2], "not_found": [2]}
+    assert completed.json() == {"succeeded": [1, 3], "not_found": [2]}
+    todos = {todo["id"]: todo for todo in client.get("/todos", params={"since": 0}).json()}
+    assert todos[2]["completed"] is False
@@ -0,0 +1,116 @@
+"""
+論理削除済みToDoの物理削除（トゥームストーンのコンパクション）のテスト
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def _compact_all(storage, deleted_before, slice_size=1000) -> int:
+    """カーソルを辿って全範囲をコンパクションし、物理削除した件数を返す"""
+    async def run():
+        purged = 0
+        after_id = 0
+        while after_id is not None:
+            count, after_id = await storage.compact_deleted(deleted_before, after_id, slice_size)
+            purged += count
+        return purged
+
+    return asyncio.run(run())
+
+
+def test_compaction_keeps_404_semantics(client, storage):
+    """正常系: 物理削除後も完了化・削除は論理削除済みと同じく404を返す"""
+    for i in range(3):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    client.delete("/todos/2")
+    etag = client.get("/todos").headers["ETag"]
+
+    purged = _compact_all(storage, get_current_jst_time() + timedelta(seconds=1))
+
+    assert purged == 1
+    for response in (client.patch("/todos/2/complete"), client.delete("/todos/2")):
+        assert response.status_code == 404
+        assert response.json()["error_code"] == "TODO_NOT_FOUND"
+    assert client.post("/todos/batch/delete", json={"ids": [2]}).json()["not_found"] == [2]
+
+    # 一覧の内容は変わらないため、ETagも変化しない
+    response = client.get("/todos", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert [todo["id"] for todo in client.get("/todos").json()] == [1, 3]
+    assert client.get("/todos/stats").json() == {"total": 2, "active": 2, "open": 2, "completed": 0, "deleted": 0}
+
+    # IDは再利用されない
+    assert client.post("/todos", json={"title": "ToDo 4"}).json()["id"] == 4
+
+
+def test_compaction_respects_retention(client, storage):
+    """正常系: 保持期間内の論理削除済みToDoは物理削除されない"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    client.delete("/todos/1")
+
+    purged = _compact_all(storage, get_current_jst_time() - timedelta(hours=1))
+
+    assert purged == 0
+    assert client.get("/todos/stats").json()["deleted"] == 1
+
+
+def test_compaction_in_slices(client, storage):
+    """正常系: 走査範囲ごとに分割して呼び出しても全件が処理される"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i}"} for i in range(25)])
+    client.post("/todos/batch/delete", json={"ids": list(range(1, 26, 2))})
+
+    async def first_slice():
+        return await storage.compact_deleted(get_current_jst_time() + timedelta(seconds=1), 0, 10)
+
+    purged, cursor = asyncio.run(first_slice())
+    assert (purged, cursor) == (5, 10)
+
+    assert _compact_all(storage, get_current_jst_time() + timedelta(seconds=1), slice_size=10) == 8
+    assert client.get("/todos/stats").json()["total"] == 12
+
+
+def test_compaction_is_replayed_from_wal(tmp_path, monkeypatch):
+    """正常系: 物理削除は追記型ログに記録され、再起動後も復活しない"""
+    monkeypatch.setenv("TODO_WAL_PATH", str(tmp_path / "todos.wal"))
+    database.clear_database()
+    try:
+        with TestClient(app) as client:
+            client.post("/todos/batch", json=[{"title": "ToDo 1"}, {"title": "ToDo 2"}])
+            client.delete("/todos/1")
+            database.compact_deleted(get_current_jst_time() + timedelta(seconds=1))
+
+        database.clear_database()
+
+        with TestClient(app) as client:
+            assert client.get("/todos/stats").json()["total"] == 1
+            assert client.delete("/todos/1").status_code == 404
+    finally:
+        database.clear_database()
+
+
+def test_background_compaction_task(tmp_path, monkeypatch):
+    """正常系: TODO_TOMBSTONE_RETENTION_S を設定すると定期的に物理削除される"""
+    monkeypatch.setenv("TODO_TOMBSTONE_RETENTION_S", "0")
+    monkeypatch.setenv("TODO_COMPACTION_INTERVAL_S", "0.01")
+    database.clear_database()
+    try:
+        with TestClient(app) as client:
+            client.post("/todos", json={"title": "ToDo 1"})
+            client.delete("/todos/1")
+
+            # updated_at（秒精度）が保持期間を過ぎるまで待つ
+            deadline = time.monotonic() + 5
+            while client.get("/todos/stats").json()["total"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+            assert client.get("/todos/stats").json()["total"] == 0
+    finally:
+        database.clear_database()
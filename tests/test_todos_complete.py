@@ -2,6 +2,12 @@
 PATCH /todos/{id}/complete エンドポイントのテスト
 """
 
+import asyncio
+
+import httpx
+
+from app.main import app
+
 
 def test_complete_todo_success(client):
     """正常系: 未完了→完了への変更"""
@@ -100,3 +106,30 @@ def test_complete_todo_invalid_id_zero(client):
     assert response.status_code == 422
     data = response.json()
     assert "detail" in data
+
+
+def test_complete_todo_deleted_concurrently(client, storage, monkeypatch):
+    """異常系: 存在確認の後、更新までの間に削除されたToDoは完了化せず404"""
+    client.post("/todos", json={"title": "買い物に行く"})
+    get_todo_by_id = storage.get_todo_by_id
+
+    async def slow_get_todo_by_id(todo_id):
+        todo = await get_todo_by_id(todo_id)
+        await asyncio.sleep(0.05)
+        return todo
+
+    monkeypatch.setattr(storage, "get_todo_by_id", slow_get_todo_by_id)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            complete = asyncio.ensure_future(async_client.patch("/todos/1/complete"))
+            await asyncio.sleep(0.01)
+            return await async_client.delete("/todos/1"), await complete
+
+    deleted, completed = asyncio.run(run())
+
+    assert deleted.status_code == 200
+    assert completed.status_code == 404
+    assert completed.json()["error_code"] == "TODO_NOT_FOUND"
+    assert client.get("/todos", params={"since": 0}).json()[0]["completed"] is False
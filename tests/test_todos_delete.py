@@ -2,6 +2,12 @@
 DELETE /todos/{id} エンドポイントのテスト
 """
 
+import asyncio
+
+import httpx
+
+from app.main import app
+
 
 def test_delete_todo_success(client):
     """正常系: 有効なToDoの削除"""
@@ -100,3 +106,20 @@ def test_delete_multiple_todos(client):
     assert len(todos) == 1
     assert todos[0]["id"] == 2
     assert todos[0]["title"] == "ToDo 2"
+
+
+def test_delete_todo_concurrently(client, storage):
+    """異常系: 同じToDoへの同時の削除は1件のみ成功し、残りは404"""
+    client.post("/todos", json={"title": "買い物に行く"})
+    sequence = int(client.get("/todos", params={"since": 0}).headers["X-Change-Sequence"].split("-")[1])
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(async_client.delete("/todos/1") for _ in range(5)))
+
+    responses = asyncio.run(run())
+
+    assert sorted(response.status_code for response in responses) == [200, 404, 404, 404, 404]
+    # 変更（論理削除）は1回のみ
+    assert int(client.get("/todos", params={"since": 0}).headers["X-Change-Sequence"].split("-")[1]) == sequence + 1
@@ -0,0 +1,260 @@
+"""
+GET /todos/events（変更イベントのSSE配信）のテスト
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.database import ToDoRecord
+from app.events import END_OF_STREAM, ChangeFeed, change_feed
+from app.routers import todos as todos_router
+
+
+def _todo(todo_id: int, change_seq: int | None = None) -> ToDoRecord:
+    return ToDoRecord(todo_id, f"ToDo {todo_id}", None, False, True, 0, 0, change_seq or todo_id)
+
+
+def _parse(body: str) -> list[tuple[str, str, dict]]:
+    """SSEボディを (id, event, data) のリストに変換する"""
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if fields:
+            events.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _sequence(event_id: str) -> int:
+    """イベントIDの変更シーケンス番号"""
+    return int(event_id.split("-")[1])
+
+
+@pytest.fixture
+def listener():
+    """変更フィードを購読し続け、受信したイベントを返す関数を渡す（購読者がいる間のみイベントが構築される）"""
+    subscription = change_feed.subscribe()
+
+    def received() -> list[tuple[str, str, dict]]:
+        messages = []
+        while not subscription.queue.empty():
+            messages.append(subscription.queue.get_nowait())
+        return _parse(b"".join(messages).decode())
+
+    yield received
+    change_feed.unsubscribe(subscription)
+
+
+def _read_until_dropped(client, monkeypatch, last_event_id: str) -> str:
+    """再送分だけを受信して終了するよう、購読を切断済みにしてから GET /todos/events を呼び出す"""
+    subscribe = change_feed.subscribe
+
+    def subscribe_dropped(last_event_id):
+        subscription = subscribe(last_event_id)
+        subscription.dropped = True
+        return subscription
+
+    monkeypatch.setattr(change_feed, "subscribe", subscribe_dropped)
+    response = client.get("/todos/events", headers={"Last-Event-ID": last_event_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    return response.text
+
+
+def test_events_for_create_complete_delete(client, listener):
+    """正常系: 作成・完了化・削除（一括操作を含む）が変更シーケンス番号をIDとするイベントとして配信される"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    client.post("/todos/batch", json=[{"title": "ToDo 2"}, {"title": "ToDo 3"}])
+    client.patch("/todos/1/complete")
+    client.patch("/todos/1/complete")  # 完了済みの場合はイベントを発行しない
+    client.delete("/todos/2")
+    client.post("/todos/batch/complete", json={"ids": [3, 99]})
+    client.post("/todos/batch/delete", json={"ids": [1, 3]})
+    client.post("/todos/batch/delete", json={"ids": [99]})  # 削除対象がない場合は発行しない
+
+    events = listener()
+
+    assert [(event, [todo["id"] for todo in data["todos"]]) for _, event, data in events] == [
+        ("created", [1]),
+        ("created", [2, 3]),
+        ("completed", [1]),
+        ("deleted", [2]),
+        ("completed", [3]),
+        ("deleted", [1, 3]),
+    ]
+    assert events[2][2]["todos"][0]["completed"] is True
+    assert events[5][2]["todos"][0]["is_active"] is False
+
+    # IDはプロセスのエポックと、差分同期と共通の変更シーケンス番号
+    assert {event_id.split("-")[0] for event_id, _, _ in events} == {change_feed.epoch}
+    sequences = [_sequence(event_id) for event_id, _, _ in events]
+    assert sequences == sorted(sequences)
+    assert sequences[-1] == _sequence(client.get("/todos", params={"since": 0}).headers["X-Change-Sequence"])
+
+
+def test_events_resume_from_last_event_id(client, monkeypatch, listener):
+    """正常系: Last-Event-ID より後のイベントのみが再送され、終了時に購読が解除される"""
+    for i in range(3):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    event_ids = [event_id for event_id, _, _ in listener()]
+    subscribers = change_feed.subscriber_count
+
+    events = _parse(_read_until_dropped(client, monkeypatch, event_ids[1]))
+
+    assert [(event_id, data["todos"][0]["id"]) for event_id, _, data in events] == [(event_ids[2], 3)]
+    assert change_feed.subscriber_count == subscribers
+
+
+def test_events_reset_when_history_is_missing(client, monkeypatch, listener):
+    """異常系: 再送できない Last-Event-ID（未来・他のエポック・不正な値）の場合は reset イベントを送る"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    [(event_id, _, _)] = listener()
+    sequence = _sequence(event_id)
+
+    for last_event_id in (change_feed.event_id(sequence + 100), f"0000-{sequence}", str(sequence)):
+        events = _parse(_read_until_dropped(client, monkeypatch, last_event_id))
+        assert events == [(event_id, "reset", {})]
+        monkeypatch.undo()
+
+
+def test_feed_replay_window():
+    """正常系: 履歴の範囲内なら続きから再送し、合計サイズの上限で追い出された範囲・不正な値なら reset を返す"""
+    feed = ChangeFeed()
+
+    async def run():
+        feed.subscribe()
+        for i in range(5):
+            feed.publish("created", [_todo(i + 1)])
+        # 直近3件分のサイズに絞り、次の発行で古いイベントを追い出す
+        feed.history_bytes = 3 * len(feed._history[-1][1])
+        feed.publish("created", [_todo(6)])
+        return (
+            feed.subscribe(feed.event_id(4)).backlog,
+            feed.subscribe(feed.event_id(3)).backlog,
+            feed.subscribe(feed.event_id(2)).backlog,
+            feed.subscribe("abc").backlog,
+            feed.subscribe(feed.event_id(6)).backlog,
+            feed.subscribe(None).backlog,
+        )
+
+    resumed, oldest, expired, invalid, latest, fresh = asyncio.run(run())
+
+    assert [_sequence(_parse(message.decode())[0][0]) for message in resumed] == [5, 6]
+    assert [_sequence(_parse(message.decode())[0][0]) for message in oldest] == [4, 5, 6]
+    assert _parse(b"".join(expired).decode()) == [(feed.event_id(6), "reset", {})]
+    assert _parse(b"".join(invalid).decode()) == [(feed.event_id(6), "reset", {})]
+    assert latest == [] and fresh == []
+
+
+def test_feed_skips_events_without_subscribers():
+    """正常系: 購読者がいない間はイベントを構築せず、その間をまたぐ再開は reset になる"""
+    feed = ChangeFeed()
+
+    async def run():
+        skipped = feed.publish("completed", [_todo(i + 1) for i in range(1000)])
+        history = len(feed._history)
+        return skipped, history, feed.subscribe(feed.event_id(500)).backlog, feed.subscribe(feed.event_id(1000)).backlog
+
+    skipped, history, gap, current = asyncio.run(run())
+
+    assert skipped is None
+    assert history == 0
+    assert _parse(b"".join(gap).decode()) == [(feed.event_id(1000), "reset", {})]
+    assert current == []
+
+
+def test_feed_rotates_epoch_when_sequence_goes_back():
+    """正常系: 変更シーケンス番号が戻った（ストアの初期化・差し替え）場合は、以前のIDでの再開が reset になる"""
+    feed = ChangeFeed()
+
+    async def run():
+        feed.subscribe()
+        old_id = feed.publish("created", [_todo(1), _todo(2)])
+        new_id = feed.publish("created", [_todo(1)])
+        return old_id, new_id, feed.subscribe(old_id).backlog
+
+    old_id, new_id, backlog = asyncio.run(run())
+
+    assert old_id.split("-")[0] != new_id.split("-")[0] == feed.epoch
+    assert _parse(b"".join(backlog).decode()) == [(new_id, "reset", {})]
+
+
+def test_feed_splits_bulk_changes_into_chunks():
+    """正常系: 一括操作の変更は chunk_size 件ごとのイベントに分割され、各IDは最後のToDoの番号になる"""
+    feed = ChangeFeed(chunk_size=2)
+
+    async def run():
+        subscription = feed.subscribe()
+        event_id = feed.publish("deleted", [_todo(i + 1, change_seq=i + 11) for i in range(5)])
+        return event_id, [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+    event_id, messages = asyncio.run(run())
+
+    events = _parse(b"".join(messages).decode())
+    assert [(_sequence(event_id), [todo["id"] for todo in data["todos"]]) for event_id, _, data in events] == [
+        (12, [1, 2]),
+        (14, [3, 4]),
+        (15, [5]),
+    ]
+    assert event_id == feed.event_id(15)
+
+
+def test_feed_drops_slow_subscriber_without_blocking():
+    """正常系: キューが溢れた購読者は切断され、他の購読者と発行側は影響を受けない"""
+    feed = ChangeFeed(queue_size=2)
+
+    async def run():
+        slow = feed.subscribe()
+        fast = feed.subscribe()
+        received = []
+        for i in range(5):
+            feed.publish("created", [_todo(i + 1)])
+            received.append(fast.queue.get_nowait())
+        return slow, fast, received
+
+    slow, fast, received = asyncio.run(run())
+
+    assert slow.dropped and slow.queue.get_nowait() == END_OF_STREAM and slow.queue.empty()
+    assert not fast.dropped
+    assert len(received) == 5
+    assert feed.subscriber_count == 1
+
+
+def test_stream_delivers_live_events_and_unsubscribes():
+    """正常系: ストリームは購読後に発生したイベントを配信し、クライアント切断時に購読を解除する"""
+    async def run():
+        subscribers = change_feed.subscriber_count
+        stream = todos_router._stream_events(None)
+        next_message = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        event_id = change_feed.publish("created", [_todo(1)])
+        message = await next_message
+        await stream.aclose()
+        return subscribers, event_id, message, change_feed.subscriber_count
+
+    before, event_id, message, after = asyncio.run(run())
+
+    assert _parse(message.decode()) == [(event_id, "created", {"todos": [json.loads(_todo(1).to_json())]})]
+    assert after == before
+
+
+def test_stream_ends_immediately_when_dropped(monkeypatch):
+    """正常系: 受信が追いつかず破棄された購読者のストリームは、キープアライブを待たずに終了する"""
+    monkeypatch.setattr(change_feed, "queue_size", 1)
+
+    async def run():
+        subscribers = change_feed.subscriber_count
+        stream = todos_router._stream_events(None)
+        next_message = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        change_feed.publish("created", [_todo(1)])
+        change_feed.publish("created", [_todo(2)])
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(next_message, 1)
+        return subscribers, change_feed.subscriber_count
+
+    before, after = asyncio.run(run())
+
+    assert after == before
@@ -0,0 +1,149 @@
+"""
+GET /todos の同時リクエストの集約（single-flight）のテスト
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.metrics import metrics
+from app.routers.todos import list_flights
+from app.utils.singleflight import SingleFlight
+
+
+def _slow(func, calls: list):
+    """呼び出しを記録し、完了前にイベントループへ制御を返すようにラップする"""
+    async def wrapper(*args):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return await func(*args)
+
+    return wrapper
+
+
+async def _get_concurrently(count: int, **params) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get("/todos", params=params) for _ in range(count)))
+
+
+def test_concurrent_list_requests_share_one_build(client, storage, monkeypatch):
+    """正常系: 同時に到着した全件取得はボディの構築を1回だけ行い、同じバイト列を返す"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i}"} for i in range(5)])
+    calls = []
+    monkeypatch.setattr(storage, "render_active_todos_json", _slow(storage.render_active_todos_json, calls))
+    metrics.clear()
+
+    responses = asyncio.run(_get_concurrently(20))
+
+    assert len(calls) == 1
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+    assert len({response.headers["ETag"] for response in responses}) == 1
+    assert len(responses[0].json()) == 5
+    assert metrics.list_coalesced == 19
+    assert len(list_flights) == 0
+
+
+def test_different_pages_are_not_shared(client, storage, monkeypatch):
+    """正常系: 条件の異なる一覧取得は別々に構築され、それぞれの次ページのカーソルを返す"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i}"} for i in range(5)])
+    calls = []
+    monkeypatch.setattr(storage, "get_active_todos_json_page", _slow(storage.get_active_todos_json_page, calls))
+
+    async def run():
+        return await asyncio.gather(_get_concurrently(3, limit=2), _get_concurrently(3, limit=3))
+
+    two, three = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert {len(response.json()) for response in two} == {2}
+    assert {len(response.json()) for response in three} == {3}
+    assert two[0].headers["X-Next-Cursor"] != three[0].headers["X-Next-Cursor"]
+
+
+def test_list_after_change_is_not_shared_with_older_build(client):
+    """正常系: 変更後の一覧取得は変更前に開始された構築の結果を共有しない"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    etag = client.get("/todos").headers["ETag"]
+    client.post("/todos", json={"title": "ToDo 2"})
+
+    response = client.get("/todos")
+
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+
+def test_singleflight_survives_caller_cancellation():
+    """異常系: 最初の呼び出し元がキャンセルされても、処理は続行され他の呼び出し元が結果を受け取る"""
+    flights = SingleFlight()
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    async def run():
+        first = asyncio.create_task(flights.do("key", build))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flights.do("key", build))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == (b"[]", True)
+    assert calls == [1]
+    assert len(flights) == 0
+
+
+def test_singleflight_shares_exception():
+    """異常系: 処理の例外はすべての呼び出し元に送出され、次の呼び出しでは再実行される"""
+    flights = SingleFlight()
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("database is locked")
+
+    async def run():
+        results = await asyncio.gather(flights.do("key", build), flights.do("key", build), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flights.do("key", build)
+        return results
+
+    results = asyncio.run(run())
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert calls == [1, 1]
+
+
+def test_singleflight_forgets_finished_calls():
+    """正常系: 実行中の処理は完了時・例外時のどちらでも取り除かれる"""
+    flights = SingleFlight()
+
+    async def build():
+        await asyncio.sleep(0)
+        return b"[]"
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("database is locked")
+
+    async def run():
+        ok = asyncio.create_task(flights.do("ok", build))
+        ng = asyncio.create_task(flights.do("ng", fail))
+        await asyncio.sleep(0)
+        in_flight = len(flights)
+        await ok
+        with pytest.raises(RuntimeError):
+            await ng
+        return in_flight
+
+    assert asyncio.run(run()) == 2
+    assert len(flights) == 0
@@ -0,0 +1,81 @@
+"""
+GET /todos の ETag / If-None-Match のテスト
+"""
+
+
+def test_etag_returned(client):
+    """正常系: JSONレスポンスにETagが付与される"""
+    response = client.get("/todos")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+
+
+def test_etag_not_modified(client):
+    """正常系: データ未変更なら If-None-Match で 304 が返る"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    etag = client.get("/todos").headers["ETag"]
+
+    response = client.get("/todos", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_etag_changes_on_create(client):
+    """正常系: 作成後は ETag が変わり 200 で最新データが返る"""
+    etag = client.get("/todos").headers["ETag"]
+    client.post("/todos", json={"title": "ToDo 1"})
+
+    response = client.get("/todos", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 1
+
+
+def test_etag_changes_on_complete_and_delete(client):
+    """正常系: 完了化・削除のたびに ETag が変わる"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    etags = [client.get("/todos").headers["ETag"]]
+
+    client.patch("/todos/1/complete")
+    etags.append(client.get("/todos").headers["ETag"])
+    client.delete("/todos/1")
+    etags.append(client.get("/todos").headers["ETag"])
+
+    assert len(set(etags)) == 3
+    assert client.get("/todos").json() == []
+
+
+def test_etag_weak_and_multiple_values(client):
+    """正常系: 弱いETag表記や複数指定でも一致判定される"""
+    etag = client.get("/todos").headers["ETag"]
+
+    response = client.get("/todos", headers={"If-None-Match": f'"other", W/{etag}'})
+
+    assert response.status_code == 304
+
+
+def test_etag_on_paged_request(client):
+    """正常系: ページング指定時もETagが付与され 304 判定される"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    etag = client.get("/todos", params={"limit": 1}).headers["ETag"]
+
+    response = client.get("/todos", params={"limit": 1}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_etag_differs_for_another_store_epoch(client, storage, monkeypatch):
+    """正常系: 世代番号が同じでもストアのエポックが異なれば（再起動・復元後など）ETagは一致しない"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    etag = client.get("/todos").headers["ETag"]
+
+    epoch = storage.store_epoch
+    monkeypatch.setattr(type(storage), "store_epoch", property(lambda self: epoch + 1))
+    response = client.get("/todos", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
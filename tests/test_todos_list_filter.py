@@ -0,0 +1,75 @@
+"""
+GET /todos の完了状態による絞り込みのテスト
+"""
+
+import json
+
+
+def _setup(client):
+    """ToDo 1〜5 を作成し、2・4 を完了、5 を削除する"""
+    for i in range(5):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    client.patch("/todos/2/complete")
+    client.patch("/todos/4/complete")
+    client.delete("/todos/5")
+
+
+def test_filter_completed_true(client):
+    """正常系: completed=true で完了済みのみ（ID昇順）"""
+    _setup(client)
+
+    response = client.get("/todos", params={"completed": "true"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [todo["id"] for todo in data] == [2, 4]
+    assert all(todo["completed"] for todo in data)
+
+
+def test_filter_completed_false(client):
+    """正常系: completed=false で未完了のみ（論理削除済みは除外）"""
+    _setup(client)
+
+    response = client.get("/todos", params={"completed": "false"})
+
+    assert response.status_code == 200
+    assert [todo["id"] for todo in response.json()] == [1, 3]
+
+
+def test_filter_excludes_deleted_completed(client):
+    """正常系: 完了後に削除されたToDoは completed=true にも含まれない"""
+    _setup(client)
+    client.delete("/todos/2")
+
+    response = client.get("/todos", params={"completed": "true"})
+
+    assert [todo["id"] for todo in response.json()] == [4]
+
+
+def test_filter_with_paging(client):
+    """正常系: 絞り込みとページングを組み合わせられる"""
+    _setup(client)
+
+    first = client.get("/todos", params={"completed": "false", "limit": 1})
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/todos", params={"completed": "false", "limit": 1, "after_id": cursor})
+
+    assert [todo["id"] for todo in first.json()] == [1]
+    assert [todo["id"] for todo in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_filter_with_stream(client):
+    """正常系: 絞り込みはストリーミングモードでも有効"""
+    _setup(client)
+
+    response = client.get("/todos", params={"completed": "true", "stream": "true"})
+
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [2, 4]
+
+
+def test_filter_invalid_value(client):
+    """異常系: 不正な completed 値"""
+    response = client.get("/todos", params={"completed": "maybe"})
+
+    assert response.status_code == 422
@@ -0,0 +1,74 @@
+"""
+GET /todos のキーセットページングのテスト
+"""
+
+
+def _create_todos(client, count):
+    for i in range(count):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+
+
+def test_paging_first_page(client):
+    """正常系: limit 指定で先頭ページと次カーソルが返る"""
+    _create_todos(client, 5)
+
+    response = client.get("/todos", params={"limit": 2})
+
+    assert response.status_code == 200
+    assert [todo["id"] for todo in response.json()] == [1, 2]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_paging_walks_all_pages(client):
+    """正常系: カーソルを辿ると全件を重複なく取得でき、最終ページではカーソルが返らない"""
+    _create_todos(client, 5)
+    client.delete("/todos/3")
+
+    ids = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/todos", params=params)
+        assert response.status_code == 200
+        ids.extend(todo["id"] for todo in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "after_id": cursor}
+
+    assert ids == [1, 2, 4, 5]
+
+
+def test_paging_exact_page_has_no_cursor(client):
+    """正常系: 残件数と limit が一致する場合は次カーソルが返らない"""
+    _create_todos(client, 2)
+
+    response = client.get("/todos", params={"limit": 2})
+
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_paging_without_params_returns_all(client):
+    """正常系: ページング指定なしでは従来どおり全件が返る"""
+    _create_todos(client, 3)
+
+    response = client.get("/todos")
+
+    assert len(response.json()) == 3
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_paging_invalid_cursor(client):
+    """異常系: 不正なカーソル"""
+    response = client.get("/todos", params={"limit": 2, "after_id": "not-a-cursor"})
+
+    assert response.status_code == 400
+    data = response.json()
+    assert data["error_code"] == "INVALID_CURSOR"
+
+
+def test_paging_invalid_limit(client):
+    """異常系: 不正な limit（0）"""
+    response = client.get("/todos", params={"limit": 0})
+
+    assert response.status_code == 422
@@ -0,0 +1,65 @@
+"""
+GET /todos のストリーミング（NDJSON）モードのテスト
+"""
+
+import json
+
+from app.routers import todos
+
+
+def _create_todos(client, count):
+    for i in range(count):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+
+
+def _parse_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_with_query_flag(client):
+    """正常系: stream=true でNDJSONが返り、JSON形式と同じ内容になる"""
+    _create_todos(client, 3)
+    client.delete("/todos/2")
+
+    response = client.get("/todos", params={"stream": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert _parse_ndjson(response) == client.get("/todos").json()
+
+
+def test_stream_with_accept_header(client):
+    """正常系: Accept: application/x-ndjson でNDJSONが返る"""
+    _create_todos(client, 2)
+
+    response = client.get("/todos", headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert [todo["id"] for todo in _parse_ndjson(response)] == [1, 2]
+
+
+def test_stream_spans_multiple_chunks(client, monkeypatch):
+    """正常系: チャンクサイズを超える件数でも全件がID昇順で返る"""
+    monkeypatch.setattr(todos, "STREAM_CHUNK_SIZE", 2)
+    _create_todos(client, 5)
+
+    response = client.get("/todos", params={"stream": "true"})
+
+    assert [todo["id"] for todo in _parse_ndjson(response)] == [1, 2, 3, 4, 5]
+
+
+def test_stream_respects_limit(client):
+    """正常系: limit 指定時はその件数で打ち切られる"""
+    _create_todos(client, 5)
+
+    response = client.get("/todos", params={"stream": "true", "limit": 3})
+
+    assert [todo["id"] for todo in _parse_ndjson(response)] == [1, 2, 3]
+
+
+def test_stream_empty(client):
+    """正常系: データが0件の場合は空のボディ"""
+    response = client.get("/todos", params={"stream": "true"})
+
+    assert response.status_code == 200
+    assert response.text == ""
@@ -0,0 +1,186 @@
+"""
+GET /todos/search エンドポイントのテスト
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.utils.datetime_utils import get_current_jst_time
+from app.utils.search_utils import parse_query, tokenize
+
+
+def _create(client, title, description=None):
+    return client.post("/todos", json={"title": title, "description": description}).json()["id"]
+
+
+def _search_ids(client, q, **params):
+    response = client.get("/todos/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [todo["id"] for todo in response.json()]
+
+
+def test_tokenize_japanese_and_ascii():
+    """正常系: 日本語は文字バイグラムと1文字ずつ、英数字は単語単位（正規化済み）に分割される"""
+    assert tokenize("牛乳を買う") == {"牛乳", "乳を", "を買", "買う", "牛", "乳", "を", "買", "う"}
+    assert tokenize("Write ＲＥＰＯＲＴ v2") == {"write", "report", "v2"}
+    assert tokenize("猫 と dog") == {"猫", "と", "dog"}
+
+
+def test_parse_query_uses_bigrams_for_japanese_words():
+    """正常系: 検索語は2文字以上ならバイグラムのみ、1文字ならその1文字で照合する"""
+    assert parse_query("牛乳を買う") == ({"牛乳", "乳を", "を買", "買う"}, ["牛乳を買う"])
+    assert parse_query("牛 本") == ({"牛", "本"}, [])
+
+
+def test_search_japanese(client):
+    """正常系: 日本語の語をタイトル・説明から検索できる"""
+    _create(client, "牛乳を買う")
+    _create(client, "会議の資料を作成", "牛乳は不要")
+    _create(client, "部屋を掃除する")
+
+    assert _search_ids(client, "牛乳") == [1, 2]
+    assert _search_ids(client, "資料 作成") == [2]
+    assert _search_ids(client, "掃除") == [3]
+    assert _search_ids(client, "洗濯") == []
+
+
+def test_search_single_japanese_character(client):
+    """正常系: 1文字の日本語の語でも、その文字を含むToDoを検索できる"""
+    _create(client, "牛乳を買う")
+    _create(client, "本を読む")
+
+    assert _search_ids(client, "牛") == [1]
+    assert _search_ids(client, "本") == [2]
+    assert _search_ids(client, "を") == [1, 2]
+    assert _search_ids(client, "を 読") == [2]
+    assert _search_ids(client, "猫") == []
+
+
+def test_search_phrase_must_be_contiguous(client):
+    """正常系: 3文字以上の語はバイグラムが離れて出現するだけでは一致しない"""
+    _create(client, "東京都の会議")
+    _create(client, "京都と東京")
+
+    assert _search_ids(client, "東京都") == [1]
+
+
+def test_search_ascii_case_and_width_insensitive(client):
+    """正常系: 英数字は大文字・小文字、全角・半角を区別しない"""
+    _create(client, "Write REPORT")
+    _create(client, "report draft")
+
+    assert _search_ids(client, "report") == [1, 2]
+    assert _search_ids(client, "ＲＥＰＯＲＴ write") == [1]
+
+
+def test_search_excludes_deleted(client):
+    """正常系: 論理削除されたToDoは検索結果に含まれない（完了済みは含まれる）"""
+    for title in ("買い物リスト", "買い物に行く", "買い物メモ"):
+        _create(client, title)
+    client.patch("/todos/1/complete")
+    client.delete("/todos/2")
+    client.post("/todos/batch/delete", json={"ids": [3]})
+
+    assert _search_ids(client, "買い物") == [1]
+
+
+def test_search_index_updated_after_build(client):
+    """正常系: 初回検索で構築された転置インデックスが以降の作成・削除に追従する"""
+    _create(client, "予定を確認")
+    assert _search_ids(client, "予定") == [1]
+
+    _create(client, "予定を追加")
+    client.post("/todos/batch", json=[{"title": "予定の整理"}])
+    assert _search_ids(client, "予定") == [1, 2, 3]
+
+    client.delete("/todos/1")
+    assert _search_ids(client, "予定") == [2, 3]
+
+
+def test_search_paging(client):
+    """正常系: limit / after_id によるページングができる"""
+    client.post("/todos/batch", json=[{"title": f"タスク {i}"} for i in range(5)])
+
+    response = client.get("/todos/search", params={"q": "タスク", "limit": 2})
+    assert [todo["id"] for todo in response.json()] == [1, 2]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/todos/search", params={"q": "タスク", "limit": 3, "after_id": cursor})
+    assert [todo["id"] for todo in response.json()] == [3, 4, 5]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_search_response_shape(client):
+    """正常系: 検索結果は一覧と同じ形式で返される"""
+    _create(client, "形式の確認", "説明")
+
+    assert client.get("/todos/search", params={"q": "確認"}).json() == client.get("/todos").json()
+
+
+def test_search_validation(client):
+    """異常系: 検索語が空の場合は422、カーソルが不正な場合は400"""
+    assert client.get("/todos/search", params={"q": ""}).status_code == 422
+    assert client.get("/todos/search").status_code == 422
+    assert client.get("/todos/search", params={"q": "a", "after_id": "bad"}).status_code == 400
+
+
+def test_search_index_built_incrementally():
+    """正常系: 転置インデックスは区切りごとに構築され、構築中の作成も反映される"""
+    database.clear_database()
+    try:
+        now = get_current_jst_time()
+        todo_data = {"title": "", "created_at": now, "updated_at": now}
+        for i in range(5):
+            database.create_todo({**todo_data, "title": f"検索 {i}"})
+
+        assert not database.build_search_index_slice(max_ids=2)
+        database.create_todo({**todo_data, "title": "検索 追加"})
+        database.update_todo(1, {"is_active": False})
+        while not database.build_search_index_slice(max_ids=2):
+            pass
+
+        assert database.search_active_todo_ids("検索") == ([2, 3, 4, 5, 6], False)
+    finally:
+        database.clear_database()
+
+
+def test_search_index_slice_respects_time_budget():
+    """正常系: 1回の区切りは時間の上限で打ち切られ、次の区切りで続きから構築される"""
+    database.clear_database()
+    try:
+        now = get_current_jst_time()
+        todo_data = {"title": "", "created_at": now, "updated_at": now}
+        count = database.SEARCH_INDEX_BUILD_CHECK_EVERY * 3
+        for i in range(count):
+            database.create_todo({**todo_data, "title": f"検索 {i}"})
+
+        assert not database.build_search_index_slice(budget=0)
+        assert database.search_indexed_upto == database.SEARCH_INDEX_BUILD_CHECK_EVERY
+        while not database.build_search_index_slice(budget=0):
+            pass
+
+        ids, _ = database.search_active_todo_ids("検索")
+        assert ids == list(range(1, count + 1))
+    finally:
+        database.clear_database()
+
+
+def test_search_index_built_in_background_at_startup():
+    """正常系: 起動時にバックグラウンドで転置インデックスの構築が始まり、検索なしで完了する"""
+    database.clear_database()
+    try:
+        now = get_current_jst_time()
+        for i in range(10):
+            database.create_todo({"title": f"検索 {i}", "created_at": now, "updated_at": now})
+        assert not database.search_index_complete
+
+        with TestClient(app):
+            deadline = time.monotonic() + 5
+            while not database.search_index_complete and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert database.search_index_complete
+    finally:
+        database.clear_database()
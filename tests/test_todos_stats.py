@@ -0,0 +1,50 @@
+"""
+GET /todos/stats エンドポイントのテスト
+"""
+
+import asyncio
+
+
+def test_stats_empty(client):
+    """正常系: データが0件の場合"""
+    response = client.get("/todos/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {"total": 0, "active": 0, "open": 0, "completed": 0, "deleted": 0}
+
+
+def test_stats_counts(client):
+    """正常系: 作成・完了化・削除が件数に反映される"""
+    for i in range(5):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    client.patch("/todos/1/complete")
+    client.patch("/todos/2/complete")
+    client.delete("/todos/2")
+    client.delete("/todos/3")
+
+    response = client.get("/todos/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {"total": 5, "active": 3, "open": 2, "completed": 1, "deleted": 2}
+
+
+def test_stats_idempotent_complete(client):
+    """正常系: 完了済みToDoの再完了化では件数が変わらない"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    client.patch("/todos/1/complete")
+    client.patch("/todos/1/complete")
+
+    data = client.get("/todos/stats").json()
+
+    assert data["completed"] == 1
+    assert data["open"] == 0
+
+
+def test_stats_after_clear_database(client, storage):
+    """正常系: clear_database 後は0件に戻る"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    asyncio.run(storage.clear_database())
+
+    data = client.get("/todos/stats").json()
+
+    assert data == {"total": 0, "active": 0, "open": 0, "completed": 0, "deleted": 0}
@@ -0,0 +1,153 @@
+"""
+GET /todos?since=（差分同期）のテスト
+"""
+
+import asyncio
+from datetime import timedelta
+
+from app import database
+from app.utils.datetime_utils import get_current_jst_time
+
+
+def _sync(client, since, **params):
+    response = client.get("/todos", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json(), response.headers["X-Change-Sequence"], "X-More-Changes" in response.headers
+
+
+def _sequence(token: str) -> int:
+    """差分同期トークンの変更シーケンス番号"""
+    return int(token.split("-")[1])
+
+
+def _token(token: str, sequence: int) -> str:
+    """同じストアのエポックで、変更シーケンス番号を差し替えたトークン"""
+    return f"{token.split('-')[0]}-{sequence}"
+
+
+def test_sync_from_zero_returns_all_including_tombstones(client):
+    """正常系: since=0 では論理削除済みを含むすべてのToDoを変更順に返す"""
+    for i in range(3):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    client.patch("/todos/1/complete")
+    client.delete("/todos/2")
+
+    todos, mark, more = _sync(client, 0)
+
+    assert [todo["id"] for todo in todos] == [3, 1, 2]
+    assert todos[1]["completed"] is True
+    assert todos[2]["is_active"] is False
+    assert not more
+
+    # 変更がなければ空で、番号は変わらない
+    assert _sync(client, mark) == ([], mark, False)
+
+
+def test_sync_returns_only_changes_after_since(client):
+    """正常系: since より後に作成・完了化・削除されたToDoのみを、最新の状態で1件ずつ返す"""
+    for i in range(5):
+        client.post("/todos", json={"title": f"ToDo {i + 1}"})
+    _, mark, _ = _sync(client, 0)
+
+    client.post("/todos", json={"title": "ToDo 6"})
+    client.patch("/todos/2/complete")
+    client.delete("/todos/2")
+    client.post("/todos/batch/complete", json={"ids": [4]})
+
+    todos, new_mark, _ = _sync(client, mark)
+
+    assert [(todo["id"], todo["completed"], todo["is_active"]) for todo in todos] == [
+        (6, False, True),
+        (2, True, False),
+        (4, True, True),
+    ]
+    assert _sequence(new_mark) > _sequence(mark)
+    assert _sync(client, new_mark)[0] == []
+
+
+def test_sync_paging_with_limit(client):
+    """正常系: limit で打ち切った場合は続きの番号と X-More-Changes を返し、辿ると全件を取得できる"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(7)])
+    client.delete("/todos/3")
+
+    seen = []
+    since, more = 0, True
+    while more:
+        todos, since, more = _sync(client, since, limit=3)
+        seen += [todo["id"] for todo in todos]
+
+    assert seen == [1, 2, 4, 5, 6, 7, 3]
+    assert _sync(client, since) == ([], since, False)
+
+
+def test_sync_expired_after_compaction(client, storage):
+    """異常系: 物理削除されたトゥームストーンより前の番号からの差分は 410 を返す"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(3)])
+    _, before_delete, _ = _sync(client, 0)
+    client.delete("/todos/2")
+    _, after_delete, _ = _sync(client, before_delete)
+
+    async def compact():
+        return await storage.compact_deleted(get_current_jst_time() + timedelta(seconds=1))
+
+    assert asyncio.run(compact())[0] == 1
+
+    response = client.get("/todos", params={"since": before_delete})
+    assert response.status_code == 410
+    assert response.json()["error_code"] == "CHANGES_EXPIRED"
+
+    # 削除を受信済みの番号からは引き続き差分を取得でき、since=0 では現存するToDoをすべて返す
+    assert _sync(client, after_delete) == ([], after_delete, False)
+    assert [todo["id"] for todo in _sync(client, 0)[0]] == [1, 3]
+
+
+def test_sync_expired_after_clear_or_unknown_sequence(client, storage):
+    """異常系: 初期化前の番号や、現在より大きい番号からの差分は 410 を返す"""
+    client.post("/todos", json={"title": "ToDo 1"})
+    _, mark, _ = _sync(client, 0)
+
+    assert client.get("/todos", params={"since": _token(mark, _sequence(mark) + 1)}).status_code == 410
+
+    asyncio.run(storage.clear_database())
+    client.post("/todos", json={"title": "ToDo 1"})
+
+    assert client.get("/todos", params={"since": mark}).status_code == 410
+    todos, new_mark, _ = _sync(client, 0)
+    assert [todo["title"] for todo in todos] == ["ToDo 1"]
+    assert _sequence(new_mark) > _sequence(mark)
+
+
+def test_sync_expired_after_restart(client, storage, monkeypatch):
+    """異常系: 再起動・作り直し後のストアでは、番号が追いついても以前のトークンからの差分は 410 を返す"""
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(3)])
+    _, mark, _ = _sync(client, 0)
+
+    # 変更シーケンス番号が0から数え直しになった新しいストアを模して、エポックを変える
+    epoch = storage.store_epoch
+    monkeypatch.setattr(type(storage), "store_epoch", property(lambda self: epoch + 1))
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(3)])
+
+    response = client.get("/todos", params={"since": mark})
+    assert response.status_code == 410
+    assert response.json()["error_code"] == "CHANGES_EXPIRED"
+    _, new_mark, _ = _sync(client, 0)
+    assert new_mark.split("-")[0] == f"{epoch + 1:x}"
+
+
+def test_sync_invalid_since(client):
+    """異常系: since が負の数、または差分同期トークンの形式でない"""
+    for since in (-1, 5, "abc", "zz-1", "1f-"):
+        assert client.get("/todos", params={"since": since}).status_code == 422
+
+
+def test_change_index_stays_proportional_to_live_todos(client, storage):
+    """正常系: 同じToDoを繰り返し更新してもインメモリの変更インデックスは件数の2倍程度に収まる"""
+    if storage.__class__.__name__ != "InMemoryStorage":
+        return
+    client.post("/todos/batch", json=[{"title": f"ToDo {i + 1}"} for i in range(10)])
+    for _ in range(50):
+        client.post("/todos/batch/complete", json={"ids": [1, 2]})
+        database.update_todos([1, 2], {"completed": False})
+
+    assert len(database.change_seqs) <= 2 * len(database.todos_db)
+    assert [todo["id"] for todo in _sync(client, 0)[0]] == [3, 4, 5, 6, 7, 8, 9, 10, 1, 2]
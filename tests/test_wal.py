@@ -0,0 +1,141 @@
+"""
+追記型ログ（WAL）による永続化のテスト
+"""
+
+import asyncio
+import errno
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database
+from app.database import clear_database
+from app.main import app
+from app.wal import WriteAheadLog, WriteAheadLogError, read_wal
+
+
+@pytest.fixture
+def wal_path(tmp_path, monkeypatch):
+    """WALを有効化した状態でクリーンなデータベースを用意するフィクスチャ"""
+    path = tmp_path / "todos.wal"
+    monkeypatch.setenv("TODO_WAL_PATH", str(path))
+    clear_database()
+    yield path
+    clear_database()
+
+
+@pytest.mark.parametrize("policy", ["always", "group", "interval", "off"])
+def test_wal_roundtrip(tmp_path, policy):
+    """正常系: 追記したレコードを閉じた後に順に読み出せる"""
+    path = tmp_path / "todos.wal"
+    log = WriteAheadLog(str(path), fsync_policy=policy)
+
+    async def write():
+        lsn = 0
+        for i in range(10):
+            lsn = log.append({"op": "x", "i": i})
+        await log.wait_durable(lsn)
+
+    asyncio.run(write())
+    log.close()
+
+    assert [entry["i"] for entry in read_wal(str(path))] == list(range(10))
+
+
+def test_wal_group_commit_resolves_concurrent_waiters(tmp_path):
+    """正常系: 並行する書き込みの待機がすべて完了する"""
+    log = WriteAheadLog(str(tmp_path / "todos.wal"), fsync_policy="group", group_commit_window=0.01)
+
+    async def writer(i):
+        await log.wait_durable(log.append({"op": "x", "i": i}))
+
+    async def main():
+        await asyncio.wait_for(asyncio.gather(*(writer(i) for i in range(50))), timeout=5)
+
+    asyncio.run(main())
+    log.close()
+
+    assert len(list(read_wal(str(tmp_path / "todos.wal")))) == 50
+
+
+def _disk_full(batch):
+    raise OSError(errno.ENOSPC, "No space left on device")
+
+
+def test_wal_write_failure_fails_waiters_and_later_appends(tmp_path):
+    """異常系: 書き込みに失敗した場合、待機中のリクエストは例外で再開し、以降の追記も即座に失敗する"""
+    log = WriteAheadLog(str(tmp_path / "todos.wal"), fsync_policy="group")
+    log._write = _disk_full
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*(log.wait_durable(log.append({"op": "x", "i": i})) for i in range(3)),
+                           return_exceptions=True),
+            timeout=5,
+        )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, WriteAheadLogError) for result in results)
+    assert isinstance(results[0].__cause__, OSError)
+    with pytest.raises(WriteAheadLogError):
+        log.append({"op": "x"})
+    log.close()
+
+
+def test_write_failure_returns_500(wal_path):
+    """異常系: WALへの書き込みに失敗した場合、変更リクエストは応答を待ち続けずに500を返す"""
+    with TestClient(app, raise_server_exceptions=False) as client:
+        database.wal._write = _disk_full
+
+        assert client.post("/todos", json={"title": "ToDo 1"}).status_code == 500
+        assert client.post("/todos", json={"title": "ToDo 2"}).status_code == 500
+        assert client.get("/todos").status_code == 200
+
+
+def test_wal_ignores_truncated_tail(tmp_path):
+    """正常系: 書き込み途中で途切れた末尾の行は無視される"""
+    path = tmp_path / "todos.wal"
+    path.write_bytes(b'{"n":1,"op":"x"}\n{"n":2,"op":"c","ro')
+
+    assert list(read_wal(str(path))) == [{"n": 1, "op": "x"}]
+
+
+def test_wal_invalid_policy(tmp_path):
+    """異常系: 不正なfsyncポリシー"""
+    with pytest.raises(ValueError):
+        WriteAheadLog(str(tmp_path / "todos.wal"), fsync_policy="sometimes")
+
+
+def test_restart_restores_todos(wal_path):
+    """正常系: 再起動後にWALの再生で全操作が復元され、IDの採番も継続する"""
+    with TestClient(app) as client:
+        client.post("/todos", json={"title": "買い物に行く", "description": "牛乳とパンを買う"})
+        client.post("/todos/batch", json=[{"title": "ToDo 2"}, {"title": "ToDo 3"}, {"title": "ToDo 4"}])
+        client.patch("/todos/1/complete")
+        client.delete("/todos/2")
+        client.post("/todos/batch/delete", json={"ids": [3]})
+        before = client.get("/todos").json()
+        stats = client.get("/todos/stats").json()
+
+    # プロセス再起動を模してメモリ上のデータを破棄
+    clear_database()
+
+    with TestClient(app) as client:
+        assert client.get("/todos").json() == before
+        assert client.get("/todos/stats").json() == stats
+        assert client.post("/todos", json={"title": "ToDo 5"}).json()["id"] == 5
+
+
+def test_restart_replays_clear_database(wal_path):
+    """正常系: 稼働中の clear_database もWALに記録され、再生時に反映される"""
+    with TestClient(app) as client:
+        client.post("/todos", json={"title": "ToDo 1"})
+        clear_database()
+        client.post("/todos", json={"title": "ToDo 2"})
+
+    clear_database()
+
+    with TestClient(app) as client:
+        data = client.get("/todos").json()
+        assert [(todo["id"], todo["title"]) for todo in data] == [(1, "ToDo 2")]
@@ -0,0 +1,64 @@
+"""
+ワーカープロセスの排他制御のテスト
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from app.worker_lock import WorkerLockError, _lock_path, acquire_worker_lock, release_worker_lock
+
+
+def test_lock_not_required_in_single_process():
+    """正常系: 単一プロセスで起動されている場合はロックを取得しない"""
+    assert acquire_worker_lock() is None
+
+
+def test_second_worker_is_rejected(monkeypatch):
+    """異常系: 同じ親プロセスの2つ目のワーカーは WorkerLockError"""
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+
+    fd = acquire_worker_lock()
+    try:
+        with pytest.raises(WorkerLockError):
+            acquire_worker_lock()
+    finally:
+        release_worker_lock(fd)
+
+    # 解放後は再び取得できる
+    release_worker_lock(acquire_worker_lock())
+
+
+def test_release_removes_lock_file(monkeypatch):
+    """正常系: 解放時にロックファイルが削除される"""
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+
+    fd = acquire_worker_lock()
+    assert os.path.exists(_lock_path())
+
+    release_worker_lock(fd)
+
+    assert not os.path.exists(_lock_path())
+
+
+def test_lock_on_removed_file_is_retried(monkeypatch):
+    """正常系: ロック前に削除されたロックファイルではなく、作り直したファイルでロックを取得する"""
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+    stale = os.open(_lock_path(), os.O_RDWR | os.O_CREAT, 0o600)
+    os.unlink(_lock_path())
+    opened = []
+    open_file = os.open
+
+    def open_stale_first(path, flags, mode=0o777):
+        opened.append(path)
+        return os.dup(stale) if len(opened) == 1 else open_file(path, flags, mode)
+
+    monkeypatch.setattr(os, "open", open_stale_first)
+    fd = acquire_worker_lock()
+    try:
+        assert len(opened) == 2
+        assert os.fstat(fd).st_ino == os.stat(_lock_path()).st_ino
+    finally:
+        release_worker_lock(fd)
+        os.close(stale)